@@ -0,0 +1,125 @@
+# audio_buffer.py - Anneau audio en mémoire partagée entre capture et inférence
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import *
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+# Compteurs en tête du segment partagé (int64). Chaque compteur n'a qu'un seul écrivain.
+_WRITE_TOTAL = 0        # Écrit par le producteur : échantillons écrits depuis le début
+_READ_TOTAL = 1         # Écrit par le consommateur : échantillons lus depuis le début
+_DROPPED_NEWEST = 2     # Écrit par le producteur : échantillons refusés (file pleine)
+_DROPPED_OLDEST = 3     # Écrit par le consommateur : échantillons écrasés avant lecture
+_INPUT_OVERFLOWS = 4    # Écrit par le producteur : débordements signalés par PortAudio
+_CAPACITY = 5           # Écrit à la création : taille de l'anneau en échantillons
+_HEADER_SIZE = 8
+
+class SharedAudioRing:
+    """Anneau d'échantillons float32 à un producteur et un consommateur, partagé entre processus"""
+
+    def __init__(self, capacity=None, name=None, policy=AUDIO_QUEUE_POLICY):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Politique de débordement inconnue: {policy}")
+        self.policy = policy
+        self.owner = name is None
+
+        if self.owner:
+            capacity = capacity or int(VOICE_SAMPLERATE * VOICE_RING_SECONDS)
+            size = _HEADER_SIZE * 8 + capacity * 4
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.header = np.ndarray((_HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = 0
+            self.header[_CAPACITY] = capacity
+        # La taille du segment peut être arrondie à la page : on relit la capacité dans l'en-tête
+        self.capacity = int(self.header[_CAPACITY])
+        self.samples = np.ndarray((self.capacity,), dtype=np.float32, buffer=self.shm.buf, offset=_HEADER_SIZE * 8)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, audio):
+        """Côté producteur (callback PortAudio) : copie les échantillons, ne bloque jamais"""
+        audio = np.asarray(audio, dtype=np.float32).ravel()
+        count = len(audio)
+        write_total = int(self.header[_WRITE_TOTAL])
+
+        if self.policy == DROP_NEWEST and write_total + count - int(self.header[_READ_TOTAL]) > self.capacity:
+            self.header[_DROPPED_NEWEST] += count
+            return False
+
+        # On ne garde que ce qui tient dans l'anneau
+        if count > self.capacity:
+            audio = audio[-self.capacity:]
+            write_total += count - self.capacity
+            count = self.capacity
+
+        start = write_total % self.capacity
+        first = min(count, self.capacity - start)
+        self.samples[start:start + first] = audio[:first]
+        self.samples[:count - first] = audio[first:]
+
+        # Publier le compteur seulement après les données
+        self.header[_WRITE_TOTAL] = write_total + count
+        return True
+
+    def read(self, max_samples=None):
+        """Côté consommateur : retourne les échantillons disponibles (éventuellement vide)"""
+        read_total = int(self.header[_READ_TOTAL])
+        write_total = int(self.header[_WRITE_TOTAL])
+
+        # En retard de plus d'un tour : les plus anciens ont été écrasés
+        if write_total - read_total > self.capacity:
+            self.header[_DROPPED_OLDEST] += write_total - self.capacity - read_total
+            read_total = write_total - self.capacity
+
+        count = write_total - read_total
+        if max_samples is not None:
+            count = min(count, max_samples)
+        if count <= 0:
+            return np.zeros(0, dtype=np.float32)
+
+        start = read_total % self.capacity
+        first = min(count, self.capacity - start)
+        audio = np.concatenate((self.samples[start:start + first], self.samples[:count - first]))
+
+        # Le producteur a pu écraser le début pendant la copie
+        overwritten = int(self.header[_WRITE_TOTAL]) - self.capacity - read_total
+        if overwritten > 0:
+            self.header[_DROPPED_OLDEST] += min(overwritten, count)
+            audio = audio[overwritten:]
+
+        self.header[_READ_TOTAL] = read_total + count
+        return audio
+
+    def count_input_overflow(self):
+        """Côté producteur : note un débordement signalé par PortAudio"""
+        self.header[_INPUT_OVERFLOWS] += 1
+
+    def depth(self):
+        """Échantillons en attente de lecture"""
+        return min(int(self.header[_WRITE_TOTAL] - self.header[_READ_TOTAL]), self.capacity)
+
+    def stats(self):
+        """Compteurs de l'anneau"""
+        return {
+            'written': int(self.header[_WRITE_TOTAL]),
+            'dropped': int(self.header[_DROPPED_NEWEST] + self.header[_DROPPED_OLDEST]),
+            'input_overflows': int(self.header[_INPUT_OVERFLOWS]),
+            'depth': self.depth(),
+        }
+
+    def close(self):
+        """Détache le segment (et le détruit côté créateur)"""
+        del self.header, self.samples
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
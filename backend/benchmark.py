@@ -0,0 +1,202 @@
+# benchmark.py - Mesure de latence du geste jusqu'à l'événement souris/clavier
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from pylsl import resolve_byprop, local_clock
+
+from config import *
+from head_tracker import HeadTracker
+from controllers import ControlManager
+from replay import ReplayOutlet, synthetic_gyro_trace, load_session_trace
+from recording_backend import RecordingMouse, RecordingKeyboard
+from pipeline import TrackerPipeline, open_pipeline
+from runtime import Runtime
+
+# Étapes mesurées, dans l'ordre du pipeline (attentes dans les files du runtime comprises)
+STAGES = ['lsl_pull', 'head_tracker', 'update_direction', 'movement_tick']
+
+class LatencyProbe:
+    """Relie un changement de direction au premier événement émis qui en découle"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = None
+        self.records = []
+
+    def mark(self, sample_time, pulled_at, tracked_at):
+        """Un échantillon vient de changer la direction"""
+        with self.lock:
+            self.pending = {
+                'sample': sample_time,
+                'pulled': pulled_at,
+                'tracked': tracked_at,
+                'dispatched': None,
+            }
+
+    def dispatched(self, dispatched_at):
+        """update_direction a rendu la main"""
+        with self.lock:
+            if self.pending and self.pending['dispatched'] is None:
+                self.pending['dispatched'] = dispatched_at
+
+    def emit(self, kind):
+        """Un événement souris/clavier vient d'être émis"""
+        emitted_at = local_clock()
+        with self.lock:
+            if not self.pending:
+                return
+            pending = self.pending
+            self.pending = None
+
+        # L'événement peut précéder le retour d'update_direction (touche, ou thread de mouvement rapide)
+        dispatched_at = pending['dispatched'] or emitted_at
+        self.records.append({
+            'kind': kind,
+            'total': emitted_at - pending['sample'],
+            'lsl_pull': pending['pulled'] - pending['sample'],
+            'head_tracker': pending['tracked'] - pending['pulled'],
+            'update_direction': dispatched_at - pending['tracked'],
+            'movement_tick': emitted_at - dispatched_at,
+        })
+
+def _percentiles(values):
+    if not values:
+        return float('nan'), float('nan')
+    p50, p99 = np.percentile(values, [50, 99])
+    return p50 * 1000, p99 * 1000
+
+class ProbedPipeline(TrackerPipeline):
+    """TrackerPipeline de production, horodatée à chaque étape pour la sonde de latence"""
+
+    probe = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tracker_costs = []
+        self.dispatch_costs = []
+
+    def pull(self):
+        data, timestamps = super().pull()
+        return data, timestamps, local_clock()
+
+    def track(self, data, timestamps, pulled_at):
+        start = time.perf_counter()
+        result = super().track(data, timestamps)
+        # Coût par échantillon du lot (update_batch)
+        self.tracker_costs.append((time.perf_counter() - start) / len(data))
+        return result + (pulled_at, local_clock())
+
+    def output(self, gyro, states, bias, gestures, timestamps, pulled_at, tracked_at):
+        # Échantillon par échantillon pour horodater chaque changement de direction
+        for i, (state, sample_time) in enumerate(zip(states, timestamps)):
+            changed = state != self.last_state
+            if changed:
+                self.probe.mark(sample_time + self.time_offset, pulled_at, tracked_at)
+
+            start = time.perf_counter()
+            super().output(gyro[i:i + 1], states[i:i + 1], bias, gestures if i == 0 else (), timestamps[i:i + 1])
+            self.dispatch_costs.append(time.perf_counter() - start)
+
+            if changed:
+                self.probe.dispatched(local_clock())
+
+def _wait_until(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def run_benchmark(timestamps, data, mode, speed=1.0, early_commit=GESTURE_EARLY_COMMIT):
+    """Rejoue une trace à travers TrackerPipeline (et le Runtime asyncio s'il est actif) et mesure la latence"""
+    probe = LatencyProbe()
+    mouse = RecordingMouse(on_event=lambda kind: kind == 'move' and probe.emit(kind))
+    keyboard = RecordingKeyboard(on_event=lambda kind: kind in ('tap', 'press') and probe.emit(kind))
+
+    head_tracker = HeadTracker()
+    head_tracker.early_commit = early_commit
+    control_manager = ControlManager(mouse=mouse, keyboard=keyboard)
+    control_manager.set_mode(mode)
+    ProbedPipeline.probe = probe
+
+    replay = ReplayOutlet(timestamps, data, speed=speed)
+    streams = resolve_byprop("source_id", "muse-replay", timeout=REPLAY_CONSUMER_TIMEOUT)
+
+    if ASYNC_RUNTIME:
+        runtime = Runtime(head_tracker, control_manager, lambda: streams[:1], pipeline_class=ProbedPipeline)
+        runtime.start()
+        _wait_until(lambda: runtime.pipeline is not None, REPLAY_CONSUMER_TIMEOUT)
+        pipeline = runtime.pipeline
+    else:
+        # Repli threadé : mêmes étapes, boucle d'enregistrement et thread de mouvement
+        is_running = True
+        control_manager.start()
+        pipeline = open_pipeline(streams[0], head_tracker, control_manager, pipeline_class=ProbedPipeline)
+        thread = threading.Thread(target=pipeline.run, args=(lambda: is_running,), daemon=True)
+        thread.start()
+
+    replay.wait_for_consumer()
+    replay.consumed = pipeline.samples_consumed
+    replay.start()
+    replay.join()
+    _wait_until(lambda: pipeline.samples_consumed() >= replay.samples_sent, REPLAY_DRAIN_TIMEOUT)
+
+    # Laisser l'étape de mouvement émettre le dernier événement
+    time.sleep(REPLAY_DRAIN_TIME)
+    if ASYNC_RUNTIME:
+        runtime.stop()
+    else:
+        is_running = False
+        thread.join(timeout=2)
+        control_manager.stop()
+    replay.stop()
+
+    return probe.records, pipeline.tracker_costs, pipeline.dispatch_costs, list(head_tracker.commit_latencies)
+
+def print_report(mode, records, tracker_costs, dispatch_costs, commit_latencies):
+    """Affiche les percentiles de latence par étape"""
+    print(f"\n📊 Mode {mode.upper()} — {len(records)} événements mesurés")
+    print(f"  {'étape':18s} {'p50 (ms)':>10s} {'p99 (ms)':>10s}")
+    for stage in STAGES + ['total']:
+        p50, p99 = _percentiles([r[stage] for r in records])
+        print(f"  {stage:18s} {p50:10.3f} {p99:10.3f}")
+
+    print("  Coût de calcul par appel :")
+    for name, costs in (('track (par éch.)', tracker_costs), ('output (par éch.)', dispatch_costs)):
+        p50, p99 = _percentiles(costs)
+        print(f"  {name:18s} {p50:10.3f} {p99:10.3f}")
+    
+    # Temps de la tête, avant tout traitement : début du geste -> direction émise
+    p50, p99 = _percentiles(commit_latencies)
+    print(f"  {'début → émission':18s} {p50:10.3f} {p99:10.3f}  ({len(commit_latencies)} gestes)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de latence gyro → événement souris/clavier")
+    parser.add_argument("session", nargs="?", help="Dossier de session (trace synthétique si absent)")
+    parser.add_argument("--mode", choices=["mouse", "keyboard", "both"], default="both")
+    parser.add_argument("--speed", type=float, default=1.0, help="Vitesse de rejeu (1 = temps réel)")
+    parser.add_argument("--repeat", type=int, default=10, help="Répétitions de la trace synthétique")
+    parser.add_argument("--early", action="store_true", help="Validation anticipée des gestes (au pic de vitesse)")
+    args = parser.parse_args()
+
+    if args.session:
+        timestamps, data = load_session_trace(args.session)
+    else:
+        gestures = ['GAUCHE', 'DROITE', 'HAUT', 'BAS']
+        sequence = [('CENTRE', 0.6)]
+        for _ in range(args.repeat):
+            for direction in gestures:
+                sequence += [(direction, 0.4), ('CENTRE', 0.6)]
+        timestamps, data = synthetic_gyro_trace(sequence)
+
+    modes = ["mouse", "keyboard"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print_report(mode, *run_benchmark(timestamps, data, mode, speed=args.speed,
+                                          early_commit=args.early or GESTURE_EARLY_COMMIT))
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,172 @@
+import threading
 import time
+import numpy as np
 import streamlit as st
 from pylsl import StreamInlet, resolve_byprop
 
+from config import *
+from direction_classifier import DirectionClassifier, POSE_AXES
+from profiles import profile_name, save_profile, get_active_profile
+
 # Variables de calibration
 calibration_data = {
     'center_x': 0,
     'center_y': 0,
     'is_calibrated': False
 }
+calibration_job = None
 
-def calibrate():
-    """Effectue la calibration du casque"""
-    try:
-        st.info("🎯 Calibration en cours...")
-        st.write("Regardez droit devant vous et restez immobile pendant 3 secondes.")
-        
+# Poses demandées à l'utilisateur, dans l'ordre : (direction, consigne)
+CALIBRATION_STEPS = [
+    ('CENTRE', "Regardez droit devant vous et restez immobile."),
+    ('DROITE', "Tournez la tête vers la droite, une fois, comme pour un geste."),
+    ('GAUCHE', "Tournez la tête vers la gauche, une fois, comme pour un geste."),
+    ('HAUT', "Levez la tête vers le haut, une fois, comme pour un geste."),
+    ('BAS', "Baissez la tête vers le bas, une fois, comme pour un geste."),
+]
+
+def _reject_outliers(samples):
+    """Écarte les échantillons trop loin de la médiane (écart absolu médian, axe par axe)"""
+    median = np.median(samples, axis=0)
+    deviation = np.abs(samples - median)
+    mad = np.median(deviation, axis=0) * 1.4826
+    mad[mad == 0] = 1.0
+    inliers = np.all(deviation / mad <= CALIBRATION_OUTLIER_MAD, axis=1)
+    return samples[inliers]
+
+def _active_samples(samples, center, direction):
+    """Isole l'aller du geste : l'excursion la plus ample dans la direction demandée
+
+    Le retour de la tête a le signe opposé ; on garde les échantillons contigus
+    autour du pic qui dépassent CALIBRATION_ACTIVE_FRACTION de ce pic. Le pic est
+    cherché sur une médiane glissante : un échantillon aberrant isolé ne peut pas l'être.
+    """
+    progress = (samples - center) @ np.asarray(POSE_AXES[direction])
+    if len(progress) >= CALIBRATION_MEDIAN_WINDOW:
+        padded = np.pad(progress, CALIBRATION_MEDIAN_WINDOW // 2, mode='edge')
+        progress = np.median(np.lib.stride_tricks.sliding_window_view(padded, CALIBRATION_MEDIAN_WINDOW), axis=1)
+    peak = int(np.argmax(progress))
+    if progress[peak] <= 0:
+        return samples[:0]
+    active = progress >= progress[peak] * CALIBRATION_ACTIVE_FRACTION
+    start = peak
+    while start > 0 and active[start - 1]:
+        start -= 1
+    end = peak + 1
+    while end < len(samples) and active[end]:
+        end += 1
+    return samples[start:end]
+
+class CalibrationJob:
+    """Calibration dans un thread : l'interface ne fait que lire l'avancement"""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.instruction = "Recherche du flux GYRO..."
+        self.progress = 0.0
+        self.status = 'running'  # 'running', 'done' ou 'error'
+        self.message = ""
+        self.is_running = False
+        self.thread = None
+
+    def start(self):
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+
+    def _run(self):
+        try:
+            self._calibrate()
+        except Exception as e:
+            self.status = 'error'
+            self.message = f"Erreur lors de la calibration: {str(e)}"
+        finally:
+            self.is_running = False
+
+    def _calibrate(self):
         # Rechercher le flux GYRO
         streams = resolve_byprop("type", "GYRO", timeout=2)
         
         if len(streams) == 0:
-            st.error("❌ Impossible de trouver le flux GYRO. Assurez-vous que le streaming est actif.")
-            return False
+            self.status = 'error'
+            self.message = "Impossible de trouver le flux GYRO. Assurez-vous que le streaming est actif."
+            return
         
-        inlet = StreamInlet(streams[0], max_chunklen=1)
+        inlet = StreamInlet(streams[0])
         
-        # Collecter des données pendant 3 secondes
-        samples_x = []
-        samples_y = []
-        start_time = time.time()
+        poses = {}
+        for step, (direction, text) in enumerate(CALIBRATION_STEPS):
+            self.instruction = f"**{step + 1}/{len(CALIBRATION_STEPS)}** — {text}"
+            samples = self._capture_pose(inlet, step)
+            if not self.is_running:
+                self.status = 'error'
+                self.message = "Calibration annulée."
+                return
+            
+            if len(samples) and direction != 'CENTRE':
+                # Le geste lui-même serait rejeté parmi les échantillons au repos : on l'isole d'abord
+                samples = _active_samples(samples, poses['CENTRE'].mean(axis=0), direction)
+            if len(samples):
+                samples = _reject_outliers(samples)
+            
+            if len(samples) < CALIBRATION_MIN_SAMPLES:
+                self.status = 'error'
+                self.message = f"Pas assez de données pour la pose {direction} ({len(samples)} échantillons)."
+                return
+            poses[direction] = samples
         
-        progress_bar = st.progress(0)
+        classifier = DirectionClassifier.from_samples(poses)
+        inconsistent = classifier.inconsistent_directions()
+        if inconsistent:
+            self.status = 'error'
+            self.message = f"Gestes dans le mauvais sens ({', '.join(inconsistent)}), recommencez la calibration."
+            return
+        save_profile(self.profile, classifier)
         
-        while time.time() - start_time < 3:
-            data, _ = inlet.pull_chunk(timeout=0.1, max_samples=1)
-            if data:
-                samples_x.append(data[0][0])
-                samples_y.append(data[0][1])
-            
-            # Mettre à jour la barre de progression
-            progress = (time.time() - start_time) / 3
-            progress_bar.progress(progress)
+        center_x, center_y = poses['CENTRE'].mean(axis=0)
+        calibration_data['center_x'] = float(center_x)
+        calibration_data['center_y'] = float(center_y)
+        calibration_data['is_calibrated'] = True
         
-        progress_bar.empty()
+        self.progress = 1.0
+        self.status = 'done'
+        self.message = f"Profil « {self.profile} » enregistré. Position de référence: X={center_x:.2f}, Y={center_y:.2f}"
+
+    def _capture_pose(self, inlet, step):
+        """Collecte les échantillons gyro (x, y) d'une pose, par blocs"""
+        n_steps = len(CALIBRATION_STEPS)
         
-        if len(samples_x) > 0:
-            # Calculer les valeurs moyennes
-            calibration_data['center_x'] = sum(samples_x) / len(samples_x)
-            calibration_data['center_y'] = sum(samples_y) / len(samples_y)
-            calibration_data['is_calibrated'] = True
-            
-            st.success(f"✅ Calibration réussie!")
-            st.write(f"Position de référence: X={calibration_data['center_x']:.2f}, Y={calibration_data['center_y']:.2f}")
-            
-            # Sauvegarder dans la session Streamlit
-            st.session_state.calibration_data = calibration_data
-            
-            return True
-        else:
-            st.error("❌ Aucune donnée collectée pendant la calibration.")
-            return False
+        # Laisser le temps de lire la consigne, puis repartir d'un buffer vide
+        time.sleep(CALIBRATION_PREPARE_TIME)
+        inlet.flush()
+        
+        chunks = []
+        start_time = time.time()
+        while self.is_running and time.time() - start_time < CALIBRATION_POSE_DURATION:
+            data, _ = inlet.pull_chunk(timeout=CALIBRATION_PULL_TIMEOUT, max_samples=GYRO_MAX_CHUNK)
+            if data:
+                chunks.append(np.asarray(data, dtype=np.float64)[:, :2])
             
-    except Exception as e:
-        st.error(f"❌ Erreur lors de la calibration: {str(e)}")
+            progress = min((time.time() - start_time) / CALIBRATION_POSE_DURATION, 1.0)
+            self.progress = (step + progress) / n_steps
+        
+        return np.concatenate(chunks) if chunks else np.empty((0, 2))
+
+def calibrate(profile=DEFAULT_PROFILE):
+    """Lance la calibration en arrière-plan (sans effet si elle est déjà en cours)"""
+    global calibration_job
+    if calibration_job and calibration_job.is_running:
         return False
+    calibration_job = CalibrationJob(profile_name(profile))
+    calibration_job.start()
+    return True
+
+def get_calibration_job():
+    """Calibration en cours ou dernière calibration terminée"""
+    return calibration_job
 
 def get_calibration_data():
     """Retourne les données de calibration"""
@@ -74,7 +178,7 @@ def get_calibration_data():
 def is_calibrated():
     """Vérifie si le système est calibré"""
     data = get_calibration_data()
-    return data.get('is_calibrated', False)
+    return data.get('is_calibrated', False) or get_active_profile() is not None
 
 def reset_calibration():
     """Réinitialise la calibration"""
@@ -0,0 +1,63 @@
+# command_decoder.py - Décodage Whisper restreint à la grammaire des commandes
+
+from config import *
+from command_registry import CommandRegistry, NUMBER_WORDS, REPEAT_WORDS
+
+class CommandDecoder:
+    """Restreint le vocabulaire de Whisper aux mots des commandes vocales"""
+
+    def __init__(self, model, registry=None):
+        self.registry = registry or CommandRegistry()
+        self.phrases = list(self.registry.actions)
+
+        tokenizer = model.hf_tokenizer
+        eot = tokenizer.token_to_id("<|endoftext|>")
+        vocab_size = tokenizer.get_vocab_size()
+
+        def n_tokens(text):
+            return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+        # Jetons autorisés : chaque mot de la grammaire, avec/sans espace et majuscule
+        allowed = set()
+        for word in self.registry.vocabulary():
+            for variant in (word, " " + word, word.capitalize(), " " + word.capitalize()):
+                allowed.update(tokenizer.encode(variant, add_special_tokens=False).ids)
+        # Ponctuation que Whisper place entre deux mots ou en fin d'énoncé
+        for mark in (".", ",", "!", "?"):
+            allowed.update(tokenizer.encode(mark, add_special_tokens=False).ids)
+
+        # Tous les autres jetons sont interdits, y compris langues et horodatages : sinon un
+        # décodage incertain s'y réfugie et l'énoncé est vide. Seule la fin de texte reste permise
+        self.suppress_tokens = [token for token in range(vocab_size) if token != eot and token not in allowed]
+
+        # Assez de jetons pour la plus longue commande suivie de sa répétition, ponctuation comprise
+        longest_phrase = max(n_tokens(" " + phrase) for phrase in self.phrases)
+        longest_repeat = max(n_tokens(f" {number} {REPEAT_WORDS[0]}") for number in NUMBER_WORDS)
+        self.max_new_tokens = longest_phrase + longest_repeat + 1
+
+    def transcribe(self, model, audio, beam_size=1):
+        """Décode un énoncé avec la grammaire des commandes
+
+        CTranslate2 n'offre pas d'arrêt sur condition : max_new_tokens borne le décodage
+        et le texte est coupé après la première commande complète (répétition comprise).
+        Sans commande reconnue, le texte brut est retourné.
+        """
+        segments, _ = model.transcribe(
+            audio,
+            language="en",
+            beam_size=beam_size,
+            vad_filter=False,
+            initial_prompt=" ".join(self.phrases),
+            condition_on_previous_text=False,
+            without_timestamps=True,
+            # faster-whisper complète la liste sur place : on lui passe une copie
+            suppress_tokens=list(self.suppress_tokens),
+            max_new_tokens=self.max_new_tokens,
+            no_speech_threshold=0.5,
+            temperature=0
+        )
+        # Premier segment seulement : les fenêtres suivantes ne sont pas décodées
+        for segment in segments:
+            command = self.registry.first_command(segment.text)
+            return segment.text if command is None else command
+        return ""
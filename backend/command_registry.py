@@ -0,0 +1,103 @@
+# command_registry.py - Table de commandes vocales compilée en trie de mots
+
+from config import *
+
+# Nombres reconnus pour les répétitions ("left three times", "up x2")
+NUMBER_WORDS = {
+    'once': 1, 'twice': 2, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+REPEAT_WORDS = ['times', 'time']
+
+def tokenize(text):
+    """Découpe un texte en mots minuscules, sans ponctuation"""
+    return "".join(c if c.isalnum() or c.isspace() else " " for c in text.lower()).split()
+
+def _parse_number(word):
+    if word in NUMBER_WORDS:
+        return NUMBER_WORDS[word]
+    if word.startswith('x') and word[1:].isdigit():
+        return int(word[1:])
+    if word.isdigit():
+        return int(word)
+    return None
+
+class CommandRegistry:
+    """Associe des phrases à des actions, avec une recherche en un seul passage sur le texte"""
+
+    def __init__(self, bindings=VOICE_BINDINGS):
+        self.root = {}
+        self.actions = {}
+        self.max_phrase_words = 0
+        for phrase, action in bindings.items():
+            self.register(phrase, action)
+
+    def register(self, phrase, action):
+        """Ajoute une phrase (ex. "left click") et son action (type, paramètre)"""
+        words = tokenize(phrase)
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        # La clé None marque la fin d'une phrase complète
+        node[None] = phrase
+        self.actions[phrase] = action
+        self.max_phrase_words = max(self.max_phrase_words, len(words))
+
+    def vocabulary(self):
+        """Tous les mots que peut contenir une commande, répétitions comprises"""
+        words = {word for phrase in self.actions for word in tokenize(phrase)}
+        digits = {str(n) for n in range(1, VOICE_MAX_REPEAT + 1)}
+        return sorted(words | set(NUMBER_WORDS) | digits | set(REPEAT_WORDS))
+
+    def match(self, text):
+        """Retourne (phrase, action, répétitions) pour la première commande du texte, ou None"""
+        found = self._find(tokenize(text))
+        if found is None:
+            return None
+        phrase, count, _, _ = found
+        return phrase, self.actions[phrase], count
+
+    def first_command(self, text):
+        """Mots de la première commande du texte, répétition comprise ("left click twice"), ou None"""
+        words = tokenize(text)
+        found = self._find(words)
+        if found is None:
+            return None
+        _, _, start, end = found
+        return " ".join(words[start:end])
+
+    def _find(self, words):
+        """Retourne (phrase, répétitions, début, fin) de la première commande, ou None
+
+        Chaque position ne descend le trie que sur max_phrase_words mots au plus :
+        le coût est linéaire en la longueur du texte, quel que soit le nombre de commandes.
+        """
+        for start in range(len(words)):
+            node = self.root
+            phrase = None
+            end = start
+            # Correspondance la plus longue à partir de cette position
+            for position in range(start, min(start + self.max_phrase_words, len(words))):
+                node = node.get(words[position])
+                if node is None:
+                    break
+                if None in node:
+                    phrase = node[None]
+                    end = position + 1
+            if phrase is not None:
+                count, n_words = self._repeat_count(words, end)
+                return phrase, count, start, end + n_words
+        return None
+
+    def _repeat_count(self, words, position):
+        """Lit un éventuel "<nombre> times" / "x<nombre>" après la commande, retourne (répétitions, mots lus)"""
+        if position >= len(words):
+            return 1, 0
+        count = _parse_number(words[position])
+        if count is None:
+            return 1, 0
+        # "three" seul ne suffit pas, sauf pour "once", "twice" et "x3"
+        has_suffix = position + 1 < len(words) and words[position + 1] in REPEAT_WORDS
+        if not (has_suffix or words[position] in ('once', 'twice') or words[position].startswith('x')):
+            return 1, 0
+        return max(1, min(count, VOICE_MAX_REPEAT)), 2 if has_suffix else 1
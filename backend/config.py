@@ -3,6 +3,17 @@
 # Paramètres de mouvement souris
 MOUSE_SPEED = 15
 MOUSE_ACCELERATION = 1.5
+MOVEMENT_RATE = 50          # Fréquence du mouvement continu (Hz)
+
+# Souris analogique (vitesse proportionnelle au gyro)
+MOUSE_ANALOG = False        # Remplace les 8 directions par un contrôle proportionnel
+ANALOG_RATE = 200           # Fréquence de mise à jour du curseur (Hz)
+ANALOG_FILTER_ALPHA = 0.3   # Lissage exponentiel du gyro (1 = pas de filtre)
+ANALOG_DEADZONE = 5         # Vitesse angulaire ignorée (deg/s)
+ANALOG_GAIN = 12.0          # Gain de la courbe de transfert
+ANALOG_EXPONENT = 1.5       # Exposant de la courbe (1 = linéaire)
+ANALOG_MAX_SPEED = 3000     # Vitesse max du curseur (px/s)
+ANALOG_SAMPLE_PERIOD = 1 / 52  # Période initiale des échantillons gyro (s)
 
 # Paramètres clavier
 KEY_REPEAT_DELAY = 0.1
@@ -20,10 +31,192 @@ GESTURE_END_THRESHOLD = 6    # Seuil pour terminer la détection d'un geste
 MIN_GESTURE_FRAMES = 5      # Nombre minimum de frames pour un geste valide
 MAX_GESTURE_FRAMES = 30     # Nombre maximum de frames pour un geste
 GESTURE_COOLDOWN_FRAMES = 10 # Temps de repos après un geste
+GESTURE_BUFFER_SIZE = 128   # Échantillons conservés pour la trajectoire d'un geste
+
+# Validation anticipée des gestes
+GESTURE_EARLY_COMMIT = False  # Émettre la direction au pic de vitesse plutôt qu'à l'arrêt de la tête
+EARLY_COMMIT_MIN_FRAMES = 3   # Frames minimum avant de pouvoir valider
+EARLY_COMMIT_PEAK_RATIO = 0.9 # Pic considéré passé quand la vitesse retombe sous ce rapport
+EARLY_COMMIT_CONFIDENCE = 0.6 # Part minimum des échantillons du geste dans la direction dominante
+LATENCY_HISTORY_SIZE = 100    # Délais début du geste -> émission conservés
+
+# Estimation du biais du gyroscope
+BIAS_ESTIMATION = True      # Soustraire le biais estimé au repos avant la classification
+BIAS_REST_THRESHOLD = 4     # Écart max à la moyenne rapide pour considérer la tête immobile (deg/s)
+BIAS_REST_FRAMES = 26       # Échantillons immobiles consécutifs avant d'adapter le biais
+BIAS_MAX_DEVIATION = 8      # Écart max au biais estimé : au-delà, c'est une rotation lente, pas du repos (deg/s)
+BIAS_FAST_ALPHA = 0.2       # Lissage de la moyenne rapide servant à détecter le repos
+BIAS_ALPHA = 0.01           # Vitesse d'adaptation du biais (par échantillon au repos)
+
+# Calibration des directions
+CALIBRATION_FILE = "calibration_data.json"  # Poses de référence de l'utilisateur
+CALIBRATION_POSE_DURATION = 3.0   # Durée d'enregistrement de chaque pose (s)
+CALIBRATION_ACTIVE_FRACTION = 0.5 # Part du pic du geste au-dessus de laquelle un échantillon est gardé
+CALIBRATION_REGULARIZATION = 1.0  # Ajout à la diagonale de la covariance (deg/s)²
+CALIBRATION_PREPARE_TIME = 1.5   # Temps pour lire la consigne avant chaque pose (s)
+CALIBRATION_PULL_TIMEOUT = 0.05  # Attente max d'un bloc gyro pendant la calibration (s)
+CALIBRATION_OUTLIER_MAD = 3.5    # Écart robuste (en MAD) au-delà duquel un échantillon est rejeté
+CALIBRATION_MEDIAN_WINDOW = 5    # Médiane glissante (impair) pour trouver le pic du geste malgré les pics isolés
+CALIBRATION_MIN_SAMPLES = 6      # Échantillons minimum par pose (l'aller d'un geste dure ~0,3 s)
+PROFILE_DIR = "profiles"         # Profils de calibration par utilisateur
+ACTIVE_PROFILE_FILE = "active"   # Dernier profil utilisé (dans PROFILE_DIR)
+DEFAULT_PROFILE = "default"      # Profil utilisé sans nom
+
+# Gestes par gabarits (DTW)
+GESTURE_TEMPLATES = True        # Reconnaître les gestes enregistrés par l'utilisateur
+GESTURE_TEMPLATE_DIR = "gesture_templates"  # Gabarits : <dossier>/<geste>/*.npy
+GESTURE_TEMPLATE_LENGTH = 32    # Points après rééchantillonnage d'un geste
+GESTURE_DTW_WINDOW = 4          # Largeur de la bande de Sakoe-Chiba (points)
+GESTURE_ACCEPT_DISTANCE = 15.0  # Distance RMS max pour accepter un gabarit (deg/s)
+GESTURE_END_FRAMES = 8          # Frames de calme qui terminent un geste quand des gabarits sont chargés
+
+# Gestes -> (action, paramètre), comme VOICE_BINDINGS ("tap" ou "click")
+# Un gabarit nommé comme une direction ("GAUCHE"...) donne directement cette direction
+GESTURE_BINDINGS = {
+    "NOD": ("tap", "space"),
+    "SHAKE": ("tap", "esc"),
+    "DOUBLE TILT": ("click", "right"),
+}
+
+# Suivi par orientation (fusion ACC + GYRO)
+TRACKER_MODE = "gyro"       # "gyro" : vitesse angulaire, "tilt" : inclinaison absolue
+FUSION_HORIZONTAL_AXIS = "yaw"  # Gauche/droite : "yaw" (tourner la tête) ou "roll" (pencher)
+FUSION_ACC_SIGN = (1, 1)    # Signes (horizontal, vertical) de l'ACC pour suivre ceux du gyro
+FUSION_TIME_CONSTANT = 0.5  # Constante du filtre complémentaire (s)
+FUSION_LEAK_TIME_CONSTANT = 3.0  # Retour au neutre d'un axe sans référence ACC (s)
+FUSION_MAX_DT = 0.1         # Écart max entre deux échantillons intégrés (s)
+TILT_THRESHOLD = 10         # Inclinaison pour entrer dans une direction (deg)
+TILT_RETURN_THRESHOLD = 6   # Inclinaison sous laquelle on revient au centre (deg)
+TILT_DIAGONAL_THRESHOLD = 12  # Inclinaison sur les deux axes pour une diagonale (deg)
+
+# Plusieurs casques (un joueur par casque)
+MULTI_HEADSET = True        # Une chaîne de suivi par flux GYRO détecté, chacune dans son processus
+MAX_HEADSETS = 4            # Nombre max de casques connectés
+HEADSET_DISCOVERY_TIMEOUT = 2.0  # Attente du premier flux GYRO (s)
+HEADSET_DISCOVERY_SETTLE = 0.5   # Recherche complémentaire tant que de nouveaux casques apparaissent (s)
+PLAYER_MODE = "keyboard"    # Mode de contrôle des joueurs quand plusieurs casques sont actifs
+# Touches de chaque joueur (dans l'ordre des casques) : direction -> touche pynput ou caractère
+PLAYER_KEY_BINDINGS = [
+    {"GAUCHE": "left", "DROITE": "right", "HAUT": "up", "BAS": "down"},
+    {"GAUCHE": "q", "DROITE": "d", "HAUT": "z", "BAS": "s"},
+    {"GAUCHE": "j", "DROITE": "l", "HAUT": "i", "BAS": "k"},
+    {"GAUCHE": "f", "DROITE": "h", "HAUT": "t", "BAS": "g"},
+]
+PLAYER_PROFILES = []        # Profil de calibration de chaque joueur (vide : profil actif pour tous)
 
 # Actions au centre
 CENTER_HOLD_TIME = 0.5  # Temps avant action au centre
 CENTER_COOLDOWN = 1.0   # Cooldown après action
 
+# Ingestion du flux GYRO
+GYRO_SRATE = 52             # Fréquence d'échantillonnage du gyro du Muse (Hz)
+GYRO_PULL_TIMEOUT = 0.01    # Attente max d'un pull_chunk (s)
+GYRO_MAX_CHUNK = 256        # Nombre max d'échantillons lus par réveil
+GYRO_MAX_BACKLOG = 16       # Échantillons conservés au plus par lot (les plus récents)
+GYRO_MAX_SAMPLE_AGE = 0.1   # Âge max d'un échantillon avant d'être ignoré (s)
+
+# Runtime asyncio (ingestion, suivi, contrôles, voix et touches sur une seule boucle)
+ASYNC_RUNTIME = True        # False : anciens threads (boucle d'enregistrement, mouvement, voix)
+RUNTIME_QUEUE_SIZE = 4      # Lots en attente entre deux étapes (au-delà, l'étape amont attend)
+RUNTIME_KEY_QUEUE_SIZE = 16 # Touches en attente (au-delà, elles sont ignorées)
+RUNTIME_WORKERS = 4         # Threads pour les appels bloquants (pylsl, pynput)
+RUNTIME_VOICE_POLL = 0.02   # Intervalle de lecture des commandes vocales (s)
+RUNTIME_RETRY_DELAY = 0.1   # Attente avant de relire un flux en erreur, doublée à chaque échec (s)
+RUNTIME_RETRY_MAX_DELAY = 2.0  # Attente max entre deux essais (s)
+
+# Enregistrement des sessions
+SESSION_RECORDING = False        # Enregistrer les flux du Muse pendant le contrôle (remplit le disque)
+SESSION_DIR = "sessions"         # Dossier des sessions enregistrées
+SESSION_STREAMS = ["EEG", "ACC", "GYRO"]  # Flux LSL à enregistrer
+SESSION_RESOLVE_TIMEOUT = 1.0    # Attente max pour trouver chaque flux (s)
+SESSION_MAX_BUFLEN = 10          # Buffer LSL de chaque inlet d'enregistrement (s)
+SESSION_CHUNK_SAMPLES = 1024     # Taille des blocs écrits sur disque
+SESSION_FLUSH_INTERVAL = 1.0     # Écriture forcée des buffers (s)
+SESSION_POLL_INTERVAL = 0.05     # Période de lecture des flux (s)
+SESSION_INDEX_STRIDE = 256       # Pas de l'index temporel (échantillons)
+
+# Rejeu de traces gyro
+REPLAY_SRATE = 52                # Fréquence du gyro du Muse (Hz)
+REPLAY_CHUNK_SAMPLES = 64        # Taille des blocs en mode "aussi vite que possible"
+REPLAY_CONSUMER_TIMEOUT = 10.0   # Attente max de la connexion du pipeline (s)
+REPLAY_DRAIN_TIME = 0.5          # Temps laissé au pipeline pour finir le buffer (s)
+REPLAY_DRAIN_TIMEOUT = 30.0     # Attente max de la fin du traitement de la trace (s)
+REPLAY_MAX_IN_FLIGHT = 4096     # Échantillons publiés d'avance au plus, sans rythme réel
+
+# Contrôle vocal
+VOICE_SAMPLERATE = 16000            # Fréquence d'échantillonnage du micro (Hz)
+VOICE_BLOCK_DURATION = 0.1          # Durée d'un bloc capturé (s)
+VOICE_DEVICE = 1                    # Périphérique d'entrée sounddevice
+VOICE_RING_SECONDS = 5.0            # Capacité de l'anneau audio partagé (s)
+AUDIO_QUEUE_POLICY = "drop_oldest"  # Débordement : "drop_oldest" ou "drop_newest"
+VOICE_WORKER_POLL = 0.01            # Attente du processus de reconnaissance quand l'anneau est vide (s)
+VOICE_WORKER_READY_TIMEOUT = 120    # Attente max du chargement du modèle (s)
+VOICE_COMMAND_QUEUE_SIZE = 32       # Commandes reconnues en attente d'exécution
+
+# Segmentation des énoncés (VAD)
+VAD_FRAME_MS = 30           # Durée d'une trame d'analyse (ms)
+VAD_SPEECH_RATIO = 3.0      # Énergie de parole par rapport au plancher de bruit
+VAD_MIN_RMS = 0.01          # Énergie minimale d'une trame de parole
+VAD_FLOOR_FALL = 0.2        # Adaptation du plancher quand le bruit baisse
+VAD_FLOOR_RISE = 0.01       # Adaptation du plancher quand le bruit monte
+VAD_FLOOR_WINDOW = 1.5      # Fenêtre du minimum d'énergie qui relève le plancher sous un bruit continu (s)
+VAD_START_FRAMES = 3        # Trames de parole consécutives pour ouvrir un énoncé
+VAD_PRE_ROLL_FRAMES = 10    # Trames conservées avant le début détecté
+VAD_HANGOVER_FRAMES = 10    # Trames de silence avant de fermer un énoncé
+VAD_MIN_SPEECH_FRAMES = 5   # Énoncés plus courts ignorés
+VAD_MAX_UTTERANCE = 3.0     # Durée max d'un énoncé (s)
+
+# Modèle Whisper
+WHISPER_MODEL_SIZE = "tiny"     # Taille du modèle faster-whisper
+WHISPER_COMPUTE_TYPE = "int8"   # Type de calcul CTranslate2
+WHISPER_CPU_THREADS = 0         # Threads de décodage (0 = cœurs disponibles - 1)
+
+# Choix adaptatif du modèle (du plus rapide au plus précis)
+VOICE_ADAPTIVE_TIERS = False        # Changer de palier selon la latence mesurée (télécharge base/small en cours de session)
+VOICE_MODEL_TIERS = [
+    {"model": "tiny", "compute_type": "int8", "beam_size": 1},
+    {"model": "base", "compute_type": "int8", "beam_size": 1},
+    {"model": "base", "compute_type": "int8", "beam_size": 3},
+    {"model": "small", "compute_type": "int8", "beam_size": 1},
+]
+VOICE_LATENCY_BUDGET = 0.5          # Latence de commande visée (s)
+VOICE_MAX_BACKLOG = 1.0             # Audio en attente au-delà duquel on accélère (s)
+VOICE_TIER_UPGRADE_HEADROOM = 0.4   # Monter de palier si la latence < budget × ce facteur
+VOICE_TIER_UPGRADE_DECODES = 10     # Décodages rapides consécutifs avant de monter
+VOICE_TIER_COOLDOWN_DECODES = 5     # Décodages ignorés après un changement de palier
+VOICE_TIER_EMA_ALPHA = 0.3          # Lissage des mesures
+
+# Décodage restreint aux commandes
+VOICE_CONSTRAINED_DECODING = False  # Limiter Whisper au vocabulaire des commandes (à valider sur un modèle avant de l'activer)
+
+# Commandes vocales : phrase -> (action, paramètre)
+#   tap / hold : touche pynput ("up", "space") ou caractère ("e")
+#   click : bouton de souris ("left", "right")
+#   release_all, keyboard_on, keyboard_off : sans paramètre
+VOICE_BINDINGS = {
+    "up": ("tap", "up"),
+    "top": ("tap", "up"),  # Whisper entend souvent "top" pour "up"
+    "down": ("tap", "down"),
+    "left": ("tap", "left"),
+    "right": ("tap", "right"),
+    "left click": ("click", "left"),
+    "right click": ("click", "right"),
+    "inventory": ("tap", "e"),
+    "stop": ("release_all", None),
+    "keyboard on": ("keyboard_on", None),
+    "keyboard off": ("keyboard_off", None),
+}
+VOICE_MAX_REPEAT = 10       # Répétitions max d'une commande ("left three times")
+VOICE_REPEAT_DELAY = 0.1    # Délai entre deux répétitions (s)
+
+# Spotter de mots-clés (avant Whisper)
+KWS_ENABLED = True              # Reconnaître les commandes par gabarits avant Whisper
+KWS_TEMPLATE_DIR = "kws_templates"  # Gabarits enregistrés : <dossier>/<commande>/*.wav
+KWS_FRAME_MS = 30               # Fenêtre MFCC (ms)
+KWS_HOP_MS = 20                 # Pas MFCC (ms)
+KWS_ACCEPT_DISTANCE = 2.0       # Distance DTW max pour accepter une commande
+KWS_MARGIN = 1.25               # Écart requis avec la deuxième commande la plus proche
+KWS_MAX_LENGTH_RATIO = 2.0      # Rapport de durée max énoncé/gabarit
+
 # Mode par défaut
 DEFAULT_MODE = "mouse"
\ No newline at end of file
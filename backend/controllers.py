@@ -1,18 +1,51 @@
-from pynput.mouse import Controller as MouseController, Button
-from pynput.keyboard import Controller as KeyboardController, Key
 import threading
 import time
 from config import *
 
+# pynput n'est importé qu'à la création des contrôleurs réels : avec un backend
+# d'enregistrement (rejeu, benchmark), ce module tourne sans serveur X
+
+def resolve_key(name):
+    """Nom de touche de la configuration ("up", "space", "e") vers une touche pynput"""
+    if len(name) == 1:
+        return name
+    try:
+        from pynput.keyboard import Key
+    except ImportError:
+        return name  # Sans affichage : le nom suffit au backend d'enregistrement
+    return getattr(Key, name)
+
+def resolve_button(name):
+    """Nom de bouton ("left", "right") vers un bouton pynput"""
+    try:
+        from pynput.mouse import Button
+    except ImportError:
+        return name
+    return getattr(Button, name)
+
 class MouseControl:
     """Gère le contrôle de la souris"""
     
-    def __init__(self):
-        self.mouse = MouseController()
+    def __init__(self, mouse=None):
+        if mouse is None:
+            from pynput.mouse import Controller as MouseController
+            mouse = MouseController()
+        self.mouse = mouse
         self.speed_multiplier = 1.0
         self.last_click_time = 0
         self.current_direction = 'CENTRE'
         
+        # Mode analogique : gyro filtré, vitesse interpolée (px/s) et reste sous-pixel
+        self.filtered_x = 0.0
+        self.filtered_y = 0.0
+        self.velocity_from = (0.0, 0.0)
+        self.velocity_to = (0.0, 0.0)
+        self.velocity_changed_at = 0.0
+        self.sample_period = ANALOG_SAMPLE_PERIOD
+        self.last_sample_time = None
+        self.residual_x = 0.0
+        self.residual_y = 0.0
+        
     def move(self, direction):
         """Déplace la souris selon la direction"""
         if direction == 'CENTRE':
@@ -50,11 +83,83 @@ class MouseControl:
         if self.speed_multiplier < MOUSE_ACCELERATION:
             self.speed_multiplier += 0.05
     
+    def set_analog_input(self, gyro_x, gyro_y, timestamp=None):
+        """Met à jour la vitesse cible à partir d'un échantillon gyro, retourne True si le curseur bouge
+        
+        timestamp : horodatage LSL de l'échantillon, pour estimer la période du capteur.
+        """
+        now = time.perf_counter()
+        
+        # Filtre passe-bas exponentiel sur le vecteur gyro
+        self.filtered_x += ANALOG_FILTER_ALPHA * (gyro_x - self.filtered_x)
+        self.filtered_y += ANALOG_FILTER_ALPHA * (gyro_y - self.filtered_y)
+        
+        # Période d'échantillonnage estimée sur les horodatages LSL : les échantillons
+        # d'un même lot arrivent ensemble, l'horloge locale ne la mesure pas
+        if timestamp is not None:
+            if self.last_sample_time is not None:
+                elapsed = timestamp - self.last_sample_time
+                if 0 < elapsed < ANALOG_SAMPLE_PERIOD * 4:
+                    self.sample_period += 0.1 * (elapsed - self.sample_period)
+            self.last_sample_time = timestamp
+        
+        self.velocity_from = self.get_analog_velocity(now)
+        self.velocity_to = self._transfer(self.filtered_x, self.filtered_y)
+        self.velocity_changed_at = now
+        return self.velocity_from != (0.0, 0.0) or self.velocity_to != (0.0, 0.0)
+    
+    def _transfer(self, gyro_x, gyro_y):
+        """Courbe de transfert : vitesse angulaire (deg/s) vers vitesse du curseur (px/s)"""
+        # Valeurs inversées pour correspondre à l'intuition, comme en mode discret
+        h = -gyro_x
+        v = -gyro_y
+        magnitude = (h**2 + v**2)**0.5
+        if magnitude <= ANALOG_DEADZONE:
+            return (0.0, 0.0)
+        
+        speed = min(ANALOG_GAIN * (magnitude - ANALOG_DEADZONE)**ANALOG_EXPONENT, ANALOG_MAX_SPEED)
+        return (speed * h / magnitude, speed * v / magnitude)
+    
+    def get_analog_velocity(self, now):
+        """Vitesse interpolée linéairement entre les deux derniers échantillons"""
+        ratio = min(max((now - self.velocity_changed_at) / self.sample_period, 0.0), 1.0)
+        (from_x, from_y), (to_x, to_y) = self.velocity_from, self.velocity_to
+        return (from_x + ratio * (to_x - from_x), from_y + ratio * (to_y - from_y))
+    
+    def move_analog(self, dt):
+        """Déplace le curseur de la vitesse courante pendant dt secondes"""
+        velocity_x, velocity_y = self.get_analog_velocity(time.perf_counter())
+        
+        # Accumulation sous-pixel : on ne déplace que des pixels entiers
+        self.residual_x += velocity_x * dt
+        self.residual_y += velocity_y * dt
+        dx = int(self.residual_x)
+        dy = int(self.residual_y)
+        self.residual_x -= dx
+        self.residual_y -= dy
+        
+        if dx or dy:
+            current_x, current_y = self.mouse.position
+            try:
+                self.mouse.position = (current_x + dx, current_y + dy)
+            except:
+                pass  # Ignorer si on sort de l'écran
+    
+    def reset_analog(self):
+        """Réinitialise l'état du mode analogique"""
+        self.filtered_x = 0.0
+        self.filtered_y = 0.0
+        self.velocity_from = (0.0, 0.0)
+        self.velocity_to = (0.0, 0.0)
+        self.residual_x = 0.0
+        self.residual_y = 0.0
+        self.last_sample_time = None
+    
     def click(self):
         """Effectue un clic gauche"""
         current_time = time.time()
         if current_time - self.last_click_time > CENTER_COOLDOWN:
-            self.mouse.click(Button.left)
+            self.mouse.click(resolve_button('left'))
             self.last_click_time = current_time
             return True
         return False
@@ -70,8 +175,13 @@ class MouseControl:
 class KeyboardControl:
     """Gère le contrôle du clavier"""
     
-    def __init__(self):
-        self.keyboard = KeyboardController()
+    def __init__(self, keyboard=None, bindings=None):
+        if keyboard is None:
+            from pynput.keyboard import Controller as KeyboardController
+            keyboard = KeyboardController()
+        self.keyboard = keyboard
+        # Direction -> touche ; le premier joueur garde les flèches
+        self.bindings = bindings or PLAYER_KEY_BINDINGS[0]
         self.last_key_time = 0
         self.pending_directions = []
         self.has_gesture_processed = False
@@ -101,40 +211,18 @@ class KeyboardControl:
     
     def _execute_keyboard_action(self, direction):
         """Exécute l'action clavier en fonction de la direction"""
-        if direction == 'GAUCHE':
-            self.keyboard.tap(Key.left)
-            print("⌨️ Touche: GAUCHE")
-        elif direction == 'DROITE':
-            self.keyboard.tap(Key.right)
-            print("⌨️ Touche: DROITE")
-        elif direction == 'HAUT':
-            self.keyboard.tap(Key.up)
-            print("⌨️ Touche: HAUT")
-        elif direction == 'BAS':
-            self.keyboard.tap(Key.down)
-            print("⌨️ Touche: BAS")
-        # elif direction == 'GAUCHE HAUT':
-        #     self.keyboard.tap(Key.left)
-        #     self.keyboard.tap(Key.up)
-        #     print("⌨️ Touche: GAUCHE+HAUT")
-        # elif direction == 'GAUCHE BAS':
-        #     self.keyboard.tap(Key.left)
-        #     self.keyboard.tap(Key.down)
-        #     print("⌨️ Touche: GAUCHE+BAS")
-        # elif direction == 'DROITE HAUT':
-        #     self.keyboard.tap(Key.right)
-        #     self.keyboard.tap(Key.up)
-        #     print("⌨️ Touche: DROITE+HAUT")
-        # elif direction == 'DROITE BAS':
-        #     self.keyboard.tap(Key.right)
-        #     self.keyboard.tap(Key.down)
-        #     print("⌨️ Touche: DROITE+BAS")
+        # Les diagonales n'ont pas de touche, sauf si les bindings en prévoient une
+        key = self.bindings.get(direction)
+        if key is None:
+            return
+        self.keyboard.tap(resolve_key(key))
+        print(f"⌨️ Touche: {direction}")
     
     def press_space(self):
         """Appuie sur la barre espace"""
         current_time = time.time()
         if current_time - self.last_key_time > KEY_REPEAT_DELAY:
-            self.keyboard.tap(Key.space)
+            self.keyboard.tap(resolve_key('space'))
             self.last_key_time = current_time
             return True
         return False
@@ -147,33 +235,50 @@ class KeyboardControl:
 class ControlManager:
     """Gestionnaire principal des contrôles"""
     
-    def __init__(self):
-        self.mouse_control = MouseControl()
-        self.keyboard_control = KeyboardControl()
+    def __init__(self, mouse=None, keyboard=None, key_bindings=None):
+        # mouse/keyboard : contrôleurs pynput de remplacement (ex. backend d'enregistrement)
+        self.mouse_control = MouseControl(mouse)
+        self.keyboard_control = KeyboardControl(keyboard, key_bindings)
         self.current_mode = DEFAULT_MODE
+        self.analog_mouse = MOUSE_ANALOG
         self.movement_active = False
+        self.analog_active = False
         self.current_direction = 'CENTRE'
         self.last_gesture_direction = None
         self.is_running = False
         self.movement_thread = None
+        # Sortie, mouvement et touches peuvent venir de threads différents : un seul à la fois
+        self.lock = threading.RLock()
+        # Réveille la boucle de mouvement dès qu'une direction change
+        self.wake_event = threading.Event()
+        # Réveil supplémentaire (ex. événement asyncio du runtime), appelé depuis n'importe quel thread
+        self.on_wake = None
+        # État de la boucle de mouvement entre deux pas
+        self.next_deadline = None
+        self.last_tick = None
         
-    def start(self):
-        """Démarre le gestionnaire de contrôles"""
+    def start(self, run_thread=True):
+        """Démarre le gestionnaire de contrôles (run_thread=False : movement_step est appelé par le runtime)"""
         self.is_running = True
-        self.movement_thread = threading.Thread(target=self._movement_loop, daemon=True)
-        self.movement_thread.start()
+        if run_thread:
+            self.movement_thread = threading.Thread(target=self._movement_loop, daemon=True)
+            self.movement_thread.start()
         
     def stop(self):
         """Arrête le gestionnaire de contrôles"""
         self.is_running = False
+        self._wake()
         if self.movement_thread:
             self.movement_thread.join(timeout=1)
             
     def set_mode(self, mode):
         """Change le mode de contrôle"""
-        self.current_mode = mode
-        self.mouse_control.reset_acceleration()
-        self.keyboard_control.reset()
+        with self.lock:
+            self.current_mode = mode
+            self.mouse_control.reset_acceleration()
+            self.mouse_control.reset_analog()
+            self.analog_active = False
+            self.keyboard_control.reset()
         
     def get_mode(self):
         """Retourne le mode actuel"""
@@ -181,32 +286,102 @@ class ControlManager:
         
     def update_direction(self, direction):
         """Met à jour la direction actuelle"""
-        # Détecter les changements de direction
-        direction_changed = (self.current_direction != direction)
-        
-        if direction_changed and direction != 'CENTRE':
-            # Nouvelle direction non-centre détectée
-            self.last_gesture_direction = direction
+        with self.lock:
+            # Détecter les changements de direction
+            direction_changed = (self.current_direction != direction)
             
-        self.current_direction = direction
-        self.movement_active = (direction != 'CENTRE')
+            if direction_changed and direction != 'CENTRE':
+                # Nouvelle direction non-centre détectée
+                self.last_gesture_direction = direction
+                
+            self.current_direction = direction
+            self.movement_active = (direction != 'CENTRE')
+            
+            # En mode clavier, gérer immédiatement les changements
+            # pour réduire la latence des actions
+            if self.current_mode == "keyboard" and direction_changed:
+                self.keyboard_control.press_keys(direction)
         
-        # En mode clavier, gérer immédiatement les changements
-        # pour réduire la latence des actions
-        if self.current_mode == "keyboard" and direction_changed:
-            self.keyboard_control.press_keys(direction)
+        if direction_changed:
+            self._wake()
             
+    def update_motion(self, gyro_x, gyro_y, timestamp=None):
+        """Met à jour la vitesse du curseur en mode souris analogique"""
+        with self.lock:
+            if not (self.analog_mouse and self.current_mode == "mouse"):
+                return
+            
+            was_active = self.analog_active
+            self.analog_active = self.mouse_control.set_analog_input(gyro_x, gyro_y, timestamp)
+        if self.analog_active and not was_active:
+            self._wake()
+    
+    def _is_moving(self):
+        """Indique si la boucle de mouvement a du travail"""
+        if self.analog_mouse and self.current_mode == "mouse":
+            return self.analog_active
+        return self.movement_active
+    
+    def _wake(self):
+        self.wake_event.set()
+        if self.on_wake:
+            self.on_wake()
+    
     def _movement_loop(self):
-        """Boucle principale de mouvement"""
+        """Boucle de mouvement pilotée par événements et échéances"""
+        woken = False
         while self.is_running:
-            if self.movement_active:
+            # Effacer avant de lire l'état : un changement arrivé ensuite réveillera le prochain wait
+            self.wake_event.clear()
+            timeout = self.movement_step(woken)
+            woken = self.wake_event.wait(timeout=timeout)
+    
+    def movement_step(self, woken):
+        """Un pas de mouvement ; retourne l'attente avant le prochain (None : jusqu'au prochain réveil)"""
+        with self.lock:
+            analog = self.analog_mouse and self.current_mode == "mouse"
+            period = 1.0 / (ANALOG_RATE if analog else MOVEMENT_RATE)
+        
+            if not self._is_moving():
+                # Tête au centre : dormir jusqu'au prochain changement de direction
+                self.mouse_control.reset_acceleration()
+                self.next_deadline = None
+                self.last_tick = None
+                return None
+            
+            now = time.perf_counter()
+            if analog:
+                # Mouvement continu à haute fréquence, interpolé entre les échantillons
+                self.mouse_control.move_analog(now - self.last_tick if self.last_tick else period)
+                self.last_tick = now
+                self.next_deadline = now + period
+            elif self.next_deadline is None or woken or now >= self.next_deadline:
                 if self.current_mode == "mouse":
                     self.mouse_control.move(self.current_direction)
                 # Mode clavier géré directement dans update_direction pour être plus réactif
-            else:
-                self.mouse_control.reset_acceleration()
-                
-            time.sleep(0.02)  # 50 FPS
+            
+                # Nouvelle direction ou retard : on recale les échéances, sinon pas de dérive
+                if self.next_deadline is None or woken or now - self.next_deadline > period:
+                    self.next_deadline = now + period
+                else:
+                    self.next_deadline += period
+            
+            return max(self.next_deadline - time.perf_counter(), 0)
+            
+    def trigger_gesture(self, gesture):
+        """Exécute l'action associée à un geste reconnu par gabarit (GESTURE_BINDINGS)"""
+        action = GESTURE_BINDINGS.get(gesture)
+        if action is None:
+            print(f"👋 Geste {gesture} (sans action)")
+            return
+        
+        kind, target = action
+        with self.lock:
+            if kind == "tap":
+                self.keyboard_control.keyboard.tap(resolve_key(target))
+            elif kind == "click":
+                self.mouse_control.mouse.click(resolve_button(target))
+        print(f"👋 Geste {gesture}: {kind} {target}")
             
     def handle_center_action(self):
         """Gère l'action quand la tête est au centre"""
@@ -0,0 +1,133 @@
+# direction_classifier.py - Classifieur de direction appris à la calibration
+
+import json
+import os
+
+import numpy as np
+
+from config import *
+from head_tracker import DIRECTION_LABELS
+
+# Poses enregistrées dans le fichier de calibration -> direction de HeadTracker
+CALIBRATION_POSES = {
+    'center': 'CENTRE',
+    'right': 'DROITE',
+    'left': 'GAUCHE',
+    'down': 'BAS',
+    'up': 'HAUT',
+}
+
+# Sens du gyro (x, y) pendant l'aller de chaque geste : h = -x, v = -y (cf. HeadTracker._get_raw_movement)
+POSE_AXES = {
+    'DROITE': (-1.0, 0.0),
+    'GAUCHE': (1.0, 0.0),
+    'HAUT': (0.0, 1.0),
+    'BAS': (0.0, -1.0),
+}
+
+# Diagonales construites à partir des deux directions simples qui les composent
+DIAGONALS = {
+    'DROITE HAUT': ('DROITE', 'HAUT'),
+    'DROITE BAS': ('DROITE', 'BAS'),
+    'GAUCHE HAUT': ('GAUCHE', 'HAUT'),
+    'GAUCHE BAS': ('GAUCHE', 'BAS'),
+}
+
+class DirectionClassifier:
+    """Analyse discriminante linéaire sur les poses de calibration (gyro x, y)
+
+    Chaque direction a une fonction linéaire w·x + b précalculée : classer un
+    échantillon revient à 9 produits scalaires, quel que soit l'utilisateur.
+    Sans covariance, c'est un classifieur au centroïde le plus proche.
+    """
+
+    def __init__(self, centroids, covariance=None):
+        center = np.asarray(centroids['CENTRE'], dtype=np.float64)
+        means = dict(centroids)
+        for diagonal, (horizontal, vertical) in DIAGONALS.items():
+            if diagonal not in means:
+                means[diagonal] = np.asarray(means[horizontal]) + np.asarray(means[vertical]) - center
+
+        self.centroids = np.array([means[label] for label in DIRECTION_LABELS], dtype=np.float64)
+        self.covariance = np.eye(2) if covariance is None else np.asarray(covariance, dtype=np.float64)
+
+        # g_k(x) = μ_kᵀ Σ⁻¹ x - ½ μ_kᵀ Σ⁻¹ μ_k (classes équiprobables)
+        precision = np.linalg.pinv(self.covariance)
+        self.weights = self.centroids @ precision
+        self.biases = -0.5 * np.einsum('ij,ij->i', self.weights, self.centroids)
+
+    def classify(self, gyro_x, gyro_y):
+        """Retourne le code (indice dans DIRECTION_LABELS) d'un échantillon"""
+        w = self.weights
+        b = self.biases
+        best = 0
+        best_score = w[0, 0] * gyro_x + w[0, 1] * gyro_y + b[0]
+        for k in range(1, len(b)):
+            score = w[k, 0] * gyro_x + w[k, 1] * gyro_y + b[k]
+            if score > best_score:
+                best, best_score = k, score
+        return best
+
+    def classify_batch(self, gyro_x, gyro_y):
+        """Version vectorisée de classify pour des tableaux de même taille"""
+        scores = np.outer(gyro_x, self.weights[:, 0]) + np.outer(gyro_y, self.weights[:, 1]) + self.biases
+        return np.argmax(scores, axis=1)
+
+    @classmethod
+    def from_samples(cls, samples):
+        """Construit le classifieur à partir des échantillons bruts de chaque direction {label: N×2}"""
+        samples = {label: np.asarray(values, dtype=np.float64).reshape(-1, 2) for label, values in samples.items()}
+        centroids = {label: values.mean(axis=0) for label, values in samples.items()}
+
+        # Covariance commune (intra-classe), régularisée pour rester inversible
+        deviations = np.concatenate([values - centroids[label] for label, values in samples.items()])
+        covariance = np.cov(deviations, rowvar=False) if len(deviations) > 2 else np.eye(2)
+        covariance += CALIBRATION_REGULARIZATION * np.eye(2)
+        return cls(centroids, covariance)
+
+    def inconsistent_directions(self):
+        """Directions dont le centroïde n'est pas du côté attendu du centre (POSE_AXES)"""
+        center = self.centroids[DIRECTION_LABELS.index('CENTRE')]
+        return [label for label, axis in POSE_AXES.items()
+                if (self.centroids[DIRECTION_LABELS.index(label)] - center) @ np.asarray(axis) <= 0]
+
+    def to_dict(self):
+        """Format de calibration_data.json"""
+        data = {}
+        for pose, label in CALIBRATION_POSES.items():
+            x, y = self.centroids[DIRECTION_LABELS.index(label)]
+            data[pose] = {'x': round(float(x), 2), 'y': round(float(y), 2)}
+        data['covariance'] = np.round(self.covariance, 4).tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        centroids = {label: (data[pose]['x'], data[pose]['y']) for pose, label in CALIBRATION_POSES.items()}
+        return cls(centroids, data.get('covariance'))
+
+    def save(self, path=CALIBRATION_FILE):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path=CALIBRATION_FILE):
+        """Charge la calibration enregistrée, ou None si elle est absente, incomplète ou incohérente"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            classifier = cls.from_dict(data)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Calibration illisible ({path}): {e}")
+            return None
+
+        # Ancien format (poses au repos, sans covariance) : ses centroïdes ne décrivent pas les gestes
+        if 'covariance' not in data:
+            print(f"⚠️ Calibration d'un ancien format ignorée ({path}), recalibrez.")
+            return None
+        inconsistent = classifier.inconsistent_directions()
+        if inconsistent:
+            print(f"⚠️ Calibration ignorée ({path}): {', '.join(inconsistent)} dans le mauvais sens, recalibrez.")
+            return None
+        return classifier
@@ -0,0 +1,167 @@
+# gesture_templates.py - Reconnaissance de gestes par gabarits (DTW avec élagage LB_Keogh)
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from config import *
+
+def resample(trajectory, length=GESTURE_TEMPLATE_LENGTH):
+    """Ramène une trajectoire gyro (N×2) à une longueur fixe par interpolation linéaire"""
+    trajectory = np.asarray(trajectory, dtype=np.float64).reshape(-1, 2)
+    if len(trajectory) == 1:
+        return np.repeat(trajectory, length, axis=0)
+    source = np.linspace(0.0, 1.0, len(trajectory))
+    target = np.linspace(0.0, 1.0, length)
+    return np.stack([np.interp(target, source, trajectory[:, axis]) for axis in range(2)], axis=1)
+
+def envelope(series, window):
+    """Enveloppes (haute, basse) d'une série sur une fenêtre de ±window points"""
+    padded = np.pad(series, ((window, window), (0, 0)), mode='edge')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1, axis=0)
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+def lb_keogh(query, upper, lower):
+    """Borne inférieure de la DTW entre query (L×2) et chaque gabarit d'enveloppes (K×L×2)"""
+    above = np.maximum(query - upper, 0.0)
+    below = np.maximum(lower - query, 0.0)
+    return np.sum(above * above + below * below, axis=(1, 2))
+
+def dtw_distance(query, template, window, best_so_far=float('inf')):
+    """DTW (somme des carrés) dans une bande de Sakoe-Chiba, abandonnée dès qu'elle dépasse best_so_far"""
+    n = len(query)
+    qx, qy = query[:, 0].tolist(), query[:, 1].tolist()
+    tx, ty = template[:, 0].tolist(), template[:, 1].tolist()
+    inf = float('inf')
+
+    previous = [inf] * (n + 1)
+    previous[0] = 0.0
+    for i in range(1, n + 1):
+        current = [inf] * (n + 1)
+        row_min = inf
+        x, y = qx[i - 1], qy[i - 1]
+        for j in range(max(1, i - window), min(n, i + window) + 1):
+            dx = x - tx[j - 1]
+            dy = y - ty[j - 1]
+            best = previous[j - 1]
+            if previous[j] < best:
+                best = previous[j]
+            if current[j - 1] < best:
+                best = current[j - 1]
+            cost = dx * dx + dy * dy + best
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        # Tous les chemins dépassent déjà le meilleur : inutile de continuer
+        if row_min >= best_so_far:
+            return inf
+        previous = current
+    return previous[n]
+
+class GestureRecognizer:
+    """Associe la trajectoire d'un geste au gabarit enregistré le plus proche"""
+
+    def __init__(self, template_dir=GESTURE_TEMPLATE_DIR):
+        self.names = []
+        self.templates = None  # K×L×2, rééchantillonnés
+        self.upper = None
+        self.lower = None
+        self.load_templates(template_dir)
+
+    def load_templates(self, template_dir):
+        """Charge les gabarits <template_dir>/<geste>/*.npy"""
+        if not os.path.isdir(template_dir):
+            return
+        templates = []
+        for folder in sorted(os.listdir(template_dir)):
+            gesture_dir = os.path.join(template_dir, folder)
+            if not os.path.isdir(gesture_dir):
+                continue
+            for name in sorted(os.listdir(gesture_dir)):
+                if name.endswith(".npy"):
+                    self.names.append(folder.replace("_", " "))
+                    templates.append(resample(np.load(os.path.join(gesture_dir, name))))
+        if not templates:
+            return
+
+        # Enveloppes précalculées une fois : la borne LB_Keogh ne coûte qu'une opération vectorisée
+        self.templates = np.stack(templates)
+        bounds = [envelope(template, GESTURE_DTW_WINDOW) for template in templates]
+        self.upper = np.stack([upper for upper, _ in bounds])
+        self.lower = np.stack([lower for _, lower in bounds])
+        print(f"👋 {len(templates)} gabarits de gestes chargés")
+
+    def is_ready(self):
+        """Indique si des gabarits sont disponibles"""
+        return self.templates is not None
+
+    def match(self, trajectory):
+        """Retourne (geste, distance) si un gabarit est assez proche, sinon (None, distance)
+
+        Les gabarits sont visités par borne inférieure croissante ; dès que la borne
+        dépasse la meilleure distance trouvée, les suivants ne peuvent plus gagner.
+        """
+        if self.templates is None:
+            return None, float('inf')
+
+        query = resample(trajectory)
+        length = len(query)
+        bounds = lb_keogh(query, self.upper, self.lower)
+
+        # Seuil d'acceptation comme meilleure distance initiale : élagage dès le premier gabarit
+        best = GESTURE_ACCEPT_DISTANCE ** 2 * length
+        best_index = None
+        for index in np.argsort(bounds).tolist():
+            if bounds[index] >= best:
+                break
+            distance = dtw_distance(query, self.templates[index], GESTURE_DTW_WINDOW, best)
+            if distance < best:
+                best, best_index = distance, index
+
+        # Distance RMS par point (deg/s)
+        distance = (best / length) ** 0.5
+        if best_index is None:
+            return None, distance
+        return self.names[best_index], distance
+
+def record_templates(gesture, template_dir=GESTURE_TEMPLATE_DIR, repetitions=5):
+    """Enregistre des gabarits d'un geste à partir du flux GYRO"""
+    from pylsl import StreamInlet, resolve_byprop
+    from head_tracker import HeadTracker
+    from profiles import load_active_classifier
+
+    streams = resolve_byprop("type", "GYRO", timeout=2)
+    if not streams:
+        print("❌ Flux GYRO introuvable.")
+        return
+    inlet = StreamInlet(streams[0])
+
+    gesture_dir = os.path.join(template_dir, gesture.replace(" ", "_"))
+    os.makedirs(gesture_dir, exist_ok=True)
+    # Même découpage et même correction du biais qu'à la reconnaissance, sans validation anticipée
+    head_tracker = HeadTracker(load_active_classifier())
+    head_tracker.gesture_end_frames = GESTURE_END_FRAMES
+    head_tracker.early_commit = False
+
+    for i in range(repetitions):
+        print(f"👋 Faites le geste « {gesture} » ({i + 1}/{repetitions})...")
+        head_tracker.last_gesture_trajectory = None
+        while head_tracker.last_gesture_trajectory is None:
+            data, _ = inlet.pull_chunk(timeout=0.1)
+            for sample in data:
+                head_tracker.update(sample[0], sample[1])
+                if head_tracker.last_gesture_trajectory is not None:
+                    break
+        path = os.path.join(gesture_dir, f"{int(time.time() * 1000)}.npy")
+        np.save(path, head_tracker.last_gesture_trajectory)
+        print(f"✅ {path} ({len(head_tracker.last_gesture_trajectory)} échantillons)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gabarits de gestes de la tête")
+    parser.add_argument("gesture", help="Nom du geste (ex. NOD, SHAKE)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--dir", default=GESTURE_TEMPLATE_DIR)
+    args = parser.parse_args()
+    record_templates(args.gesture, args.dir, args.repetitions)
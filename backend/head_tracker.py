@@ -1,32 +1,188 @@
 from collections import deque
+import numpy as np
 from config import *
+from sensor_fusion import GyroBiasEstimator
+
+# Ordre des codes renvoyés par _classify_batch
+DIRECTION_LABELS = ['CENTRE', 'DROITE', 'GAUCHE', 'BAS', 'HAUT',
+                    'DROITE HAUT', 'DROITE BAS', 'GAUCHE HAUT', 'GAUCHE BAS']
+DIRECTION_CODES = {label: code for code, label in enumerate(DIRECTION_LABELS)}
 
 class HeadTracker:
     """Gère le suivi de la position de la tête et la détection des mouvements"""
     
-    def __init__(self):
+    def __init__(self, classifier=None, gesture_recognizer=None):
+        # Classifieur calibré pour l'utilisateur (DirectionClassifier), sinon seuils globaux
+        self.classifier = classifier
+        # Gabarits de gestes de l'utilisateur (GestureRecognizer), optionnels
+        self.gesture_recognizer = gesture_recognizer
+        
+        # Biais du gyroscope soustrait avant la classification
+        self.bias_estimator = None
+        self.classifier_offset = (0.0, 0.0)
+        if BIAS_ESTIMATION:
+            # Avec une calibration, le repos de référence est le centre calibré
+            center = tuple(classifier.centroids[0]) if classifier is not None else (0.0, 0.0)
+            self.bias_estimator = GyroBiasEstimator(center)
+            self.classifier_offset = center
+        self.movement_threshold = MOVEMENT_THRESHOLD
+        self.return_threshold = RETURN_THRESHOLD
+        # Mode anticipé : valider un geste au pic de vitesse plutôt qu'à l'arrêt
+        self.early_commit = GESTURE_EARLY_COMMIT
+        # Avec des gabarits, un geste oscillant repasse par zéro sans être fini :
+        # il ne se termine qu'après un calme prolongé (l'enregistrement des gabarits fait de même)
+        templates_ready = gesture_recognizer is not None and gesture_recognizer.is_ready()
+        self.gesture_end_frames = GESTURE_END_FRAMES if templates_ready else 1
+        # Délais début du geste -> émission de la direction (s)
+        self.commit_latencies = deque(maxlen=LATENCY_HISTORY_SIZE)
+        
+        # Buffers alloués une fois : historique circulaire (x, y, code de direction)
+        # et trajectoire du geste en cours, une colonne par tableau
+        self.history_x = np.zeros(HISTORY_SIZE)
+        self.history_y = np.zeros(HISTORY_SIZE)
+        self.history_code = np.zeros(HISTORY_SIZE, dtype=np.int8)
+        self.gesture_x = np.zeros(GESTURE_BUFFER_SIZE)
+        self.gesture_y = np.zeros(GESTURE_BUFFER_SIZE)
+        self.direction_counts = [0] * len(DIRECTION_LABELS)
+        self.direction_first_seen = [0] * len(DIRECTION_LABELS)
+        
+        self.reset()
+        
+    def reset(self):
+        """Réinitialise le tracker (la calibration, le biais estimé et les buffers sont conservés)"""
         self.current_state = 'CENTRE'
-        self.movement_history = deque(maxlen=HISTORY_SIZE)  # Historique des mouvements
+        self.sample_count = 0
+        self.history_index = 0
+        self.history_count = 0
         self.last_significant_direction = 'CENTRE'
         self.return_to_center_mode = False
         self.stable_counter = 0
-        self.movement_threshold = MOVEMENT_THRESHOLD
-        self.return_threshold = RETURN_THRESHOLD
+        self.last_gesture_trajectory = None
+        self.pending_gestures = []
         
         # Nouveaux attributs pour la détection de geste complet
         self.gesture_in_progress = False
-        self.gesture_buffer = []
         self.gesture_start_time = 0
+        self.gesture_calm_frames = 0
+        self.gesture_onset = 0
         self.last_gesture_direction = 'CENTRE'
         self.gesture_cooldown = 0
+        self.commit_latencies.clear()
+        self._clear_gesture()
+        
+    def _clear_gesture(self):
+        """Vide le geste en cours sans réallouer ses buffers"""
+        self.gesture_length = 0
+        self.gesture_sum_x = 0.0
+        self.gesture_sum_y = 0.0
+        self.direction_counts[:] = [0] * len(DIRECTION_LABELS)
+        self.dominant_code = 0
+        self.dominant_count = 0
+        self.gesture_peak = 0.0
+        self.gesture_committed = False
+        
+    def _append_history(self, x, y, code):
+        index = self.history_index
+        self.history_x[index] = x
+        self.history_y[index] = y
+        self.history_code[index] = code
+        self.history_index = (self.history_index + 1) % HISTORY_SIZE
+        self.history_count = min(self.history_count + 1, HISTORY_SIZE)
+        
+    def _append_gesture(self, gyro_x, gyro_y, raw_movement):
+        """Ajoute un échantillon au geste et met à jour ses sommes et son histogramme en O(1)"""
+        if self.gesture_length < GESTURE_BUFFER_SIZE:
+            self.gesture_x[self.gesture_length] = gyro_x
+            self.gesture_y[self.gesture_length] = gyro_y
+        self.gesture_length += 1
+        self.gesture_sum_x += gyro_x
+        self.gesture_sum_y += gyro_y
+        
+        code = DIRECTION_CODES[raw_movement]
+        if code == 0:
+            return
+        counts = self.direction_counts
+        if counts[code] == 0:
+            self.direction_first_seen[code] = self.gesture_length
+        counts[code] += 1
+        # À égalité, la direction apparue la première l'emporte
+        if counts[code] > self.dominant_count or (
+                counts[code] == self.dominant_count
+                and self.direction_first_seen[code] < self.direction_first_seen[self.dominant_code]):
+            self.dominant_code = code
+            self.dominant_count = counts[code]
         
     def update(self, gyro_x, gyro_y):
         """Met à jour l'état basé sur les données du gyroscope"""
+        if self.bias_estimator is not None:
+            gyro_x, gyro_y = self.bias_estimator.update(gyro_x, gyro_y)
+        
         # Déterminer le mouvement brut
         raw_movement = self._get_raw_movement(gyro_x, gyro_y)
+        movement_magnitude = (gyro_x**2 + gyro_y**2)**0.5
+        return self._step(gyro_x, gyro_y, raw_movement, movement_magnitude)
+    
+    def update_batch(self, gyro):
+        """Met à jour l'état pour un lot d'échantillons (tableau N×2), retourne la suite des états"""
+        gyro = np.asarray(gyro, dtype=np.float64).reshape(-1, 2)
+        if self.bias_estimator is not None:
+            # L'estimateur est séquentiel, la suite reste vectorisée
+            gyro = np.array([self.bias_estimator.update(x, y) for x, y in gyro.tolist()]).reshape(-1, 2)
+        xs = gyro[:, 0]
+        ys = gyro[:, 1]
+        
+        # Classification et magnitude vectorisées, la machine à états reste séquentielle
+        codes = self._classify_batch(xs, ys)
+        magnitudes = np.sqrt(xs * xs + ys * ys)
+        
+        states = []
+        for gyro_x, gyro_y, code, magnitude in zip(xs.tolist(), ys.tolist(), codes.tolist(), magnitudes.tolist()):
+            states.append(self._step(gyro_x, gyro_y, DIRECTION_LABELS[code], magnitude))
+        return states
+    
+    def correct_gyro(self, gyro_x, gyro_y):
+        """Gyro corrigé du biais (estimé au repos, sinon centre calibré) avant intégration en mode "tilt" """
+        if self.bias_estimator is not None:
+            return self.bias_estimator.update(gyro_x, gyro_y)
+        if self.classifier is not None:
+            center_x, center_y = self.classifier.centroids[0].tolist()
+            return gyro_x - center_x, gyro_y - center_y
+        return gyro_x, gyro_y
+    
+    def update_orientation(self, horizontal, vertical):
+        """Met à jour l'état à partir de l'inclinaison de la tête (degrés, mode "tilt")
+
+        La direction est connue dès que l'inclinaison franchit le seuil, sans attendre
+        la fin du geste ; l'hystérésis évite les oscillations autour du seuil.
+        """
+        threshold = TILT_RETURN_THRESHOLD if self.current_state != 'CENTRE' else TILT_THRESHOLD
+        state = self._classify_tilt(horizontal, vertical, threshold)
         
+        self._append_history(horizontal, vertical, DIRECTION_CODES[state])
+        self.current_state = state
+        if state != 'CENTRE':
+            self.last_significant_direction = state
+        return state
+    
+    def _classify_tilt(self, h, v, threshold):
+        """Direction correspondant à une inclinaison (h > 0 à droite, v > 0 en bas)"""
+        # Diagonales
+        if abs(h) > TILT_DIAGONAL_THRESHOLD and abs(v) > TILT_DIAGONAL_THRESHOLD:
+            return ('DROITE' if h > 0 else 'GAUCHE') + (' BAS' if v > 0 else ' HAUT')
+        
+        # Directions simples
+        if abs(h) > abs(v):
+            if abs(h) > threshold:
+                return 'DROITE' if h > 0 else 'GAUCHE'
+        elif abs(v) > threshold:
+            return 'BAS' if v > 0 else 'HAUT'
+        return 'CENTRE'
+    
+    def _step(self, gyro_x, gyro_y, raw_movement, movement_magnitude):
+        """Fait avancer la machine à états d'un échantillon déjà classé"""
         # Ajouter à l'historique
-        self.movement_history.append((gyro_x, gyro_y, raw_movement))
+        self._append_history(gyro_x, gyro_y, DIRECTION_CODES[raw_movement])
+        self.sample_count += 1
         
         # Gérer les gestes complets
         if self.gesture_cooldown > 0:
@@ -34,11 +190,12 @@ class HeadTracker:
             return self.current_state
         
         # Détection de geste complet
-        gesture_result = self._process_gesture(gyro_x, gyro_y, raw_movement)
+        gesture_result = self._process_gesture(gyro_x, gyro_y, raw_movement, movement_magnitude)
         if gesture_result:
             self.current_state = gesture_result
             self.last_significant_direction = gesture_result
-            self.gesture_cooldown = GESTURE_COOLDOWN_FRAMES
+            # Validation anticipée : le repos commencera à la fin du geste, comme d'habitude
+            self.gesture_cooldown = 0 if self.gesture_in_progress else GESTURE_COOLDOWN_FRAMES
             return gesture_result
         
         # Si on est en mode retour au centre
@@ -80,68 +237,114 @@ class HeadTracker:
                     
         return self.current_state
     
-    def _process_gesture(self, gyro_x, gyro_y, raw_movement):
+    def _process_gesture(self, gyro_x, gyro_y, raw_movement, movement_magnitude):
         """Traite les données pour détecter un geste complet"""
-        movement_magnitude = (gyro_x**2 + gyro_y**2)**0.5
 
         # Début d'un geste (mouvement significatif)
         if not self.gesture_in_progress and movement_magnitude > GESTURE_START_THRESHOLD:
             self.gesture_in_progress = True
-            self.gesture_buffer = [(gyro_x, gyro_y, raw_movement)]
+            self._clear_gesture()
+            self._append_gesture(gyro_x, gyro_y, raw_movement)
             self.gesture_start_time = 0
+            self.gesture_calm_frames = 0
+            self.gesture_onset = self.sample_count
+            self.gesture_peak = movement_magnitude
             return None
 
         # Accumulation des données pendant le geste
         if self.gesture_in_progress:
-            self.gesture_buffer.append((gyro_x, gyro_y, raw_movement))
+            self._append_gesture(gyro_x, gyro_y, raw_movement)
             self.gesture_start_time += 1
             
-            # Fin du geste (retour au calme)
             if movement_magnitude < GESTURE_END_THRESHOLD:
+                self.gesture_calm_frames += 1
+            else:
+                self.gesture_calm_frames = 0
+            
+            # Mode anticipé : la direction est émise dès le pic de vitesse passé
+            if self.early_commit and not self.gesture_committed:
+                early_result = self._early_commit(movement_magnitude)
+                if early_result:
+                    return early_result
+            self.gesture_peak = max(self.gesture_peak, movement_magnitude)
+            
+            # Fin du geste (retour au calme)
+            if self.gesture_calm_frames >= self.gesture_end_frames:
+                if self.gesture_committed:
+                    # Direction déjà émise : seul le repos qui masque le retour de la tête reste à lancer
+                    self.gesture_in_progress = False
+                    self._clear_gesture()
+                    self.gesture_cooldown = GESTURE_COOLDOWN_FRAMES
+                    return None
                 if self.gesture_start_time >= MIN_GESTURE_FRAMES:
                     gesture_result = self._analyze_gesture_buffer()
                     self.gesture_in_progress = False
-                    self.gesture_buffer = []
+                    self._clear_gesture()
+                    if gesture_result:
+                        self._record_latency()
                     return gesture_result
                 elif self.gesture_start_time > MAX_GESTURE_FRAMES:
                     # Geste trop long, on l'annule
                     self.gesture_in_progress = False
-                    self.gesture_buffer = []
+                    self._clear_gesture()
             
         return None
     
+    def _early_commit(self, movement_magnitude):
+        """Direction du geste si le pic de vitesse est passé et que la direction est assez sûre"""
+        # Les gabarits ont besoin du geste entier
+        if self.gesture_recognizer is not None and self.gesture_recognizer.is_ready():
+            return None
+        if self.gesture_length < EARLY_COMMIT_MIN_FRAMES:
+            return None
+        if movement_magnitude > self.gesture_peak * EARLY_COMMIT_PEAK_RATIO:
+            return None
+        if not self.dominant_count or self.dominant_count / self.gesture_length < EARLY_COMMIT_CONFIDENCE:
+            return None
+        
+        self.gesture_committed = True
+        self._record_latency()
+        return DIRECTION_LABELS[self.dominant_code]
+    
+    def _record_latency(self):
+        self.commit_latencies.append((self.sample_count - self.gesture_onset) / GYRO_SRATE)
+    
     def _analyze_gesture_buffer(self):
-        """Analyse le buffer de geste pour déterminer la direction dominante"""
-        if not self.gesture_buffer:
+        """Analyse le geste pour déterminer la direction dominante (sommes et histogramme déjà à jour)"""
+        length = self.gesture_length
+        if not length:
             return None
-            
-        # Calculer la moyenne des valeurs de gyroscope
-        avg_x = sum(x for x, _, _ in self.gesture_buffer) / len(self.gesture_buffer)
-        avg_y = sum(y for _, y, _ in self.gesture_buffer) / len(self.gesture_buffer)
         
-        # Compter les directions
-        direction_counts = {}
-        for _, _, direction in self.gesture_buffer:
-            if direction != 'CENTRE':
-                direction_counts[direction] = direction_counts.get(direction, 0) + 1
+        # Trajectoire sans les échantillons de calme qui ont clos le geste
+        end = min(max(1, length - self.gesture_calm_frames), GESTURE_BUFFER_SIZE)
+        self.last_gesture_trajectory = np.column_stack((self.gesture_x[:end], self.gesture_y[:end]))
         
-        if not direction_counts:
+        # Gabarits d'abord : ils distinguent hochement, secousse, double inclinaison...
+        if self.gesture_recognizer is not None and self.gesture_recognizer.is_ready():
+            gesture, _ = self.gesture_recognizer.match(self.last_gesture_trajectory)
+            if gesture in DIRECTION_LABELS:
+                return gesture
+            if gesture is not None:
+                self.pending_gestures.append(gesture)
+                # Geste consommé : il ne doit pas laisser de direction derrière lui
+                return 'CENTRE'
+        
+        if not self.dominant_count:
             return None
-            
-        # Trouver la direction dominante
-        dominant_direction = max(direction_counts.items(), key=lambda x: x[1])
-        direction = dominant_direction[0]
-        count = dominant_direction[1]
         
         # Vérifier que la direction dominante représente au moins 40% des échantillons
-        if count / len(self.gesture_buffer) < 0.4:
+        if self.dominant_count / length < 0.4:
             # Si pas de direction clairement dominante, utiliser les moyennes
-            return self._get_raw_movement(avg_x, avg_y)
+            return self._get_raw_movement(self.gesture_sum_x / length, self.gesture_sum_y / length)
             
-        return direction
+        return DIRECTION_LABELS[self.dominant_code]
     
     def _get_raw_movement(self, gyro_x, gyro_y):
         """Détermine le mouvement brut basé sur les valeurs gyro"""
+        if self.classifier is not None:
+            offset_x, offset_y = self.classifier_offset
+            return DIRECTION_LABELS[self.classifier.classify(gyro_x + offset_x, gyro_y + offset_y)]
+        
         # Valeurs inversées pour correspondre à l'intuition
         h = -gyro_x
         v = -gyro_y
@@ -171,6 +374,35 @@ class HeadTracker:
                 
         return 'CENTRE'
     
+    def _classify_batch(self, gyro_x, gyro_y):
+        """Version vectorisée de _get_raw_movement, retourne des indices dans DIRECTION_LABELS"""
+        if self.classifier is not None:
+            offset_x, offset_y = self.classifier_offset
+            return self.classifier.classify_batch(gyro_x + offset_x, gyro_y + offset_y)
+        
+        h = -gyro_x
+        v = -gyro_y
+        abs_h = np.abs(h)
+        abs_v = np.abs(v)
+        
+        diagonal = (abs_h > DIAGONAL_THRESHOLD) & (abs_v > DIAGONAL_THRESHOLD)
+        horizontal = abs_h > abs_v
+        
+        return np.select(
+            [
+                diagonal & (h > 0) & (v < 0),
+                diagonal & (h > 0) & (v > 0),
+                diagonal & (h < 0) & (v < 0),
+                diagonal & (h < 0) & (v > 0),
+                horizontal & (h > self.movement_threshold),
+                horizontal & (h < -self.movement_threshold),
+                ~horizontal & (v > self.movement_threshold),
+                ~horizontal & (v < -self.movement_threshold),
+            ],
+            [5, 6, 7, 8, 1, 2, 3, 4],
+            default=0,
+        )
+    
     def _is_opposite_movement(self, current, previous):
         """Vérifie si deux mouvements sont opposés"""
         opposites = {
@@ -185,14 +417,29 @@ class HeadTracker:
         }
         return opposites.get(current) == previous
     
-    def reset(self):
-        """Réinitialise le tracker"""
-        self.__init__()
-        
     def is_returning_to_center(self):
         """Indique si on est en mode retour au centre"""
         return self.return_to_center_mode
         
     def is_gesture_in_progress(self):
         """Indique si un geste est en cours"""
-        return self.gesture_in_progress
\ No newline at end of file
+        return self.gesture_in_progress
+        
+    def get_bias(self):
+        """Biais du gyroscope estimé (x, y), ou (0, 0) si l'estimation est désactivée"""
+        if self.bias_estimator is None:
+            return 0.0, 0.0
+        return self.bias_estimator.get_bias()
+        
+    def pop_gestures(self):
+        """Retourne et oublie les gestes reconnus par gabarit depuis le dernier appel"""
+        gestures = self.pending_gestures
+        self.pending_gestures = []
+        return gestures
+        
+    def get_history(self):
+        """Historique récent, du plus ancien au plus récent : (x, y, direction) par échantillon"""
+        order = (np.arange(self.history_count) + self.history_index - self.history_count) % HISTORY_SIZE
+        return [(x, y, DIRECTION_LABELS[code])
+                for x, y, code in zip(self.history_x[order].tolist(), self.history_y[order].tolist(),
+                                      self.history_code[order].tolist())]
\ No newline at end of file
@@ -0,0 +1,194 @@
+# keyword_spotter.py - Reconnaissance rapide des commandes vocales par gabarits MFCC
+
+import argparse
+import os
+import time
+
+import numpy as np
+import scipy.io.wavfile
+
+from config import *
+
+# Commandes reconnues par le spotter (un dossier de gabarits par commande)
+KWS_COMMANDS = list(VOICE_BINDINGS)
+
+def _mel_filterbank(samplerate, n_fft, n_filters):
+    """Banc de filtres triangulaires sur l'échelle de Mel"""
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(samplerate / 2), n_filters + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / samplerate).astype(int)
+
+    filters = np.zeros((n_filters, n_fft // 2 + 1))
+    for i in range(1, n_filters + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            filters[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+def _dct_matrix(n_inputs, n_outputs):
+    """Matrice de la DCT-II orthonormée (lignes 0..n_outputs-1)"""
+    k = np.arange(n_outputs)[:, None]
+    n = np.arange(n_inputs)[None, :]
+    matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * n_inputs)) * np.sqrt(2 / n_inputs)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+class MfccExtractor:
+    """Calcule des MFCC normalisés (moyenne cepstrale retirée)"""
+
+    def __init__(self, samplerate=VOICE_SAMPLERATE, n_fft=512, n_filters=26, n_coeffs=13):
+        self.frame_size = int(samplerate * KWS_FRAME_MS / 1000)
+        self.hop = int(samplerate * KWS_HOP_MS / 1000)
+        self.n_fft = n_fft
+        self.window = np.hamming(self.frame_size)
+        self.filters = _mel_filterbank(samplerate, n_fft, n_filters)
+        self.dct = _dct_matrix(n_filters, n_coeffs)
+
+    def __call__(self, audio):
+        audio = np.asarray(audio, dtype=np.float64)
+        audio = np.append(audio[0], audio[1:] - 0.97 * audio[:-1])  # Pré-accentuation
+        if len(audio) < self.frame_size:
+            audio = np.pad(audio, (0, self.frame_size - len(audio)))
+
+        n_frames = 1 + (len(audio) - self.frame_size) // self.hop
+        indices = np.arange(self.frame_size)[None, :] + self.hop * np.arange(n_frames)[:, None]
+        frames = audio[indices] * self.window
+
+        power = np.abs(np.fft.rfft(frames, self.n_fft)) ** 2 / self.n_fft
+        energies = np.log(power @ self.filters.T + 1e-10)
+        mfcc = energies @ self.dct.T
+        return mfcc - mfcc.mean(axis=0)
+
+def dtw_distances(features, templates, lengths):
+    """Distances DTW normalisées entre un énoncé et tous les gabarits à la fois
+
+    templates est un tableau (T, M, D) complété par des zéros au-delà de lengths[t].
+    Le calcul avance par anti-diagonales : chaque cellule n'y dépend que des deux
+    précédentes, ce qui permet de traiter toute une diagonale de tous les gabarits en un pas.
+    """
+    n = len(features)
+    n_templates, m = templates.shape[:2]
+    cost = np.sqrt(((features[None, :, None, :] - templates[:, None, :, :]) ** 2).sum(axis=3))
+    # Colonnes de remplissage infranchissables
+    padding = np.arange(m)[None, :] >= lengths[:, None]
+    cost = np.where(padding[:, None, :], np.inf, cost)
+
+    acc = np.full((n_templates, n + 1, m + 1), np.inf)
+    acc[:, 0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        best = np.minimum(np.minimum(acc[:, i - 1, j - 1], acc[:, i - 1, j]), acc[:, i, j - 1])
+        acc[:, i, j] = cost[:, i - 1, j - 1] + best
+    return acc[np.arange(n_templates), n, lengths] / (n + lengths)
+
+class KeywordSpotter:
+    """Associe un énoncé au gabarit de commande le plus proche, ou None si ambigu"""
+
+    def __init__(self, template_dir=KWS_TEMPLATE_DIR, samplerate=VOICE_SAMPLERATE):
+        self.samplerate = samplerate
+        self.extract = MfccExtractor(samplerate)
+        self.templates = []  # (commande, MFCC)
+        self.load_templates(template_dir)
+
+    def load_templates(self, template_dir):
+        """Charge les gabarits <template_dir>/<commande>/*.wav"""
+        if not os.path.isdir(template_dir):
+            return
+        for command in KWS_COMMANDS:
+            command_dir = os.path.join(template_dir, command.replace(" ", "_"))
+            if not os.path.isdir(command_dir):
+                continue
+            for name in sorted(os.listdir(command_dir)):
+                if name.endswith(".wav"):
+                    audio = _read_wav(os.path.join(command_dir, name), self.samplerate)
+                    self.templates.append((command, self.extract(audio)))
+        if not self.templates:
+            return
+
+        # Gabarits empilés une fois pour toutes pour la DTW groupée
+        self.commands = np.array([command for command, _ in self.templates])
+        self.lengths = np.array([len(features) for _, features in self.templates])
+        self.stack = np.zeros((len(self.templates), self.lengths.max(), self.templates[0][1].shape[1]))
+        for t, (_, features) in enumerate(self.templates):
+            self.stack[t, :len(features)] = features
+        print(f"🔑 {len(self.templates)} gabarits de mots-clés chargés")
+
+    def is_ready(self):
+        """Indique si des gabarits sont disponibles"""
+        return bool(self.templates)
+
+    def match(self, audio):
+        """Retourne (commande, distance) si la reconnaissance est sûre, sinon (None, distance)"""
+        if not self.templates:
+            return None, float('inf')
+
+        features = self.extract(audio)
+        distances = dtw_distances(features, self.stack, self.lengths)
+
+        # Longueurs trop différentes : ce ne peut pas être cette commande
+        ratio = len(features) / self.lengths
+        distances[(ratio > KWS_MAX_LENGTH_RATIO) | (ratio < 1 / KWS_MAX_LENGTH_RATIO)] = np.inf
+
+        best = {}
+        for command, distance in zip(self.commands.tolist(), distances.tolist()):
+            if distance < best.get(command, float('inf')):
+                best[command] = distance
+
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        command, distance = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else float('inf')
+
+        # Sûr seulement si proche du gabarit et nettement meilleur que la commande suivante
+        if distance < KWS_ACCEPT_DISTANCE and runner_up > distance * KWS_MARGIN:
+            return command, distance
+        return None, distance
+
+def _read_wav(path, samplerate):
+    """Lit un WAV mono en float32 dans [-1, 1]"""
+    rate, audio = scipy.io.wavfile.read(path)
+    if rate != samplerate:
+        raise ValueError(f"{path}: {rate} Hz au lieu de {samplerate} Hz")
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+    if np.issubdtype(audio.dtype, np.integer):
+        audio = audio / np.iinfo(audio.dtype).max
+    return audio.astype(np.float32)
+
+def record_templates(template_dir=KWS_TEMPLATE_DIR, repetitions=3, duration=1.5):
+    """Enregistre des gabarits au micro pour chaque commande"""
+    import sounddevice as sd
+    from vad import UtteranceSegmenter
+
+    for command in KWS_COMMANDS:
+        command_dir = os.path.join(template_dir, command.replace(" ", "_"))
+        os.makedirs(command_dir, exist_ok=True)
+        for i in range(repetitions):
+            input(f"🎙️ Dites « {command} » ({i + 1}/{repetitions}) puis Entrée...")
+            audio = sd.rec(int(VOICE_SAMPLERATE * duration), samplerate=VOICE_SAMPLERATE,
+                           channels=1, dtype=np.float32, device=VOICE_DEVICE)
+            sd.wait()
+
+            # Ne garder que l'énoncé détecté
+            segmenter = UtteranceSegmenter(VOICE_SAMPLERATE)
+            utterances = segmenter.process(np.concatenate((audio[:, 0], np.zeros(VOICE_SAMPLERATE // 2, np.float32))))
+            if not utterances:
+                print("⚠️ Rien détecté, gabarit ignoré.")
+                continue
+            path = os.path.join(command_dir, f"{int(time.time() * 1000)}.wav")
+            scipy.io.wavfile.write(path, VOICE_SAMPLERATE, utterances[0])
+            print(f"✅ {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gabarits du spotter de mots-clés")
+    parser.add_argument("--repetitions", type=int, default=3)
+    parser.add_argument("--dir", default=KWS_TEMPLATE_DIR)
+    args = parser.parse_args()
+    record_templates(args.dir, args.repetitions)
@@ -5,8 +5,11 @@ import threading
 import time
 
 from record import record, stop_recording
-from calibration import calibrate
-from voice_control import start_voice_control, stop_voice_control
+from calibration import calibrate, get_calibration_job
+from profiles import get_active_profile, set_active_profile, list_profiles, load_active_classifier, profile_name
+from session_manager import start_headset_streams
+from config import DEFAULT_PROFILE, MULTI_HEADSET, MAX_HEADSETS, ASYNC_RUNTIME
+from voice_control import start_voice_control, stop_voice_control, start_voice_worker
 
 # Pour gérer l'état de l'application
 if 'recording' not in st.session_state:
@@ -14,6 +17,15 @@ if 'recording' not in st.session_state:
 if 'voice_control' not in st.session_state:
     st.session_state.voice_control = False
 
+if 'profile' not in st.session_state:
+    st.session_state.profile = get_active_profile() or DEFAULT_PROFILE
+
+# Lancer la reconnaissance vocale (et charger Whisper) dès le démarrage, une seule fois
+start_voice_worker()
+
+# Charger le profil de calibration dès le démarrage (gardé en cache ensuite)
+load_active_classifier()
+
 def to_stream():
     """Connecte au casque Muse avec gestion d'erreurs améliorée"""
     try:
@@ -26,6 +38,14 @@ def to_stream():
             st.error("Aucun Muse n'a été trouvé. Assurez-vous que le casque est allumé et à proximité.")
             return False
 
+        # Plusieurs casques : chacun est streamé dans son propre processus, sans bloquer l'interface
+        if MULTI_HEADSET and len(muses) > 1:
+            started = start_headset_streams(muses)
+            for muse in muses[:MAX_HEADSETS]:
+                st.success(f"Muse détecté: {muse['name']} ({muse['address']})")
+            st.success(f"Streaming démarré pour {len(started)} casque(s)!")
+            return True
+        
         st.success(f"Muse détecté: {muses[0]['name']} ({muses[0]['address']})")
         
         with st.spinner("Démarrage du streaming en cours..."):
@@ -47,11 +67,12 @@ def to_stream():
 def start_recording():
     """Démarre l'enregistrement dans un thread séparé"""
     if not st.session_state.recording:
-        record()
+        record(voice=ASYNC_RUNTIME)
         st.session_state.recording = True
-        # Démarrer aussi le contrôle vocal
+        # Démarrer aussi le contrôle vocal (déjà une étape du runtime asyncio s'il est actif)
         if not st.session_state.voice_control:
-            start_voice_control()
+            if not ASYNC_RUNTIME:
+                start_voice_control()
             st.session_state.voice_control = True
 
 def stop_record():
@@ -61,9 +82,36 @@ def stop_record():
         st.session_state.recording = False
         # Arrêter aussi le contrôle vocal
         if st.session_state.voice_control:
-            stop_voice_control()
+            if not ASYNC_RUNTIME:
+                stop_voice_control()
             st.session_state.voice_control = False
 
+def start_calibration():
+    """Lance la calibration du profil saisi sans bloquer l'interface"""
+    calibrate(st.session_state.profile)
+
+def select_profile():
+    """Active un profil déjà calibré"""
+    name = profile_name(st.session_state.profile)
+    if name in list_profiles():
+        set_active_profile(name)
+        load_active_classifier()
+
+@st.fragment(run_every=0.5)
+def calibration_status():
+    """Affiche l'avancement de la calibration en arrière-plan"""
+    job = get_calibration_job()
+    if job is None:
+        return
+    if job.status == 'running':
+        st.info("🎯 Calibration en cours...")
+        st.write(job.instruction)
+        st.progress(job.progress)
+    elif job.status == 'done':
+        st.success(f"✅ {job.message}")
+    else:
+        st.error(f"❌ {job.message}")
+
 # Interface utilisateur Streamlit
 st.title("Amuse toi !")
 
@@ -86,4 +134,8 @@ with col2:
         st.button("Arrêter", on_click=stop_record, type="secondary")
 
 with col3:
-    st.button("Calibrer visage", on_click=calibrate, type="primary")
\ No newline at end of file
+    st.button("Calibrer visage", on_click=start_calibration, type="primary")
+
+st.text_input("Profil", key="profile", on_change=select_profile,
+              help="Profils enregistrés : " + (", ".join(list_profiles()) or "aucun"))
+calibration_status()
\ No newline at end of file
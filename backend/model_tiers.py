@@ -0,0 +1,120 @@
+# model_tiers.py - Choix adaptatif du modèle Whisper selon la latence mesurée
+
+import threading
+
+from config import *
+from whisper_service import load_model
+
+class ModelTierSelector:
+    """Mesure le facteur temps réel et la file d'attente, et change de palier pour tenir le budget"""
+
+    def __init__(self, model, tiers=VOICE_MODEL_TIERS):
+        self.tiers = tiers
+        self.index = self._initial_tier()
+        # Modèles déjà chargés, réutilisables sans attente : (taille, type de calcul) -> modèle
+        self.models = {self._model_key(self.index): model}
+        # Palier chargé en arrière-plan, activé par le thread de reconnaissance au prochain record()
+        self.pending_index = None
+        self.pending_reason = None
+        self.loading = False
+        self.lock = threading.Lock()
+
+        self.latency_ema = None
+        self.rtf_ema = None
+        self.fast_decodes = 0
+        self.cooldown = 0
+
+    def _initial_tier(self):
+        for i, tier in enumerate(self.tiers):
+            if tier['model'] == WHISPER_MODEL_SIZE and tier['compute_type'] == WHISPER_COMPUTE_TYPE:
+                return i
+        return 0
+
+    def _model_key(self, index):
+        tier = self.tiers[index]
+        return tier['model'], tier['compute_type']
+
+    @property
+    def model(self):
+        return self.models[self._model_key(self.index)]
+
+    @property
+    def beam_size(self):
+        return self.tiers[self.index]['beam_size']
+
+    def describe(self):
+        tier = self.tiers[self.index]
+        return f"{tier['model']}/{tier['compute_type']}/beam {tier['beam_size']}"
+
+    def record(self, decode_time, audio_duration, backlog_seconds):
+        """Ajoute la mesure d'un décodage Whisper et ajuste le palier si nécessaire"""
+        with self.lock:
+            index, reason = self.pending_index, self.pending_reason
+            self.pending_index = self.pending_reason = None
+        if index is not None:
+            # Cette mesure vient encore de l'ancien palier
+            self._activate(index, reason)
+            return
+        
+        rtf = decode_time / max(audio_duration, 1e-3)
+        # Latence d'une commande : son décodage plus l'audio déjà en attente, décodé au même rythme
+        latency = decode_time + backlog_seconds * rtf
+
+        alpha = VOICE_TIER_EMA_ALPHA
+        self.rtf_ema = rtf if self.rtf_ema is None else self.rtf_ema + alpha * (rtf - self.rtf_ema)
+        self.latency_ema = latency if self.latency_ema is None else self.latency_ema + alpha * (latency - self.latency_ema)
+
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+
+        if self.latency_ema > VOICE_LATENCY_BUDGET or backlog_seconds > VOICE_MAX_BACKLOG:
+            self.fast_decodes = 0
+            if self.index > 0:
+                self._switch(self.index - 1, "trop lent")
+        elif self.latency_ema < VOICE_LATENCY_BUDGET * VOICE_TIER_UPGRADE_HEADROOM:
+            self.fast_decodes += 1
+            if self.fast_decodes >= VOICE_TIER_UPGRADE_DECODES and self.index + 1 < len(self.tiers):
+                self.fast_decodes = 0
+                self._switch(self.index + 1, "marge disponible")
+        else:
+            self.fast_decodes = 0
+
+    def _switch(self, index, reason):
+        """Passe au palier demandé ; charge le modèle en arrière-plan s'il n'est pas déjà prêt"""
+        key = self._model_key(index)
+        if key in self.models:
+            self._activate(index, reason)
+            return
+
+        with self.lock:
+            if self.loading:
+                return
+            self.loading = True
+
+        def load():
+            # Ce thread ne fait que charger : palier, modèles et mesures restent au thread de reconnaissance
+            model = None
+            try:
+                model = load_model(*key)
+            except Exception as e:
+                print(f"❌ Palier {key} indisponible: {e}")
+            with self.lock:
+                if model is not None:
+                    self.models[key] = model
+                    self.pending_index = index
+                    self.pending_reason = reason
+                self.loading = False
+
+        print(f"⏳ Chargement du palier {key[0]}/{key[1]} ({reason})...")
+        threading.Thread(target=load, daemon=True).start()
+
+    def _activate(self, index, reason):
+        self.index = index
+        self.cooldown = VOICE_TIER_COOLDOWN_DECODES
+        self.latency_ema = None
+        # Ne garder que le modèle actif et ses voisins directs en mémoire
+        keep = {self._model_key(i) for i in (index - 1, index, index + 1) if 0 <= i < len(self.tiers)}
+        for key in [key for key in self.models if key not in keep]:
+            del self.models[key]
+        print(f"🔀 Palier Whisper: {self.describe()} ({reason}, RTF {self.rtf_ema:.2f})")
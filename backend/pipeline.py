@@ -0,0 +1,179 @@
+# pipeline.py - Chaîne ingestion → HeadTracker → contrôles pour un flux GYRO
+
+import time
+
+from pylsl import StreamInlet, resolve_bypred, local_clock
+
+from config import *
+from sensor_fusion import OrientationFilter
+
+def _pull_gyro_batch(inlet, time_offset, max_backlog=GYRO_MAX_BACKLOG, max_sample_age=GYRO_MAX_SAMPLE_AGE):
+    """Vide le buffer LSL et ne garde que les échantillons encore frais
+
+    Retourne (données, horodatages, nombre d'échantillons lus y compris ceux ignorés).
+    """
+    data, timestamps = inlet.pull_chunk(timeout=GYRO_PULL_TIMEOUT, max_samples=GYRO_MAX_CHUNK)
+    received = len(data)
+
+    if not data:
+        return [], [], 0
+
+    # Avance rapide : on ne garde que la fin du lot si le retard s'accumule
+    if len(data) > max_backlog:
+        data = data[-max_backlog:]
+        timestamps = timestamps[-max_backlog:]
+
+    # Ignorer les échantillons trop vieux (horloge locale)
+    oldest_allowed = local_clock() - max_sample_age
+    first_fresh = 0
+    while first_fresh < len(timestamps) and timestamps[first_fresh] + time_offset < oldest_allowed:
+        first_fresh += 1
+
+    # On garde toujours le dernier échantillon pour ne pas geler le tracker
+    first_fresh = min(first_fresh, len(data) - 1)
+    return data[first_fresh:], timestamps[first_fresh:], received
+
+class TrackerPipeline:
+    """Un casque : lit son flux GYRO, fait avancer son HeadTracker et pilote son ControlManager"""
+
+    def __init__(self, inlet, head_tracker, control_manager, orientation_filter=None, acc_inlet=None, name="",
+                 max_backlog=GYRO_MAX_BACKLOG, max_sample_age=GYRO_MAX_SAMPLE_AGE):
+        self.inlet = inlet
+        # Abonnement au flux dès maintenant : rien n'est perdu avant le premier pull_chunk
+        inlet.open_stream()
+        self.time_offset = inlet.time_correction()
+        self.head_tracker = head_tracker
+        self.control_manager = control_manager
+        # Mode inclinaison : l'ACC fournit la référence de gravité
+        self.orientation_filter = orientation_filter
+        self.acc_inlet = acc_inlet
+        # Préfixe des messages, pour distinguer les joueurs
+        self.prefix = f"[{name}] " if name else ""
+        # Limites d'ingestion (le rejeu sans rythme réel les lève pour ne rien jeter)
+        self.max_backlog = max_backlog
+        self.max_sample_age = max_sample_age
+
+        self.center_hold_time = 0
+        self.last_state = 'CENTRE'
+
+        # Compteurs : lus sur LSL, ignorés car trop vieux, traités jusqu'aux contrôles
+        self.samples_received = 0
+        self.samples_dropped = 0
+        self.samples_processed = 0
+        # Temps passé à suivre et à piloter les contrôles (s), hors attente du flux
+        self.processing_time = 0.0
+
+    def reset(self):
+        """Recentre le suivi (touche R) : tracker et inclinaison intégrée"""
+        self.head_tracker.reset()
+        if self.orientation_filter is not None:
+            self.orientation_filter.reset()
+
+    def run(self, is_running):
+        """Boucle jusqu'à ce que is_running() devienne faux"""
+        while is_running():
+            try:
+                self.step()
+            except Exception as e:
+                print(f"⚠️ {self.prefix}Erreur dans la boucle: {e}")
+
+    def step(self):
+        """Traite tout ce qui est disponible (pull_chunk bloque au plus GYRO_PULL_TIMEOUT)"""
+        batch = self.pull()
+        if batch[0]:
+            self.output(*self.track(*batch))
+
+    def pull(self):
+        """Étape d'ingestion : lot GYRO frais (appel pylsl bloquant)"""
+        data, timestamps, received = _pull_gyro_batch(self.inlet, self.time_offset, self.max_backlog, self.max_sample_age)
+        self.samples_received += received
+        self.samples_dropped += received - len(data)
+        return data, timestamps
+
+    def samples_consumed(self):
+        """Échantillons lus sur LSL dont le traitement est terminé (traités ou ignorés)"""
+        return self.samples_processed + self.samples_dropped
+
+    def track(self, data, timestamps):
+        """Étape de suivi : fait avancer le tracker sur le lot, retourne (gyro, états, biais, gestes, horodatages)"""
+        start = time.perf_counter()
+        head_tracker = self.head_tracker
+        gyro = [sample[:2] for sample in data]
+        if self.orientation_filter is None:
+            n_commits = len(head_tracker.commit_latencies)
+            states = head_tracker.update_batch(gyro)
+            # Délai début du geste -> émission, pour chaque geste validé dans ce lot
+            for latency in list(head_tracker.commit_latencies)[n_commits:]:
+                print(f"⚡ {self.prefix}Geste validé {latency * 1000:.0f} ms après son début")
+        else:
+            states = self._update_tilt(gyro, timestamps)
+
+        # Le mouvement analogique utilise aussi le gyro corrigé du biais
+        bias = head_tracker.get_bias()
+        self.processing_time += time.perf_counter() - start
+        return gyro, states, bias, head_tracker.pop_gestures(), timestamps
+
+    def output(self, gyro, states, bias, gestures, timestamps):
+        """Étape de sortie : gestes, directions et mouvement vers les contrôles (pynput)"""
+        start = time.perf_counter()
+        head_tracker = self.head_tracker
+        control_manager = self.control_manager
+        for gesture in gestures:
+            control_manager.trigger_gesture(gesture)
+
+        bias_x, bias_y = bias
+        for (gyro_x, gyro_y), state, timestamp in zip(gyro, states, timestamps):
+            control_manager.update_direction(state)
+            control_manager.update_motion(gyro_x - bias_x, gyro_y - bias_y, timestamp)
+
+            # Afficher les changements d'état
+            if state != self.last_state:
+                status = "↩️ Retour au centre" if head_tracker.is_returning_to_center() else "➡️ Mouvement"
+                print(f"{self.prefix}{status} | Direction: {state:12s} | Gyro X:{gyro_x:6.1f} Y:{gyro_y:6.1f} | Biais X:{bias_x:5.1f} Y:{bias_y:5.1f}")
+                self.last_state = state
+
+            # Gérer l'action au centre
+            if state == 'CENTRE':
+                if self.last_state != 'CENTRE':
+                    self.center_hold_time = time.time()
+                elif time.time() - self.center_hold_time > CENTER_HOLD_TIME:
+                    control_manager.handle_center_action()
+                    self.center_hold_time = time.time() + CENTER_COOLDOWN
+
+        self.samples_processed += len(states)
+        self.processing_time += time.perf_counter() - start
+
+    def _update_tilt(self, gyro, timestamps):
+        """Fusionne ACC et GYRO puis classe l'inclinaison de chaque échantillon"""
+        if self.acc_inlet is not None:
+            acc, _ = self.acc_inlet.pull_chunk(timeout=0.0)
+            if acc:
+                # Seule la dernière mesure de gravité compte
+                self.orientation_filter.update_acc(*acc[-1][:3])
+
+        states = []
+        for (gyro_x, gyro_y), timestamp in zip(gyro, timestamps):
+            # Un biais intégré devient un angle permanent : on le retire avant l'intégration
+            gyro_x, gyro_y = self.head_tracker.correct_gyro(gyro_x, gyro_y)
+            horizontal, vertical = self.orientation_filter.update_gyro(gyro_x, gyro_y, timestamp)
+            states.append(self.head_tracker.update_orientation(horizontal, vertical))
+        return states
+
+def open_pipeline(stream_info, head_tracker, control_manager, name="", pipeline_class=TrackerPipeline,
+                  max_backlog=GYRO_MAX_BACKLOG, max_sample_age=GYRO_MAX_SAMPLE_AGE):
+    """Ouvre le flux GYRO d'un casque (et son ACC en mode inclinaison) et construit sa chaîne"""
+    inlet = StreamInlet(stream_info)
+
+    orientation_filter = None
+    acc_inlet = None
+    if TRACKER_MODE == "tilt":
+        orientation_filter = OrientationFilter()
+        # L'ACC du même casque : muselsl donne le même source_id à tous ses flux
+        acc_streams = resolve_bypred(f"type='ACC' and source_id='{stream_info.source_id()}'", timeout=2)
+        if acc_streams:
+            acc_inlet = StreamInlet(acc_streams[0])
+        else:
+            print("⚠️ Flux ACC introuvable, inclinaison estimée au gyroscope seul.")
+
+    return pipeline_class(inlet, head_tracker, control_manager, orientation_filter, acc_inlet, name,
+                          max_backlog, max_sample_age)
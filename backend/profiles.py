@@ -0,0 +1,58 @@
+# profiles.py - Profils de calibration par utilisateur
+
+import os
+
+from config import *
+from direction_classifier import DirectionClassifier
+
+# Classifieurs déjà lus sur disque : nom -> DirectionClassifier
+_cache = {}
+
+def profile_name(text):
+    """Nom de profil utilisable comme nom de fichier"""
+    name = "".join(c for c in text.strip() if c.isalnum() or c in "-_")
+    return name or DEFAULT_PROFILE
+
+def profile_path(name):
+    return os.path.join(PROFILE_DIR, f"{name}.json")
+
+def list_profiles():
+    """Noms des profils enregistrés, par ordre alphabétique"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(file[:-5] for file in os.listdir(PROFILE_DIR) if file.endswith('.json'))
+
+def save_profile(name, classifier):
+    """Enregistre la calibration d'un utilisateur et en fait le profil actif"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    classifier.save(profile_path(name))
+    _cache[name] = classifier
+    set_active_profile(name)
+
+def load_profile(name):
+    """Classifieur du profil, ou None s'il n'existe pas"""
+    if name not in _cache:
+        classifier = DirectionClassifier.load(profile_path(name))
+        if classifier is None:
+            return None
+        _cache[name] = classifier
+    return _cache[name]
+
+def get_active_profile():
+    """Dernier profil utilisé (conservé d'une session à l'autre)"""
+    try:
+        with open(os.path.join(PROFILE_DIR, ACTIVE_PROFILE_FILE)) as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    return name if name in list_profiles() else None
+
+def set_active_profile(name):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, ACTIVE_PROFILE_FILE), 'w') as f:
+        f.write(name)
+
+def load_active_classifier():
+    """Classifieur du profil actif, sinon None (seuils fixes du tracker)"""
+    name = get_active_profile()
+    return load_profile(name) if name else None
@@ -1,6 +1,6 @@
 # record.py - Fonction principale d'enregistrement
 
-from pylsl import StreamInlet, resolve_byprop
+from pylsl import resolve_byprop
 from pynput.keyboard import Listener, Key
 import threading
 import time
@@ -8,6 +8,12 @@ import streamlit as st
 
 from head_tracker import HeadTracker
 from controllers import ControlManager
+from session_recorder import SessionRecorder
+from pipeline import open_pipeline
+from session_manager import SessionManager, discover_headsets
+from runtime import Runtime
+from profiles import load_active_classifier
+from gesture_templates import GestureRecognizer
 from config import *
 
 # Variables globales
@@ -16,6 +22,9 @@ control_manager = None
 head_tracker = None
 keyboard_listener = None
 recording_thread = None
+session_recorder = None
+runtime = None
+pipeline = None
 
 def on_press(key):
     """Gestion des touches pour changer de mode"""
@@ -38,20 +47,21 @@ def on_press(key):
                 pass
                 
         elif hasattr(key, 'char') and key.char == 'r':  # R pour reset
-            if head_tracker:
+            current_pipeline = get_pipeline()
+            if current_pipeline:
+                current_pipeline.reset()
+            elif head_tracker:
                 head_tracker.reset()
-                print("\n🔄 Position réinitialisée!")
+            print("\n🔄 Position réinitialisée!")
     except:
         pass
 
 def _recording_loop():
     """Boucle principale d'enregistrement"""
-    global is_recording, control_manager, head_tracker
+    global is_recording, control_manager, head_tracker, pipeline
     
     print("🔍 Recherche d'un flux GYRO...")
-    
-    # Résoudre les flux disponibles
-    streams = resolve_byprop("type", "GYRO", timeout=2)
+    streams = _find_streams()
     
     if len(streams) == 0:
         print("❌ Impossible de trouver un flux GYRO.")
@@ -59,52 +69,57 @@ def _recording_loop():
         is_recording = False
         return
     
-    inlet = StreamInlet(streams[0], max_chunklen=1)
+    # Enregistrement de la session sur son propre thread
+    _start_session_recording()
+    
+    if len(streams) > 1:
+        _run_players(streams)
+        return
+    
+    pipeline = open_pipeline(streams[0], head_tracker, control_manager)
+    
     print("✅ Flux GYRO trouvé! Démarrage du contrôle...")
+    _print_controls()
+    
+    pipeline.run(lambda: is_recording)
+    
+    print("\n👋 Enregistrement arrêté.")
+
+def _find_streams():
+    """Résout les flux disponibles (tous les casques en multi-joueurs)"""
+    return discover_headsets() if MULTI_HEADSET else resolve_byprop("type", "GYRO", timeout=2)
+
+def _print_controls():
     print("\n📋 CONTRÔLES:")
     print("  TAB : Basculer mode souris/clavier")
     print("  R   : Réinitialiser la position")
     print(f"  Mode actuel : {control_manager.get_mode().upper()}\n")
-    
-    center_hold_time = 0
-    last_state = 'CENTRE'
+
+def _run_players(streams):
+    """Une chaîne par casque, chacune dans son processus, jusqu'à l'arrêt de l'enregistrement"""
+    print(f"✅ {len(streams)} flux GYRO trouvés! Un joueur par casque.")
+    manager = SessionManager()
+    manager.start(streams)
     
     while is_recording:
-        try:
-            data, _ = inlet.pull_chunk(timeout=0.01, max_samples=1)
-            
-            if data:
-                gyro_x = data[0][0]
-                gyro_y = data[0][1]
-                
-                # Mettre à jour le tracker
-                state = head_tracker.update(gyro_x, gyro_y)
-                control_manager.update_direction(state)
-                
-                # Afficher les changements d'état
-                if state != last_state:
-                    status = "↩️ Retour au centre" if head_tracker.is_returning_to_center() else "➡️ Mouvement"
-                    print(f"{status} | Direction: {state:12s} | Gyro X:{gyro_x:6.1f} Y:{gyro_y:6.1f}")
-                    last_state = state
-                
-                # Gérer l'action au centre
-                if state == 'CENTRE':
-                    if last_state != 'CENTRE':
-                        center_hold_time = time.time()
-                    elif time.time() - center_hold_time > CENTER_HOLD_TIME:
-                        control_manager.handle_center_action()
-                        center_hold_time = time.time() + CENTER_COOLDOWN
-                        
-        except Exception as e:
-            print(f"⚠️ Erreur dans la boucle: {e}")
-            
-        time.sleep(0.01)
+        time.sleep(0.1)
     
+    manager.stop()
     print("\n👋 Enregistrement arrêté.")
 
-def record():
-    """Lance l'enregistrement des mouvements de tête"""
-    global is_recording, control_manager, head_tracker, keyboard_listener, recording_thread
+def _start_session_recording():
+    """Démarre l'enregistrement des flux du Muse si activé"""
+    global session_recorder
+    
+    if not SESSION_RECORDING or session_recorder:
+        return
+    
+    session_recorder = SessionRecorder()
+    session_recorder.start()
+
+def record(voice=False):
+    """Lance l'enregistrement des mouvements de tête (voice : contrôle vocal intégré au runtime asyncio)"""
+    global is_recording, control_manager, head_tracker, keyboard_listener, recording_thread, runtime, pipeline
     
     if is_recording:
         print("⚠️ L'enregistrement est déjà en cours!")
@@ -114,17 +129,31 @@ def record():
     
     # Initialiser les composants
     is_recording = True
-    head_tracker = HeadTracker()
+    pipeline = None
+    # Directions calibrées pour l'utilisateur si une calibration existe
+    classifier = load_active_classifier()
+    if classifier:
+        print("🎯 Calibration utilisateur chargée.")
+    gesture_recognizer = GestureRecognizer() if GESTURE_TEMPLATES else None
+    head_tracker = HeadTracker(classifier, gesture_recognizer)
     control_manager = ControlManager()
-    control_manager.start()
     
-    # Démarrer l'écoute du clavier
-    keyboard_listener = Listener(on_press=on_press)
-    keyboard_listener.start()
-    
-    # Démarrer l'enregistrement dans un thread séparé
-    recording_thread = threading.Thread(target=_recording_loop, daemon=True)
-    recording_thread.start()
+    if ASYNC_RUNTIME:
+        # Ingestion, contrôles, touches et voix sur une seule boucle asyncio
+        _start_session_recording()
+        _print_controls()
+        runtime = Runtime(head_tracker, control_manager, _find_streams, on_key=on_press, voice=voice)
+        runtime.start()
+    else:
+        control_manager.start()
+        
+        # Démarrer l'écoute du clavier
+        keyboard_listener = Listener(on_press=on_press)
+        keyboard_listener.start()
+        
+        # Démarrer l'enregistrement dans un thread séparé
+        recording_thread = threading.Thread(target=_recording_loop, daemon=True)
+        recording_thread.start()
     
     # Stocker le mode dans la session Streamlit si disponible
     try:
@@ -134,7 +163,7 @@ def record():
 
 def stop_recording():
     """Arrête l'enregistrement"""
-    global is_recording, control_manager, keyboard_listener, recording_thread
+    global is_recording, control_manager, keyboard_listener, recording_thread, session_recorder, runtime
     
     if not is_recording:
         print("⚠️ Aucun enregistrement en cours.")
@@ -145,7 +174,11 @@ def stop_recording():
     # Arrêter l'enregistrement
     is_recording = False
     
-    # Attendre la fin du thread
+    # Annuler les étapes du runtime, ou attendre la fin du thread
+    if runtime:
+        runtime.stop()
+        runtime = None
+    
     if recording_thread:
         recording_thread.join(timeout=2)
     
@@ -158,6 +191,10 @@ def stop_recording():
         keyboard_listener.stop()
         keyboard_listener = None
     
+    if session_recorder:
+        session_recorder.stop()
+        session_recorder = None
+    
     print("✅ Enregistrement arrêté.")
 
 def get_current_mode():
@@ -174,7 +211,14 @@ def set_mode(mode):
         control_manager.set_mode(mode)
         print(f"🔄 Mode changé: {mode.upper()}")
 
+def get_pipeline():
+    """Chaîne de suivi du casque en cours (None avant la connexion ou en multi-joueurs)"""
+    if runtime:
+        return runtime.pipeline
+    return pipeline
+
 def is_recording_active():
     """Indique si l'enregistrement est actif"""
     global is_recording
-    return is_recording
\ No newline at end of file
+    # Le runtime s'arrête seul s'il ne trouve aucun flux
+    return is_recording and (runtime is None or runtime.is_running())
\ No newline at end of file
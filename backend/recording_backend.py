@@ -0,0 +1,49 @@
+# recording_backend.py - Contrôleurs souris/clavier qui enregistrent au lieu d'agir
+
+from pylsl import local_clock
+
+class RecordingMouse:
+    """Remplace pynput.mouse.Controller et enregistre les événements"""
+
+    def __init__(self, on_event=None):
+        self._position = (0, 0)
+        self.on_event = on_event
+        self.events = []
+
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        self._record('move', value)
+
+    def click(self, button, count=1):
+        self._record('click', button)
+
+    def _record(self, kind, value):
+        self.events.append((local_clock(), kind, value))
+        if self.on_event:
+            self.on_event(kind)
+
+class RecordingKeyboard:
+    """Remplace pynput.keyboard.Controller et enregistre les événements"""
+
+    def __init__(self, on_event=None):
+        self.on_event = on_event
+        self.events = []
+
+    def press(self, key):
+        self._record('press', key)
+
+    def release(self, key):
+        self._record('release', key)
+
+    def tap(self, key):
+        self._record('tap', key)
+
+    def _record(self, kind, value):
+        self.events.append((local_clock(), kind, value))
+        if self.on_event:
+            self.on_event(kind)
@@ -0,0 +1,207 @@
+# replay.py - Rejoue des traces gyro via un faux flux LSL
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, local_clock, resolve_byprop
+
+from config import *
+
+# Vitesse de rotation (deg/s) pour chaque direction de geste synthétique.
+# Le tracker inverse les axes : h = -gyro_x, v = -gyro_y
+SYNTHETIC_DIRECTIONS = {
+    'CENTRE': (0, 0),
+    'GAUCHE': (1, 0),
+    'DROITE': (-1, 0),
+    'HAUT': (0, 1),
+    'BAS': (0, -1),
+    'GAUCHE HAUT': (0.707, 0.707),
+    'GAUCHE BAS': (0.707, -0.707),
+    'DROITE HAUT': (-0.707, 0.707),
+    'DROITE BAS': (-0.707, -0.707),
+}
+
+def synthetic_gyro_trace(sequence, srate=REPLAY_SRATE, amplitude=40.0, noise=1.0, seed=0):
+    """Génère une trace gyro N×3 à partir d'une liste (direction, durée en s)"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+
+    for direction, duration in sequence:
+        n_samples = max(int(duration * srate), 1)
+        dx, dy = SYNTHETIC_DIRECTIONS[direction]
+        # Impulsion en demi-sinus : montée puis retour au calme
+        pulse = amplitude * np.sin(np.linspace(0, np.pi, n_samples))
+        chunk = np.zeros((n_samples, 3))
+        chunk[:, 0] = dx * pulse
+        chunk[:, 1] = dy * pulse
+        chunks.append(chunk)
+
+    trace = np.concatenate(chunks)
+    trace += rng.normal(0, noise, trace.shape)
+    timestamps = np.arange(len(trace)) / srate
+    return timestamps, trace
+
+def load_session_trace(session_dir):
+    """Charge la trace GYRO d'une session enregistrée"""
+    from session_recorder import SessionReader
+
+    timestamps, data = SessionReader(session_dir).read('GYRO')
+    return timestamps - timestamps[0], data
+
+class ReplayOutlet:
+    """Publie une trace sur un StreamOutlet local de type GYRO"""
+
+    def __init__(self, timestamps, data, speed=1.0, srate=REPLAY_SRATE):
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        self.data = np.asarray(data, dtype=np.float32)
+        # speed <= 0 : aussi vite que possible
+        self.speed = speed
+        info = StreamInfo('MuseReplay', 'GYRO', self.data.shape[1], srate, 'float32', 'muse-replay')
+        self.outlet = StreamOutlet(info)
+        self.is_running = False
+        self.thread = None
+        self.samples_sent = 0
+        self.elapsed = 0.0
+        # Échantillons déjà traités par le pipeline : sans rythme réel, on ne le devance
+        # que de REPLAY_MAX_IN_FLIGHT pour ne rien perdre dans les buffers LSL
+        self.consumed = None
+
+    def wait_for_consumer(self, timeout=REPLAY_CONSUMER_TIMEOUT):
+        """Attend qu'un inlet soit connecté avant de jouer la trace"""
+        return self.outlet.wait_for_consumers(timeout)
+
+    def start(self):
+        """Joue la trace dans un thread séparé"""
+        self.is_running = True
+        self.thread = threading.Thread(target=self.play, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Interrompt la lecture"""
+        self.is_running = False
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def join(self):
+        """Attend la fin de la lecture"""
+        if self.thread:
+            self.thread.join()
+
+    def play(self):
+        """Publie tous les échantillons en respectant la vitesse demandée"""
+        self.is_running = True
+        start = time.perf_counter()
+
+        if self.speed <= 0:
+            for i in range(0, len(self.data), REPLAY_CHUNK_SAMPLES):
+                if not self.is_running:
+                    break
+                while self.consumed and self.is_running and self.samples_sent - self.consumed() > REPLAY_MAX_IN_FLIGHT:
+                    time.sleep(0.001)
+                chunk = self.data[i:i + REPLAY_CHUNK_SAMPLES]
+                self.outlet.push_chunk(chunk.tolist(), local_clock())
+                self.samples_sent += len(chunk)
+        else:
+            for offset, sample in zip(self.timestamps.tolist(), self.data.tolist()):
+                if not self.is_running:
+                    break
+                delay = start + offset / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Horodatage local : le pipeline voit des échantillons frais
+                self.outlet.push_sample(sample, local_clock())
+                self.samples_sent += 1
+
+        self.elapsed = time.perf_counter() - start
+        self.is_running = False
+
+def run_pipeline(replay, classifier=None, mode=DEFAULT_MODE):
+    """Fait tourner TrackerPipeline/HeadTracker/ControlManager sur la trace rejouée
+
+    Sans affichage ni état sur disque : la souris et le clavier sont des backends
+    d'enregistrement et le classifieur est explicite (None : seuils fixes), pour
+    qu'une même trace donne le même résultat sur toutes les machines.
+    """
+    from head_tracker import HeadTracker
+    from controllers import ControlManager
+    from recording_backend import RecordingMouse, RecordingKeyboard
+    from pipeline import open_pipeline
+
+    mouse = RecordingMouse()
+    keyboard = RecordingKeyboard()
+    control_manager = ControlManager(mouse=mouse, keyboard=keyboard)
+    control_manager.set_mode(mode)
+    head_tracker = HeadTracker(classifier)
+
+    streams = resolve_byprop("source_id", "muse-replay", timeout=REPLAY_CONSUMER_TIMEOUT)
+    if not streams:
+        print("❌ Flux rejoué introuvable.")
+        return
+    # Sans rythme réel, l'ingestion ne doit rien jeter pour rester déterministe
+    limits = {'max_backlog': float('inf'), 'max_sample_age': float('inf')} if replay.speed <= 0 else {}
+    tracker_pipeline = open_pipeline(streams[0], head_tracker, control_manager, **limits)
+    if not replay.wait_for_consumer():
+        print("❌ Le pipeline ne s'est pas connecté au flux rejoué.")
+        return
+
+    is_running = True
+    control_manager.start()
+    thread = threading.Thread(target=tracker_pipeline.run, args=(lambda: is_running,), daemon=True)
+    thread.start()
+
+    replay.consumed = tracker_pipeline.samples_consumed
+    replay.start()
+    replay.join()
+    # Attendre que le pipeline ait traité tout ce qui a été publié
+    drained = _wait_until(lambda: tracker_pipeline.samples_consumed() >= replay.samples_sent, REPLAY_DRAIN_TIMEOUT)
+    is_running = False
+    thread.join(timeout=2)
+    control_manager.stop()
+
+    if not drained:
+        print(f"⚠️ Pipeline incomplet : {tracker_pipeline.samples_consumed()}/{replay.samples_sent} échantillons traités")
+    rate = tracker_pipeline.samples_processed / tracker_pipeline.processing_time if tracker_pipeline.processing_time else float('inf')
+    print(f"📈 {replay.samples_sent} échantillons rejoués en {replay.elapsed:.2f}s, "
+          f"{tracker_pipeline.samples_processed} traités ({tracker_pipeline.samples_dropped} ignorés) "
+          f"en {tracker_pipeline.processing_time:.2f}s de calcul ({rate:.0f} éch/s)")
+    print(f"🖱️ {len(mouse.events)} événements souris, ⌨️ {len(keyboard.events)} événements clavier enregistrés")
+    return mouse.events, keyboard.events
+
+def _wait_until(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue une trace gyro dans le pipeline de contrôle")
+    parser.add_argument("session", nargs="?", help="Dossier de session (trace synthétique si absent)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="1 = temps réel, >1 = accéléré, 0 = aussi vite que possible")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de la trace synthétique")
+    parser.add_argument("--mode", choices=["mouse", "keyboard"], default=DEFAULT_MODE, help="Mode de contrôle")
+    parser.add_argument("--calibration", help="Fichier de calibration du classifieur (seuils fixes si absent)")
+    args = parser.parse_args()
+
+    classifier = None
+    if args.calibration:
+        from direction_classifier import DirectionClassifier
+        classifier = DirectionClassifier.load(args.calibration)
+        if classifier is None:
+            return
+
+    if args.session:
+        timestamps, data = load_session_trace(args.session)
+    else:
+        sequence = [('CENTRE', 1.0), ('GAUCHE', 0.4), ('CENTRE', 1.0), ('DROITE', 0.4),
+                    ('CENTRE', 1.0), ('HAUT', 0.4), ('CENTRE', 1.0), ('BAS', 0.4), ('CENTRE', 1.0)]
+        timestamps, data = synthetic_gyro_trace(sequence, seed=args.seed)
+
+    run_pipeline(ReplayOutlet(timestamps, data, speed=args.speed), classifier, args.mode)
+
+if __name__ == "__main__":
+    main()
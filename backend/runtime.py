@@ -0,0 +1,241 @@
+# runtime.py - Boucle asyncio unique : ingestion → suivi → contrôles, mouvement, voix et touches
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pynput.keyboard import Listener, Controller
+from pynput.mouse import Controller as MouseController
+
+from pipeline import TrackerPipeline, open_pipeline
+from session_manager import SessionManager
+from config import *
+
+class Runtime:
+    """Étapes explicites reliées par des files bornées, sur une seule boucle asyncio
+
+    ingestion (pylsl) → suivi (HeadTracker) → sortie (pynput), plus le mouvement
+    continu, les touches et la voix. Seuls les appels bloquants pylsl et pynput
+    passent par le pool de threads ; une file pleine fait attendre l'étape amont.
+    """
+
+    def __init__(self, head_tracker, control_manager, resolve, on_key=None, voice=False, stop_event=None, name="",
+                 pipeline_class=TrackerPipeline):
+        self.head_tracker = head_tracker
+        self.control_manager = control_manager
+        # Appel bloquant qui retourne les flux GYRO (liste de StreamInfo)
+        self.resolve = resolve
+        # Appelé sur la boucle pour chaque touche pressée
+        self.on_key = on_key
+        self.voice = voice
+        # Arrêt demandé depuis un autre processus (multiprocessing.Event)
+        self.stop_event = stop_event
+        self.name = name
+        # Sous-classe de TrackerPipeline (ex. instrumentée par le benchmark)
+        self.pipeline_class = pipeline_class
+        self.prefix = f"[{name}] " if name else ""
+
+        self.loop = None
+        self.main_task = None
+        self.thread = None
+        self.executor = None
+        self.wake = None
+        self.pipeline = None
+        self.session_manager = None
+
+    def _prepare(self):
+        # Tâche créée avant le démarrage : stop() peut l'annuler à tout moment
+        self.loop = asyncio.new_event_loop()
+        self.main_task = self.loop.create_task(self._main())
+
+    def run(self):
+        """Exécute la boucle jusqu'à l'arrêt (bloquant)"""
+        if self.loop is None:
+            self._prepare()
+        try:
+            self.loop.run_until_complete(self.main_task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def start(self):
+        """Exécute la boucle sur son propre thread"""
+        self._prepare()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2):
+        """Annule toutes les étapes (depuis n'importe quel thread) et attend leur fin"""
+        try:
+            self.loop.call_soon_threadsafe(self.main_task.cancel)
+        except (AttributeError, RuntimeError):
+            pass  # Pas encore démarrée ou déjà terminée
+        if self.thread:
+            self.thread.join(timeout=timeout)
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    async def _offload(self, function, *args):
+        """Appel bloquant (pylsl, pynput) exécuté dans le pool, sans bloquer la boucle"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _main(self):
+        loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(RUNTIME_WORKERS, thread_name_prefix="runtime")
+        self.wake = asyncio.Event()
+        # update_direction tourne dans le pool : le réveil repasse par la boucle
+        self.control_manager.on_wake = lambda: loop.call_soon_threadsafe(self.wake.set)
+        tasks = []
+        try:
+            print(f"🔍 {self.prefix}Recherche d'un flux GYRO...")
+            streams = await self._offload(self.resolve)
+            if not streams:
+                print(f"❌ {self.prefix}Impossible de trouver un flux GYRO.")
+                print("Vérifiez que le streaming Muse est bien démarré.")
+                return
+
+            if len(streams) > 1:
+                # Un processus par casque, chacun avec sa propre boucle
+                print(f"✅ {len(streams)} flux GYRO trouvés! Un joueur par casque.")
+                self.session_manager = SessionManager()
+                await self._offload(self.session_manager.start, streams)
+            else:
+                self.pipeline = await self._offload(open_pipeline, streams[0], self.head_tracker, self.control_manager,
+                                                    self.name, self.pipeline_class)
+                print(f"✅ {self.prefix}Flux GYRO trouvé! Démarrage du contrôle...")
+                self.control_manager.start(run_thread=False)
+                batches = asyncio.Queue(RUNTIME_QUEUE_SIZE)
+                outputs = asyncio.Queue(RUNTIME_QUEUE_SIZE)
+                tasks += [
+                    asyncio.create_task(self._ingest(batches)),
+                    asyncio.create_task(self._track(batches, outputs)),
+                    asyncio.create_task(self._output(outputs)),
+                    asyncio.create_task(self._movement()),
+                ]
+
+            if self.on_key:
+                tasks.append(asyncio.create_task(self._keys()))
+            if self.voice:
+                tasks.append(asyncio.create_task(self._voice()))
+            if self.stop_event is not None:
+                tasks.append(asyncio.create_task(self._watch_stop()))
+
+            # Une étape qui lève une exception arrête tout le runtime
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.control_manager.on_wake = None
+            self.control_manager.stop()
+            if self.session_manager:
+                self.session_manager.stop()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            print(f"\n👋 {self.prefix}Enregistrement arrêté.")
+
+    async def _ingest(self, batches):
+        """Ingestion : pull_chunk dans le pool ; si la file est pleine, on attend
+        et _pull_gyro_batch ne gardera que les échantillons frais au prochain tour"""
+        delay = RUNTIME_RETRY_DELAY
+        while True:
+            try:
+                batch = await self._offload(self.pipeline.pull)
+            except Exception as e:
+                # Flux perdu : réessayer de moins en moins souvent plutôt que boucler à vide
+                print(f"⚠️ {self.prefix}Erreur de lecture: {e} (nouvel essai dans {delay:.1f}s)")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RUNTIME_RETRY_MAX_DELAY)
+                continue
+            delay = RUNTIME_RETRY_DELAY
+            if batch[0]:
+                await batches.put(batch)
+
+    async def _track(self, batches, outputs):
+        """Suivi : calcul pur, sur la boucle (jamais en même temps qu'une touche R)"""
+        while True:
+            batch = await batches.get()
+            try:
+                result = self.pipeline.track(*batch)
+            except Exception as e:
+                print(f"⚠️ {self.prefix}Erreur dans la boucle: {e}")
+                continue
+            await outputs.put(result)
+
+    async def _output(self, outputs):
+        """Sortie : gestes, directions et mouvement vers pynput, dans le pool
+        (ControlManager sérialise lui-même sortie, mouvement et touches)"""
+        while True:
+            result = await outputs.get()
+            try:
+                await self._offload(self.pipeline.output, *result)
+            except Exception as e:
+                print(f"⚠️ {self.prefix}Erreur dans la boucle: {e}")
+
+    async def _movement(self):
+        """Mouvement continu : mêmes échéances que la boucle threadée, réveillé par un asyncio.Event"""
+        woken = False
+        while True:
+            self.wake.clear()
+            timeout = await self._offload(self.control_manager.movement_step, woken)
+            try:
+                woken = await asyncio.wait_for(self.wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                woken = False
+
+    async def _keys(self):
+        """Touches : le thread du Listener pynput ne fait que les déposer dans la boucle"""
+        loop = asyncio.get_running_loop()
+        keys = asyncio.Queue(RUNTIME_KEY_QUEUE_SIZE)
+
+        def put_key(key):
+            try:
+                keys.put_nowait(key)
+            except asyncio.QueueFull:
+                pass  # Touches en rafale : les plus récentes sont ignorées
+
+        listener = Listener(on_press=lambda key: loop.call_soon_threadsafe(put_key, key))
+        listener.start()
+        try:
+            while True:
+                self.on_key(await keys.get())
+        finally:
+            listener.stop()
+
+    async def _voice(self):
+        """Voix : le callback sounddevice remplit l'anneau partagé, la boucle lit les commandes reconnues"""
+        import voice_control
+        try:
+            voice_control.start_voice_worker()
+            deadline = asyncio.get_running_loop().time() + VOICE_WORKER_READY_TIMEOUT
+            while not voice_control.worker_ready.is_set():
+                if asyncio.get_running_loop().time() > deadline:
+                    print("❌ Le processus de reconnaissance n'est pas prêt")
+                    return
+                await asyncio.sleep(RUNTIME_VOICE_POLL)
+
+            keyboard = Controller()
+            mouse = MouseController()
+            state = {'keyboard_enabled': True, 'held_keys': set()}
+            with voice_control.open_audio_stream():
+                print("🎤 Contrôle vocal démarré")
+                try:
+                    while True:
+                        try:
+                            message = voice_control.command_queue.get_nowait()
+                        except queue.Empty:
+                            await asyncio.sleep(RUNTIME_VOICE_POLL)
+                            continue
+                        await self._offload(voice_control.handle_message, message, keyboard, mouse, state)
+                finally:
+                    voice_control.print_audio_stats()
+        except Exception as e:
+            # Sans micro ni reconnaissance, le suivi de la tête continue
+            print(f"⚠️ Contrôle vocal indisponible: {e}")
+
+    async def _watch_stop(self):
+        while not self.stop_event.is_set():
+            await asyncio.sleep(0.1)
+        self.main_task.cancel()
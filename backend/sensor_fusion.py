@@ -0,0 +1,105 @@
+# sensor_fusion.py - Estimation de l'inclinaison de la tête par fusion ACC + GYRO
+
+import math
+
+from config import *
+
+class OrientationFilter:
+    """Filtre complémentaire : le gyroscope intégré donne la réactivité, l'accéléromètre corrige la dérive
+
+    Les angles sont en degrés, relatifs à la position de la tête au premier échantillon ACC
+    (horizontal > 0 à droite, vertical > 0 en bas, comme dans HeadTracker).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.horizontal = 0.0
+        self.vertical = 0.0
+        self.last_timestamp = None
+        self.neutral = None
+        self.acc_reference = None
+
+    def update_acc(self, acc_x, acc_y, acc_z):
+        """Met à jour la référence de gravité à partir d'un échantillon ACC (en g)"""
+        pitch = math.degrees(math.atan2(acc_x, math.hypot(acc_y, acc_z)))
+        roll = math.degrees(math.atan2(acc_y, acc_z))
+
+        # La première mesure fixe la position neutre
+        if self.neutral is None:
+            self.neutral = (pitch, roll)
+        pitch -= self.neutral[0]
+        roll -= self.neutral[1]
+
+        sign_h, sign_v = FUSION_ACC_SIGN
+        # Tourner la tête (yaw) ne change pas la gravité : pas de référence horizontale
+        reference_h = sign_h * roll if FUSION_HORIZONTAL_AXIS == "roll" else None
+        self.acc_reference = (reference_h, sign_v * pitch)
+
+    def update_gyro(self, gyro_x, gyro_y, timestamp):
+        """Intègre un échantillon GYRO (deg/s), retourne (horizontal, vertical)"""
+        if self.last_timestamp is None:
+            self.last_timestamp = timestamp
+            return self.horizontal, self.vertical
+
+        # Un trou dans le flux ne doit pas projeter l'angle d'un coup
+        dt = min(max(timestamp - self.last_timestamp, 0.0), FUSION_MAX_DT)
+        self.last_timestamp = timestamp
+        if dt == 0.0:
+            return self.horizontal, self.vertical
+
+        # Valeurs inversées pour correspondre à l'intuition (cf. HeadTracker._get_raw_movement)
+        self.horizontal += -gyro_x * dt
+        self.vertical += -gyro_y * dt
+
+        # Correction lente vers la référence absolue de l'ACC
+        reference_h, reference_v = self.acc_reference or (None, None)
+        alpha = FUSION_TIME_CONSTANT / (FUSION_TIME_CONSTANT + dt)
+        # Sans référence (yaw, ou ACC pas encore reçu), simple fuite vers le neutre contre la dérive
+        leak = FUSION_LEAK_TIME_CONSTANT / (FUSION_LEAK_TIME_CONSTANT + dt)
+
+        if reference_h is not None:
+            self.horizontal = alpha * self.horizontal + (1 - alpha) * reference_h
+        else:
+            self.horizontal *= leak
+        if reference_v is not None:
+            self.vertical = alpha * self.vertical + (1 - alpha) * reference_v
+        else:
+            self.vertical *= leak
+
+        return self.horizontal, self.vertical
+
+class GyroBiasEstimator:
+    """Estime le biais du gyroscope pendant les phases de repos (moyenne à oubli exponentiel, O(1) par échantillon)
+
+    Le repos est détecté quand le signal reste proche de sa moyenne rapide pendant
+    BIAS_REST_FRAMES échantillons : un biais constant est stable, un mouvement ne l'est pas.
+    Une rotation lente et régulière est stable elle aussi ; elle se distingue du biais
+    par son écart à l'estimation courante (BIAS_MAX_DEVIATION).
+    """
+
+    def __init__(self, initial=(0.0, 0.0)):
+        self.bias_x, self.bias_y = initial
+        self.mean_x, self.mean_y = initial
+        self.rest_frames = 0
+
+    def update(self, gyro_x, gyro_y):
+        """Ajoute un échantillon, retourne sa valeur corrigée du biais"""
+        self.mean_x += BIAS_FAST_ALPHA * (gyro_x - self.mean_x)
+        self.mean_y += BIAS_FAST_ALPHA * (gyro_y - self.mean_y)
+
+        still = (abs(gyro_x - self.mean_x) < BIAS_REST_THRESHOLD and abs(gyro_y - self.mean_y) < BIAS_REST_THRESHOLD
+                 and abs(gyro_x - self.bias_x) < BIAS_MAX_DEVIATION and abs(gyro_y - self.bias_y) < BIAS_MAX_DEVIATION)
+        self.rest_frames = self.rest_frames + 1 if still else 0
+
+        # N'apprendre que pendant un repos confirmé
+        if self.rest_frames >= BIAS_REST_FRAMES:
+            self.bias_x += BIAS_ALPHA * (gyro_x - self.bias_x)
+            self.bias_y += BIAS_ALPHA * (gyro_y - self.bias_y)
+
+        return gyro_x - self.bias_x, gyro_y - self.bias_y
+
+    def get_bias(self):
+        """Estimation courante (x, y) en deg/s"""
+        return self.bias_x, self.bias_y
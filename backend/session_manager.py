@@ -0,0 +1,120 @@
+# session_manager.py - Plusieurs casques : une chaîne de suivi par flux GYRO, chacune dans son processus
+
+import multiprocessing
+
+from pylsl import resolve_byprop, resolve_bypred
+
+from config import *
+
+# Processus de streaming muselsl déjà lancés : adresse -> processus
+stream_processes = {}
+
+def _stream_headset(address):
+    """Processus de streaming d'un casque (muselsl bloque tant que la connexion dure)"""
+    from muselsl import stream
+    stream(address, acc_enabled=True, gyro_enabled=True)
+
+def start_headset_streams(muses):
+    """Lance le streaming LSL de chaque casque dans son propre processus, retourne les adresses démarrées"""
+    context = multiprocessing.get_context("spawn")
+    started = []
+    for muse in muses[:MAX_HEADSETS]:
+        address = muse['address']
+        process = stream_processes.get(address)
+        if process is not None and process.is_alive():
+            continue
+        process = context.Process(target=_stream_headset, args=(address,), daemon=True)
+        process.start()
+        stream_processes[address] = process
+        started.append(address)
+    return started
+
+def discover_headsets(timeout=HEADSET_DISCOVERY_TIMEOUT):
+    """Tous les flux GYRO visibles, un par casque, triés par source_id pour un ordre de joueurs stable"""
+    # Premier flux : on attend jusqu'au timeout ; ensuite, de courtes recherches
+    # tant que de nouveaux casques apparaissent (sans attendre MAX_HEADSETS)
+    by_source = {}
+    streams = resolve_byprop("type", "GYRO", minimum=1, timeout=timeout)
+    while streams:
+        found = len(by_source)
+        for info in streams:
+            by_source.setdefault(info.source_id(), info)
+        if len(by_source) == found or len(by_source) >= MAX_HEADSETS:
+            break
+        streams = resolve_byprop("type", "GYRO", minimum=MAX_HEADSETS, timeout=HEADSET_DISCOVERY_SETTLE)
+    return [by_source[source_id] for source_id in sorted(by_source)][:MAX_HEADSETS]
+
+def _player_process(index, source_id, stop_event):
+    """Chaîne complète d'un joueur : ses objets ne sont partagés avec aucun autre processus"""
+    from head_tracker import HeadTracker
+    from controllers import ControlManager
+    from pipeline import open_pipeline
+    from profiles import load_active_classifier, load_profile
+    from gesture_templates import GestureRecognizer
+
+    name = f"Joueur {index + 1}"
+    streams = resolve_bypred(f"type='GYRO' and source_id='{source_id}'", timeout=HEADSET_DISCOVERY_TIMEOUT)
+    if not streams:
+        print(f"❌ [{name}] Flux GYRO {source_id} introuvable.")
+        return
+
+    # Calibration propre au joueur si un profil lui est attribué
+    profile = PLAYER_PROFILES[index] if index < len(PLAYER_PROFILES) else None
+    classifier = load_profile(profile) if profile else load_active_classifier()
+    gesture_recognizer = GestureRecognizer() if GESTURE_TEMPLATES else None
+    head_tracker = HeadTracker(classifier, gesture_recognizer)
+
+    bindings = PLAYER_KEY_BINDINGS[index % len(PLAYER_KEY_BINDINGS)]
+    control_manager = ControlManager(key_bindings=bindings)
+    control_manager.set_mode(PLAYER_MODE)
+    keys = ", ".join(f"{direction}={key}" for direction, key in bindings.items())
+
+    if ASYNC_RUNTIME:
+        # Même boucle asyncio que le processus principal, pour ce seul flux
+        from runtime import Runtime
+        print(f"✅ [{name}] {source_id} : {keys}")
+        Runtime(head_tracker, control_manager, lambda: streams[:1], stop_event=stop_event, name=name).run()
+        return
+
+    control_manager.start()
+    pipeline = open_pipeline(streams[0], head_tracker, control_manager, name)
+    print(f"✅ [{name}] {source_id} : {keys}")
+    try:
+        pipeline.run(lambda: not stop_event.is_set())
+    finally:
+        control_manager.stop()
+
+class SessionManager:
+    """Lance et arrête un processus de suivi par casque"""
+
+    def __init__(self):
+        # spawn : même comportement sous Windows, Linux et macOS
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = None
+        self.processes = []
+
+    def start(self, streams):
+        """Démarre une chaîne par flux GYRO (liste de StreamInfo, dans l'ordre des joueurs)"""
+        self.stop_event = self.context.Event()
+        for index, info in enumerate(streams):
+            process = self.context.Process(
+                target=_player_process,
+                args=(index, info.source_id(), self.stop_event),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        print(f"🎮 {len(self.processes)} joueurs démarrés")
+
+    def stop(self):
+        """Arrête tous les joueurs"""
+        if self.stop_event:
+            self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+    def is_running(self):
+        return any(process.is_alive() for process in self.processes)
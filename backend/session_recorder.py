@@ -0,0 +1,233 @@
+# session_recorder.py - Capture des sessions Muse sur disque
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from pylsl import StreamInlet, resolve_byprop
+
+from config import *
+
+# Format d'une session (un dossier par session) :
+#   meta.json          description des flux (canaux, fréquence, nombre d'échantillons)
+#   <FLUX>.time.f64    horodatages LSL (float64, little-endian)
+#   <FLUX>.chN.f32     une colonne par canal (float32, little-endian)
+#   <FLUX>.index.f64   paires (horodatage, indice d'échantillon) tous les SESSION_INDEX_STRIDE échantillons
+TIME_DTYPE = np.dtype('<f8')
+DATA_DTYPE = np.dtype('<f4')
+
+def _stream_paths(session_dir, stream_type, channel_count):
+    """Retourne les chemins des fichiers d'un flux"""
+    base = os.path.join(session_dir, stream_type)
+    return {
+        'time': f"{base}.time.f64",
+        'index': f"{base}.index.f64",
+        'channels': [f"{base}.ch{i}.f32" for i in range(channel_count)],
+    }
+
+class _StreamWriter:
+    """Accumule les échantillons d'un flux et les écrit par blocs en colonnes"""
+
+    def __init__(self, session_dir, stream_type, channel_count):
+        self.paths = _stream_paths(session_dir, stream_type, channel_count)
+        self.channel_count = channel_count
+        self.time_file = open(self.paths['time'], 'ab')
+        self.index_file = open(self.paths['index'], 'ab')
+        self.channel_files = [open(path, 'ab') for path in self.paths['channels']]
+        self.pending_data = []
+        self.pending_timestamps = []
+        self.pending_count = 0
+        self.sample_count = 0
+
+    def append(self, samples, timestamps):
+        """Ajoute un lot d'échantillons au buffer"""
+        self.pending_data.append(np.asarray(samples, dtype=DATA_DTYPE).reshape(-1, self.channel_count))
+        self.pending_timestamps.append(np.asarray(timestamps, dtype=TIME_DTYPE))
+        self.pending_count += len(timestamps)
+
+    def flush(self):
+        """Écrit le buffer sur disque"""
+        if not self.pending_count:
+            return
+
+        data = np.concatenate(self.pending_data)
+        timestamps = np.concatenate(self.pending_timestamps)
+        self.pending_data = []
+        self.pending_timestamps = []
+        self.pending_count = 0
+
+        self.time_file.write(timestamps.tobytes())
+        for channel, channel_file in enumerate(self.channel_files):
+            channel_file.write(np.ascontiguousarray(data[:, channel]).tobytes())
+
+        # Index temporel clairsemé pour la recherche rapide
+        first = -self.sample_count % SESSION_INDEX_STRIDE
+        positions = np.arange(first, len(timestamps), SESSION_INDEX_STRIDE)
+        if len(positions):
+            index = np.column_stack((timestamps[positions], positions + self.sample_count))
+            self.index_file.write(index.astype(TIME_DTYPE).tobytes())
+
+        self.sample_count += len(timestamps)
+
+    def close(self):
+        """Vide le buffer et ferme les fichiers"""
+        self.flush()
+        for f in [self.time_file, self.index_file] + self.channel_files:
+            f.close()
+
+class SessionRecorder:
+    """Enregistre en arrière-plan tous les flux LSL du Muse dans une session"""
+
+    def __init__(self, stream_types=None, base_dir=SESSION_DIR):
+        self.stream_types = stream_types or SESSION_STREAMS
+        self.session_dir = os.path.join(base_dir, time.strftime("%Y%m%d-%H%M%S"))
+        self.inlets = {}
+        self.writers = {}
+        self.meta = {'created': time.time(), 'streams': {}}
+        self.is_running = False
+        self.thread = None
+
+    def start(self):
+        """Démarre le thread de capture (la résolution des flux s'y fait aussi)"""
+        self.is_running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def _open_streams(self):
+        """Résout les flux et prépare les fichiers de la session"""
+        for stream_type in self.stream_types:
+            if not self.is_running:
+                return False
+            streams = resolve_byprop("type", stream_type, timeout=SESSION_RESOLVE_TIMEOUT)
+            if not streams:
+                print(f"⚠️ Flux {stream_type} introuvable, non enregistré.")
+                continue
+            info = streams[0]
+            self.inlets[stream_type] = StreamInlet(info, max_buflen=SESSION_MAX_BUFLEN)
+            self.meta['streams'][stream_type] = {
+                'channels': info.channel_count(),
+                'srate': info.nominal_srate(),
+                'samples': 0,
+            }
+
+        if not self.inlets:
+            print("❌ Aucun flux à enregistrer.")
+            return False
+
+        os.makedirs(self.session_dir, exist_ok=True)
+        for stream_type, stream_meta in self.meta['streams'].items():
+            self.writers[stream_type] = _StreamWriter(self.session_dir, stream_type, stream_meta['channels'])
+        self._write_meta()
+        print(f"💾 Session enregistrée dans {self.session_dir}")
+        return True
+
+    def stop(self):
+        """Arrête la capture ; le thread de capture finalise lui-même la session"""
+        self.is_running = False
+        if self.thread:
+            self.thread.join(timeout=SESSION_RESOLVE_TIMEOUT * len(self.stream_types) + 1)
+            if self.thread.is_alive():
+                print("⚠️ Capture de session encore en cours, elle sera finalisée à sa sortie.")
+            self.thread = None
+
+    def _finish(self):
+        """Vide et ferme les fichiers, puis écrit le nombre d'échantillons de chaque flux"""
+        for stream_type, writer in self.writers.items():
+            writer.close()
+            self.meta['streams'][stream_type]['samples'] = writer.sample_count
+        self.writers = {}
+        if os.path.isdir(self.session_dir):
+            self._write_meta()
+
+    def _capture_loop(self):
+        """Tire les échantillons de chaque flux et les écrit par blocs"""
+        try:
+            if self._open_streams():
+                self._capture()
+        finally:
+            # Seul ce thread écrit : il ferme les fichiers après sa dernière écriture
+            self.is_running = False
+            self._finish()
+
+    def _capture(self):
+        last_flush = time.time()
+
+        while self.is_running:
+            try:
+                for stream_type, inlet in self.inlets.items():
+                    data, timestamps = inlet.pull_chunk(timeout=0.0, max_samples=SESSION_CHUNK_SAMPLES)
+                    if timestamps:
+                        writer = self.writers[stream_type]
+                        writer.append(data, timestamps)
+                        if writer.pending_count >= SESSION_CHUNK_SAMPLES:
+                            writer.flush()
+
+                if time.time() - last_flush > SESSION_FLUSH_INTERVAL:
+                    for writer in self.writers.values():
+                        writer.flush()
+                    last_flush = time.time()
+            except Exception as e:
+                print(f"⚠️ Erreur d'enregistrement de session: {e}")
+
+            time.sleep(SESSION_POLL_INTERVAL)
+
+    def _write_meta(self):
+        """Écrit la description de la session"""
+        with open(os.path.join(self.session_dir, 'meta.json'), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+class SessionReader:
+    """Lit une session enregistrée via des fichiers mappés en mémoire"""
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        with open(os.path.join(session_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+    def streams(self):
+        """Retourne la liste des flux enregistrés"""
+        return list(self.meta['streams'])
+
+    def _paths(self, stream_type):
+        return _stream_paths(self.session_dir, stream_type, self.meta['streams'][stream_type]['channels'])
+
+    def _memmap(self, path, dtype):
+        # np.memmap refuse les fichiers vides (session interrompue avant la première écriture)
+        if os.path.getsize(path) < dtype.itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def timestamps(self, stream_type):
+        """Horodatages d'un flux"""
+        return self._memmap(self._paths(stream_type)['time'], TIME_DTYPE)
+
+    def channel(self, stream_type, channel):
+        """Colonne d'un canal d'un flux"""
+        return self._memmap(self._paths(stream_type)['channels'][channel], DATA_DTYPE)
+
+    def seek(self, stream_type, timestamp):
+        """Indice du premier échantillon dont l'horodatage est >= timestamp"""
+        timestamps = self.timestamps(stream_type)
+        index = self._memmap(self._paths(stream_type)['index'], TIME_DTYPE).reshape(-1, 2)
+
+        # Recherche grossière dans l'index, puis fine dans un seul bloc
+        block = np.searchsorted(index[:, 0], timestamp, side='right') - 1
+        start = int(index[block, 1]) if block >= 0 else 0
+        stop = min(start + SESSION_INDEX_STRIDE, len(timestamps))
+        if block + 1 >= len(index):
+            stop = len(timestamps)
+        return start + int(np.searchsorted(timestamps[start:stop], timestamp))
+
+    def read(self, stream_type, start_time=None, end_time=None):
+        """Retourne (horodatages, données N×canaux) entre deux instants"""
+        timestamps = self.timestamps(stream_type)
+        n_samples = len(timestamps)
+        start = self.seek(stream_type, start_time) if start_time is not None else 0
+        stop = self.seek(stream_type, end_time) if end_time is not None else n_samples
+
+        channels = self.meta['streams'][stream_type]['channels']
+        data = np.column_stack([self.channel(stream_type, i)[start:stop] for i in range(channels)]) \
+            if stop > start else np.empty((0, channels), dtype=DATA_DTYPE)
+        return np.array(timestamps[start:stop]), data
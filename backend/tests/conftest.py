@@ -0,0 +1,6 @@
+# conftest.py - Les modules du backend s'importent à plat (from config import *)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,74 @@
+# test_audio_buffer.py - Anneau audio partagé entre la capture et l'inférence
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from audio_buffer import SharedAudioRing, DROP_OLDEST, DROP_NEWEST
+
+@pytest.fixture
+def make_ring():
+    rings = []
+    def make(capacity=16, policy=DROP_OLDEST):
+        ring = SharedAudioRing(capacity, policy=policy)
+        rings.append(ring)
+        return ring
+    yield make
+    for ring in rings:
+        ring.close()
+
+def test_reads_in_order_across_the_wrap(make_ring):
+    ring = make_ring(16)
+    received = []
+    for start in range(0, 100, 7):
+        ring.write(np.arange(start, start + 7, dtype=np.float32))
+        received.extend(ring.read(5))
+        received.extend(ring.read())
+    assert received == list(range(0, 105))
+    assert ring.depth() == 0
+
+def test_drop_oldest_keeps_the_latest_samples(make_ring):
+    ring = make_ring(16, DROP_OLDEST)
+    ring.write(np.arange(10, dtype=np.float32))
+    ring.write(np.arange(10, 20, dtype=np.float32))
+    assert ring.depth() == 16
+    assert ring.read().tolist() == list(range(4, 20))
+    assert ring.stats()['dropped'] == 4
+
+def test_drop_newest_refuses_blocks_that_do_not_fit(make_ring):
+    ring = make_ring(16, DROP_NEWEST)
+    assert ring.write(np.arange(10, dtype=np.float32))
+    assert not ring.write(np.arange(10, 20, dtype=np.float32))
+    assert ring.read().tolist() == list(range(10))
+    assert ring.stats() == {'written': 10, 'dropped': 10, 'input_overflows': 0, 'depth': 0}
+
+def test_block_larger_than_the_ring(make_ring):
+    ring = make_ring(16, DROP_OLDEST)
+    ring.write(np.arange(40, dtype=np.float32))
+    assert ring.read().tolist() == list(range(24, 40))
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        SharedAudioRing(16, policy="drop_random")
+
+def _produce(name, blocks, block_size):
+    ring = SharedAudioRing(name=name, policy=DROP_NEWEST)
+    for i in range(blocks):
+        block = np.arange(i * block_size, (i + 1) * block_size, dtype=np.float32)
+        while not ring.write(block):
+            pass
+    ring.close()
+
+def test_producer_in_another_process(make_ring):
+    ring = make_ring(64, DROP_NEWEST)
+    blocks, block_size = 200, 10
+    producer = multiprocessing.get_context("spawn").Process(target=_produce, args=(ring.name, blocks, block_size))
+    producer.start()
+    received = []
+    while len(received) < blocks * block_size:
+        received.extend(ring.read().tolist())
+        if not producer.is_alive() and ring.depth() == 0:
+            break
+    producer.join(10)
+    assert received == list(range(blocks * block_size))
@@ -0,0 +1,78 @@
+# test_calibration.py - Isolement de l'aller du geste et rejet des valeurs aberrantes
+
+import numpy as np
+import pytest
+
+from calibration import _active_samples, _reject_outliers
+from config import CALIBRATION_MIN_SAMPLES, GYRO_SRATE
+from direction_classifier import DirectionClassifier, POSE_AXES
+from head_tracker import HeadTracker
+from replay import synthetic_gyro_trace
+
+CENTER = np.array([-4.0, 4.5])
+
+def pulse(axis, amplitude, duration):
+    n_samples = int(duration * GYRO_SRATE)
+    return np.outer(np.sin(np.linspace(0, np.pi, n_samples)), axis) * amplitude
+
+def capture(direction, rng, spikes=0):
+    """Pose enregistrée : repos, aller du geste, retour plus lent en sens inverse, repos"""
+    axis = np.asarray(POSE_AXES[direction])
+    movement = np.concatenate([np.zeros((40, 2)), pulse(axis, 40, 0.3), pulse(-axis, 25, 0.5), np.zeros((60, 2))])
+    samples = CENTER + movement + rng.normal(0, 1.5, movement.shape)
+    # Pics isolés (contact du capteur, choc)
+    for index in rng.choice(len(samples), spikes, replace=False):
+        samples[index] += rng.choice([-1, 1], 2) * 200
+    return samples
+
+@pytest.mark.parametrize("direction", list(POSE_AXES))
+def test_active_samples_keep_the_outgoing_swing(direction):
+    samples = capture(direction, np.random.default_rng(0))
+    active = _active_samples(samples, CENTER, direction)
+    progress = (active - CENTER) @ np.asarray(POSE_AXES[direction])
+    assert len(active) >= CALIBRATION_MIN_SAMPLES
+    # Uniquement l'aller : pas de repos ni de retour en sens inverse
+    assert np.all(progress > 15)
+
+def test_active_samples_without_movement():
+    rest = CENTER + np.random.default_rng(0).normal(0, 1.5, (150, 2))
+    assert len(_active_samples(rest, CENTER, 'HAUT')) < CALIBRATION_MIN_SAMPLES
+
+def test_reject_outliers_removes_spikes():
+    rng = np.random.default_rng(0)
+    rest = CENTER + rng.normal(0, 1.5, (150, 2))
+    rest[[10, 50, 90]] += 200
+    kept = _reject_outliers(rest)
+    assert len(kept) == 147
+    assert np.all(np.abs(kept - CENTER) < 10)
+
+def calibrate(rng, spikes=3):
+    """Même traitement que CalibrationJob, sur des poses synthétiques"""
+    center = CENTER + rng.normal(0, 1.5, (150, 2))
+    center[rng.choice(150, spikes, replace=False)] += 200
+    poses = {'CENTRE': _reject_outliers(center)}
+    for direction in POSE_AXES:
+        active = _active_samples(capture(direction, rng, spikes), poses['CENTRE'].mean(axis=0), direction)
+        poses[direction] = _reject_outliers(active)
+        assert len(poses[direction]) >= CALIBRATION_MIN_SAMPLES
+    return DirectionClassifier.from_samples(poses)
+
+def tracked_directions(classifier, sequence):
+    """Directions successives (hors centre) données par le tracker sur une trace synthétique"""
+    _, trace = synthetic_gyro_trace(sequence)
+    tracker = HeadTracker(classifier)
+    directions = []
+    for x, y in (trace[:, :2] + CENTER).tolist():
+        state = tracker.update(x, y)
+        if state != 'CENTRE' and (not directions or directions[-1] != state):
+            directions.append(state)
+    return directions
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_calibrated_classifier_tracks_each_direction(seed):
+    classifier = calibrate(np.random.default_rng(seed))
+    assert classifier.inconsistent_directions() == []
+    sequence = [('CENTRE', 1.0)]
+    for direction in ['HAUT', 'BAS', 'GAUCHE', 'DROITE']:
+        sequence += [(direction, 0.4), ('CENTRE', 1.0)]
+    assert tracked_directions(classifier, sequence) == ['HAUT', 'BAS', 'GAUCHE', 'DROITE']
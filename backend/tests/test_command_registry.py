@@ -0,0 +1,74 @@
+# test_command_registry.py - Recherche des commandes vocales dans le texte reconnu
+
+import random
+
+import pytest
+
+from command_registry import CommandRegistry, tokenize
+from config import VOICE_BINDINGS, VOICE_MAX_REPEAT
+
+BINDINGS = {
+    "up": ("tap", "up"),
+    "left": ("tap", "left"),
+    "left click": ("click", "left"),
+    "right click": ("click", "right"),
+}
+
+@pytest.fixture
+def registry():
+    return CommandRegistry(BINDINGS)
+
+@pytest.mark.parametrize("text, command", [
+    (" Left click twice. Up up.", "left click twice"),
+    ("left three times, right click", "left three times"),
+    ("up x3 left", "up x3"),
+    ("left three up", "left"),
+    ("um, right click please", "right click"),
+])
+def test_first_command_stops_after_the_first_complete_command(registry, text, command):
+    assert registry.first_command(text) == command
+    # Le texte coupé donne la même commande que le texte complet
+    assert registry.match(command) == registry.match(text)
+
+def test_first_command_without_command(registry):
+    assert registry.first_command("two two eight") is None
+
+@pytest.mark.parametrize("text, expected", [
+    ("left", ("left", ("tap", "left"), 1)),
+    ("Left click!", ("left click", ("click", "left"), 1)),
+    ("left twice", ("left", ("tap", "left"), 2)),
+    ("up 3 times", ("up", ("tap", "up"), 3)),
+    ("up three", ("up", ("tap", "up"), 1)),
+    ("right", None),
+    ("", None),
+])
+def test_match_prefers_the_longest_phrase(registry, text, expected):
+    assert registry.match(text) == expected
+
+def test_repeat_count_is_clamped(registry):
+    assert registry.match("up x99")[2] == VOICE_MAX_REPEAT
+    assert registry.match("up 0 times")[2] == 1
+
+def test_every_default_binding_matches_itself():
+    registry = CommandRegistry()
+    for phrase, action in VOICE_BINDINGS.items():
+        assert registry.match(phrase) == (phrase, action, 1)
+    vocabulary = set(registry.vocabulary())
+    assert all(word in vocabulary for phrase in VOICE_BINDINGS for word in tokenize(phrase))
+
+def test_trie_agrees_with_a_linear_scan(registry):
+    # Référence : essaie toutes les phrases à chaque position, la plus longue d'abord
+    phrases = sorted(BINDINGS, key=lambda phrase: -len(tokenize(phrase)))
+    def scan(words):
+        for start in range(len(words)):
+            for phrase in phrases:
+                n = len(tokenize(phrase))
+                if words[start:start + n] == tokenize(phrase):
+                    return phrase
+        return None
+    vocabulary = ["up", "left", "right", "click", "um", "down"]
+    rng = random.Random(0)
+    for _ in range(500):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 6))]
+        found = registry.match(" ".join(words))
+        assert (found[0] if found else None) == scan(words)
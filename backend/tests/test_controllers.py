@@ -0,0 +1,23 @@
+# test_controllers.py - Souris analogique pilotée par lots d'échantillons
+
+import pytest
+
+from config import GYRO_SRATE
+from controllers import MouseControl
+from recording_backend import RecordingMouse
+
+def test_sample_period_follows_lsl_timestamps_within_a_batch():
+    mouse_control = MouseControl(RecordingMouse())
+    # Un lot de pull_chunk : traité en quelques microsecondes, horodaté à 52 Hz
+    for i in range(200):
+        mouse_control.set_analog_input(-40.0, 0.0, 100.0 + i / GYRO_SRATE)
+    assert mouse_control.sample_period == pytest.approx(1 / GYRO_SRATE, rel=0.01)
+
+def test_sample_period_ignores_gaps_and_resets():
+    mouse_control = MouseControl(RecordingMouse())
+    mouse_control.set_analog_input(-40.0, 0.0, 100.0)
+    # Trou dans le flux (reconnexion) : pas pris pour une période
+    mouse_control.set_analog_input(-40.0, 0.0, 105.0)
+    assert mouse_control.sample_period == pytest.approx(1 / GYRO_SRATE)
+    mouse_control.reset_analog()
+    assert mouse_control.last_sample_time is None
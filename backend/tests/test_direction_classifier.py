@@ -0,0 +1,66 @@
+# test_direction_classifier.py - Classifieur LDA : classement, format de fichier et validation au chargement
+
+import json
+
+import numpy as np
+import pytest
+
+from direction_classifier import DirectionClassifier, POSE_AXES
+from head_tracker import DIRECTION_LABELS
+
+# Ancien calibration_data.json : poses au repos, sans covariance, haut et bas inversés
+LEGACY_CALIBRATION = {
+    "center": {"x": -4.23, "y": 4.58, "z": 1.18}, "right": {"x": -13.1, "y": 4.45, "z": -3.69},
+    "left": {"x": 10.19, "y": 6.45, "z": 12.11}, "down": {"x": -11.91, "y": 9.37, "z": -5.92},
+    "up": {"x": -3.97, "y": -9.86, "z": 3.03},
+}
+
+CENTER = np.array([-4.0, 4.5])
+
+def make_classifier(seed=0, spread=4.0, amplitude=36.0):
+    rng = np.random.default_rng(seed)
+    samples = {'CENTRE': rng.normal(CENTER, spread, (150, 2))}
+    for label, axis in POSE_AXES.items():
+        samples[label] = rng.normal(CENTER + amplitude * np.asarray(axis), spread, (20, 2))
+    return DirectionClassifier.from_samples(samples)
+
+def test_classifies_each_direction_and_diagonals():
+    classifier = make_classifier()
+    assert DIRECTION_LABELS[classifier.classify(*CENTER)] == 'CENTRE'
+    for label, axis in POSE_AXES.items():
+        assert DIRECTION_LABELS[classifier.classify(*(CENTER + 30 * np.asarray(axis)))] == label
+    # Gauche (+x) et haut (+y) en même temps
+    assert DIRECTION_LABELS[classifier.classify(*(CENTER + [25, 25]))] == 'GAUCHE HAUT'
+    assert DIRECTION_LABELS[classifier.classify(*(CENTER + [-25, -25]))] == 'DROITE BAS'
+
+def test_classify_batch_matches_classify():
+    classifier = make_classifier()
+    gyro = np.random.default_rng(1).normal(0, 30, (500, 2))
+    expected = [classifier.classify(x, y) for x, y in gyro]
+    assert classifier.classify_batch(gyro[:, 0], gyro[:, 1]).tolist() == expected
+
+def test_save_and_load_round_trip(tmp_path):
+    classifier = make_classifier()
+    path = tmp_path / "profile.json"
+    classifier.save(str(path))
+    loaded = DirectionClassifier.load(str(path))
+    assert loaded is not None
+    gyro = np.random.default_rng(2).normal(0, 30, (500, 2))
+    assert np.array_equal(loaded.classify_batch(gyro[:, 0], gyro[:, 1]), classifier.classify_batch(gyro[:, 0], gyro[:, 1]))
+
+def test_load_rejects_the_legacy_file(tmp_path):
+    path = tmp_path / "calibration_data.json"
+    path.write_text(json.dumps(LEGACY_CALIBRATION))
+    assert DirectionClassifier.load(str(path)) is None
+
+@pytest.mark.parametrize("swapped", [('up', 'down'), ('left', 'right')])
+def test_load_rejects_directions_on_the_wrong_side(tmp_path, swapped):
+    data = make_classifier().to_dict()
+    first, second = swapped
+    data[first], data[second] = data[second], data[first]
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(data))
+    assert DirectionClassifier.load(str(path)) is None
+
+def test_load_missing_file(tmp_path):
+    assert DirectionClassifier.load(str(tmp_path / "absent.json")) is None
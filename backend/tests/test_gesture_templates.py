@@ -0,0 +1,85 @@
+# test_gesture_templates.py - DTW en bande, borne LB_Keogh et choix du gabarit
+
+import numpy as np
+import pytest
+
+from config import GESTURE_ACCEPT_DISTANCE, GESTURE_DTW_WINDOW, GESTURE_TEMPLATE_LENGTH
+from gesture_templates import GestureRecognizer, dtw_distance, envelope, lb_keogh, resample
+
+def reference_dtw(query, template, window):
+    """DTW directe (somme des carrés) dans la bande de Sakoe-Chiba"""
+    n = len(query)
+    cost = np.full((n + 1, n + 1), np.inf)
+    cost[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - window), min(n, i + window) + 1):
+            d = np.sum((query[i - 1] - template[j - 1]) ** 2)
+            cost[i, j] = d + min(cost[i - 1, j - 1], cost[i - 1, j], cost[i, j - 1])
+    return cost[n, n]
+
+def random_gestures(seed, count):
+    rng = np.random.default_rng(seed)
+    return [resample(np.cumsum(rng.normal(0, 8, (rng.integers(10, 60), 2)), axis=0)) for _ in range(count)]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dtw_matches_reference_and_lb_keogh_is_a_lower_bound(seed):
+    query, *templates = random_gestures(seed, 6)
+    upper, lower = zip(*(envelope(template, GESTURE_DTW_WINDOW) for template in templates))
+    bounds = lb_keogh(query, np.stack(upper), np.stack(lower))
+    for template, bound in zip(templates, bounds):
+        distance = dtw_distance(query, template, GESTURE_DTW_WINDOW)
+        assert distance == pytest.approx(reference_dtw(query, template, GESTURE_DTW_WINDOW))
+        assert bound <= distance + 1e-9
+
+def test_dtw_early_abandon():
+    query, template = random_gestures(7, 2)
+    distance = dtw_distance(query, template, GESTURE_DTW_WINDOW)
+    assert dtw_distance(query, template, GESTURE_DTW_WINDOW, distance * 2) == pytest.approx(distance)
+    assert dtw_distance(query, template, GESTURE_DTW_WINDOW, distance / 2) == float('inf')
+
+def nod(amplitude, cycles, length=40):
+    phase = np.linspace(0, 2 * np.pi * cycles, length)
+    return np.column_stack([np.zeros(length), amplitude * np.sin(phase)])
+
+def shake(amplitude, cycles, length=40):
+    return nod(amplitude, cycles, length)[:, ::-1]
+
+@pytest.fixture
+def recognizer(tmp_path):
+    for name, gestures in {"NOD": [nod(40, 2), nod(35, 2, 50)], "SHAKE": [shake(40, 2), shake(45, 2, 30)],
+                           "DOUBLE_TILT": [np.column_stack([nod(30, 1)[:, 1], nod(30, 1)[:, 1]])]}.items():
+        folder = tmp_path / name
+        folder.mkdir()
+        for i, gesture in enumerate(gestures):
+            np.save(folder / f"{i}.npy", gesture)
+    return GestureRecognizer(str(tmp_path))
+
+def brute_force(recognizer, trajectory):
+    query = resample(trajectory)
+    distances = [dtw_distance(query, template, GESTURE_DTW_WINDOW) for template in recognizer.templates]
+    best = int(np.argmin(distances))
+    return recognizer.names[best], (distances[best] / GESTURE_TEMPLATE_LENGTH) ** 0.5
+
+@pytest.mark.parametrize("trajectory, expected", [
+    (nod(38, 2, 45), "NOD"),
+    (shake(42, 2, 35), "SHAKE"),
+    (np.column_stack([nod(28, 1)[:, 1], nod(28, 1)[:, 1]]), "DOUBLE TILT"),
+])
+def test_match_returns_the_nearest_template(recognizer, trajectory, expected):
+    trajectory = trajectory + np.random.default_rng(0).normal(0, 2, trajectory.shape)
+    name, distance = recognizer.match(trajectory)
+    assert name == expected
+    # L'élagage ne change pas le résultat d'une recherche exhaustive
+    expected_name, expected_distance = brute_force(recognizer, trajectory)
+    assert name == expected_name
+    assert distance == pytest.approx(expected_distance)
+
+def test_match_rejects_unknown_gestures(recognizer):
+    name, distance = recognizer.match(np.tile([60.0, -60.0], (30, 1)))
+    assert name is None
+    assert distance >= GESTURE_ACCEPT_DISTANCE
+
+def test_without_templates(tmp_path):
+    recognizer = GestureRecognizer(str(tmp_path / "absent"))
+    assert not recognizer.is_ready()
+    assert recognizer.match(nod(40, 2)) == (None, float('inf'))
@@ -0,0 +1,57 @@
+# test_head_tracker.py - update_batch doit rester identique à update échantillon par échantillon
+
+import numpy as np
+import pytest
+
+from head_tracker import HeadTracker
+from direction_classifier import DirectionClassifier
+
+def random_trace(seed, length=3000):
+    """Repos bruité entrecoupé de mouvements de tête aléatoires (N×2, deg/s)"""
+    rng = np.random.default_rng(seed)
+    trace = []
+    while len(trace) < length:
+        rest = rng.integers(5, 60)
+        trace += rng.normal(0.0, 1.5, (rest, 2)).tolist()
+        swing = rng.integers(3, 30)
+        angle = rng.uniform(0, 2 * np.pi)
+        amplitude = rng.uniform(5, 80)
+        profile = np.sin(np.linspace(0, rng.choice([1, 2]) * np.pi, swing))
+        movement = np.outer(profile, [np.cos(angle), np.sin(angle)]) * amplitude
+        trace += (movement + rng.normal(0.0, 1.5, movement.shape)).tolist()
+    return np.array(trace[:length])
+
+def make_classifier():
+    rng = np.random.default_rng(0)
+    poses = {'CENTRE': (-4.0, 4.5), 'DROITE': (-40, 3), 'GAUCHE': (35, 6), 'BAS': (-3, -38), 'HAUT': (-5, 42)}
+    return DirectionClassifier.from_samples({label: rng.normal(mean, 4.0, (50, 2)) for label, mean in poses.items()})
+
+def make_tracker(with_classifier, early_commit):
+    tracker = HeadTracker(make_classifier() if with_classifier else None)
+    tracker.early_commit = early_commit
+    return tracker
+
+@pytest.mark.parametrize("early_commit", [False, True])
+@pytest.mark.parametrize("with_classifier", [False, True])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_update_batch_matches_update(seed, with_classifier, early_commit):
+    trace = random_trace(seed)
+    scalar = make_tracker(with_classifier, early_commit)
+    batched = make_tracker(with_classifier, early_commit)
+
+    expected = [scalar.update(x, y) for x, y in trace.tolist()]
+
+    # Lots de tailles irrégulières, comme les pull_chunk de LSL
+    rng = np.random.default_rng(seed)
+    states = []
+    start = 0
+    while start < len(trace):
+        size = int(rng.integers(1, 40))
+        states += batched.update_batch(trace[start:start + size])
+        start += size
+
+    assert states == expected
+    assert len(set(expected)) > 1
+    assert list(batched.commit_latencies) == list(scalar.commit_latencies)
+    assert batched.get_history() == scalar.get_history()
+    assert batched.get_bias() == scalar.get_bias()
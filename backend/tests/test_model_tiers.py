@@ -0,0 +1,57 @@
+# test_model_tiers.py - Changement de palier Whisper sans toucher au thread de reconnaissance
+
+import threading
+import time
+
+import model_tiers
+from model_tiers import ModelTierSelector
+
+TIERS = [
+    {"model": "tiny", "compute_type": "int8", "beam_size": 1},
+    {"model": "base", "compute_type": "int8", "beam_size": 1},
+]
+
+def test_background_load_is_applied_by_record(monkeypatch):
+    loaded = threading.Event()
+    release = threading.Event()
+
+    def load_model(size, compute_type):
+        release.wait(5)
+        loaded.set()
+        return f"{size}/{compute_type}"
+    monkeypatch.setattr(model_tiers, "load_model", load_model)
+
+    selector = ModelTierSelector("tiny/int8", TIERS)
+    # Décodages rapides : demande de montée vers "base", chargée en arrière-plan
+    for _ in range(model_tiers.VOICE_TIER_UPGRADE_DECODES):
+        selector.record(0.01, 1.0, 0.0)
+    assert selector.loading and selector.index == 0
+
+    release.set()
+    assert loaded.wait(5)
+    while selector.loading:
+        time.sleep(0.001)
+    # Le chargeur n'a fait que déposer le modèle : rien ne change avant le prochain record()
+    assert selector.index == 0 and selector.latency_ema is not None
+    assert selector.pending_index == 1
+
+    selector.record(0.01, 1.0, 0.0)
+    assert selector.index == 1
+    assert selector.model == "base/int8"
+    assert selector.pending_index is None
+    # Les mesures suivantes repartent sur le nouveau palier
+    selector.record(0.01, 1.0, 0.0)
+    assert selector.latency_ema is not None
+
+def test_failed_load_keeps_the_current_tier(monkeypatch):
+    def load_model(size, compute_type):
+        raise OSError("hors ligne")
+    monkeypatch.setattr(model_tiers, "load_model", load_model)
+
+    selector = ModelTierSelector("tiny/int8", TIERS)
+    for _ in range(model_tiers.VOICE_TIER_UPGRADE_DECODES):
+        selector.record(0.01, 1.0, 0.0)
+    while selector.loading:
+        time.sleep(0.001)
+    selector.record(0.01, 1.0, 0.0)
+    assert selector.index == 0 and selector.model == "tiny/int8"
@@ -0,0 +1,48 @@
+# test_profiles.py - Profil actif ou seuils fixes, jamais l'ancien fichier de calibration
+
+import json
+
+import numpy as np
+import pytest
+
+import profiles
+from head_tracker import HeadTracker
+from replay import synthetic_gyro_trace
+from test_direction_classifier import LEGACY_CALIBRATION, make_classifier
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Dossier de travail avec l'ancien calibration_data.json et un dossier de profils vide"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(profiles, "PROFILE_DIR", str(tmp_path / "profiles"))
+    monkeypatch.setattr(profiles, "_cache", {})
+    (tmp_path / profiles.CALIBRATION_FILE).write_text(json.dumps(LEGACY_CALIBRATION))
+    return tmp_path
+
+def tracked_directions(classifier, sequence):
+    _, trace = synthetic_gyro_trace(sequence)
+    tracker = HeadTracker(classifier)
+    directions = []
+    for x, y in trace[:, :2].tolist():
+        state = tracker.update(x, y)
+        if state != 'CENTRE' and (not directions or directions[-1] != state):
+            directions.append(state)
+    return directions
+
+def test_without_active_profile_the_legacy_file_is_ignored(workdir):
+    classifier = profiles.load_active_classifier()
+    assert classifier is None
+    sequence = [('CENTRE', 1.0), ('HAUT', 0.4), ('CENTRE', 1.0), ('BAS', 0.4), ('CENTRE', 1.0)]
+    assert tracked_directions(classifier, sequence) == ['HAUT', 'BAS']
+
+def test_active_profile_is_loaded(workdir):
+    profiles.save_profile("alice", make_classifier())
+    profiles._cache.clear()
+    classifier = profiles.load_active_classifier()
+    assert classifier is not None
+    assert profiles.get_active_profile() == "alice"
+    assert np.allclose(classifier.centroids, make_classifier().centroids, atol=0.01)
+
+def test_missing_active_profile_falls_back_to_thresholds(workdir):
+    profiles.set_active_profile("bob")
+    assert profiles.load_active_classifier() is None
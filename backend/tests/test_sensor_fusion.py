@@ -0,0 +1,44 @@
+# test_sensor_fusion.py - Estimation du biais gyro : suit la dérive, ignore les rotations lentes
+
+import numpy as np
+import pytest
+
+from config import GYRO_SRATE
+from sensor_fusion import GyroBiasEstimator
+
+def run(estimator, trace):
+    """Biais estimé après chaque échantillon"""
+    biases = []
+    for x, y in trace.tolist():
+        estimator.update(x, y)
+        biases.append(estimator.get_bias())
+    return np.array(biases)
+
+def test_tracks_a_slow_drift():
+    rng = np.random.default_rng(0)
+    t = np.arange(60 * GYRO_SRATE) / GYRO_SRATE
+    # Dérive thermique : 0 -> (3, -2) deg/s en une minute, tête immobile
+    drift = np.outer(t / t[-1], [3.0, -2.0])
+    biases = run(GyroBiasEstimator(), drift + rng.normal(0, 0.5, drift.shape))
+    assert np.all(np.abs(biases[-GYRO_SRATE:] - drift[-GYRO_SRATE:]) < 0.5)
+
+@pytest.mark.parametrize("rate", [(12.0, 0.0), (0.0, -12.0), (9.0, 9.0)])
+def test_ignores_a_slow_steady_turn(rate):
+    rng = np.random.default_rng(1)
+    rest = np.tile([1.0, -1.0], (5 * GYRO_SRATE, 1))
+    turn = np.tile(np.add([1.0, -1.0], rate), (5 * GYRO_SRATE, 1))
+    trace = np.concatenate([rest, turn, rest])
+    estimator = GyroBiasEstimator()
+    biases = run(estimator, trace + rng.normal(0, 0.5, trace.shape))
+    # Rotation régulière, donc « immobile » pour la moyenne rapide, mais loin du biais : rien appris
+    during_turn = biases[len(rest):len(rest) + len(turn)]
+    assert np.all(np.abs(during_turn - [1.0, -1.0]) < 0.5)
+    assert np.allclose(estimator.get_bias(), [1.0, -1.0], atol=0.3)
+
+def test_does_not_learn_during_movement():
+    rng = np.random.default_rng(2)
+    estimator = GyroBiasEstimator((1.0, -1.0))
+    swings = 40 * np.sin(np.linspace(0, 20 * np.pi, 10 * GYRO_SRATE))
+    trace = np.column_stack([swings, swings / 2]) + [1.0, -1.0] + rng.normal(0, 0.5, (len(swings), 2))
+    run(estimator, trace)
+    assert np.allclose(estimator.get_bias(), [1.0, -1.0], atol=0.3)
@@ -0,0 +1,45 @@
+# test_session_recorder.py - Écriture en colonnes et recherche temporelle d'une session
+
+import json
+
+import numpy as np
+import pytest
+
+from config import SESSION_INDEX_STRIDE
+from session_recorder import SessionReader, _StreamWriter
+
+def write_session(session_dir, timestamps, data, chunk):
+    """Écrit un flux GYRO par lots irréguliers, comme le thread de capture"""
+    writer = _StreamWriter(str(session_dir), 'GYRO', data.shape[1])
+    for start in range(0, len(timestamps), chunk):
+        writer.append(data[start:start + chunk], timestamps[start:start + chunk])
+        if start % (3 * chunk) == 0:
+            writer.flush()
+    writer.close()
+    meta = {'streams': {'GYRO': {'channels': data.shape[1], 'srate': 52.0, 'samples': writer.sample_count}}}
+    with open(session_dir / 'meta.json', 'w') as f:
+        json.dump(meta, f)
+    return SessionReader(str(session_dir))
+
+@pytest.mark.parametrize("chunk", [1, 37, 1000])
+def test_seek_matches_searchsorted(tmp_path, chunk):
+    rng = np.random.default_rng(chunk)
+    n_samples = 5 * SESSION_INDEX_STRIDE + 17
+    timestamps = 1000.0 + np.cumsum(rng.uniform(0.01, 0.03, n_samples))
+    data = rng.normal(0.0, 10.0, (n_samples, 3)).astype(np.float32)
+    reader = write_session(tmp_path, timestamps, data, chunk)
+
+    assert np.array_equal(reader.timestamps('GYRO'), timestamps)
+    queries = np.concatenate([[0.0, timestamps[0], timestamps[-1], timestamps[-1] + 1],
+                              timestamps[::SESSION_INDEX_STRIDE], rng.uniform(timestamps[0], timestamps[-1], 50)])
+    for query in queries:
+        assert reader.seek('GYRO', query) == np.searchsorted(timestamps, query)
+
+def test_read_returns_the_requested_window(tmp_path):
+    timestamps = np.arange(1000, dtype=np.float64) / 52.0
+    data = np.column_stack([np.arange(1000), -np.arange(1000), np.zeros(1000)]).astype(np.float32)
+    reader = write_session(tmp_path, timestamps, data, 64)
+
+    window_timestamps, window = reader.read('GYRO', timestamps[300], timestamps[700])
+    assert np.array_equal(window_timestamps, timestamps[300:700])
+    assert np.array_equal(window, data[300:700])
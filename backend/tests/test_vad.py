@@ -0,0 +1,77 @@
+# test_vad.py - Découpage en énoncés et plancher de bruit adaptatif
+
+import numpy as np
+import pytest
+
+from config import VAD_FLOOR_WINDOW, VAD_FRAME_MS, VAD_MAX_UTTERANCE, VOICE_SAMPLERATE
+from vad import UtteranceSegmenter
+
+RATE = VOICE_SAMPLERATE
+
+def noise(seconds, level, rng):
+    return rng.normal(0, level, int(seconds * RATE)).astype(np.float32)
+
+def word(seconds, level, rng):
+    """Voyelle synthétique : sinusoïde bruitée"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (level * np.sin(2 * np.pi * 220 * t) + rng.normal(0, level / 10, len(t))).astype(np.float32)
+
+def feed(segmenter, audio, rng, max_chunk=2000):
+    """Blocs de taille irrégulière, comme le callback audio"""
+    utterances = []
+    start = 0
+    while start < len(audio):
+        size = int(rng.integers(1, max_chunk))
+        utterances += segmenter.process(audio[start:start + size])
+        start += size
+    return utterances
+
+def test_splits_words_separated_by_pauses():
+    rng = np.random.default_rng(0)
+    parts = [noise(0.5, 0.002, rng)]
+    for duration in (0.3, 0.5, 0.4):
+        parts += [word(duration, 0.2, rng), noise(0.8, 0.002, rng)]
+    utterances = feed(UtteranceSegmenter(), np.concatenate(parts), rng)
+    assert len(utterances) == 3
+    # Chaque énoncé contient son mot, plus le pré-roll et la traîne de silence
+    for utterance, duration in zip(utterances, (0.3, 0.5, 0.4)):
+        assert duration * RATE < len(utterance) < (duration + 0.7) * RATE
+
+def test_chunking_does_not_change_the_result():
+    rng = np.random.default_rng(1)
+    audio = np.concatenate([noise(0.5, 0.002, rng), word(0.4, 0.2, rng), noise(0.8, 0.002, rng),
+                            word(0.3, 0.2, rng), noise(0.8, 0.002, rng)])
+    whole = UtteranceSegmenter().process(audio)
+    chunked = feed(UtteranceSegmenter(), audio, np.random.default_rng(2), max_chunk=300)
+    assert len(whole) == len(chunked) == 2
+    for a, b in zip(whole, chunked):
+        assert np.array_equal(a, b)
+
+def test_ignores_clicks_and_cuts_long_utterances():
+    rng = np.random.default_rng(3)
+    click = word(0.06, 0.3, rng)
+    long_word = word(VAD_MAX_UTTERANCE + 1.0, 0.2, rng)
+    audio = np.concatenate([noise(0.5, 0.002, rng), click, noise(0.8, 0.002, rng), long_word, noise(0.8, 0.002, rng)])
+    utterances = UtteranceSegmenter().process(audio)
+    # Le clic est trop court pour compter comme parole, le mot trop long est coupé
+    assert len(utterances) == 1
+    assert len(utterances[0]) == pytest.approx(VAD_MAX_UTTERANCE * RATE, rel=0.02)
+
+def test_noise_floor_rises_under_continuous_noise():
+    rng = np.random.default_rng(4)
+    # Bruit de fond qui passe brusquement au-dessus du seuil (ventilateur), puis un mot plus fort
+    audio = np.concatenate([noise(1.0, 0.002, rng), noise(20.0, 0.03, rng)])
+    segmenter = UtteranceSegmenter()
+    utterances = segmenter.process(audio)
+    # Au plus l'énoncé du début du bruit, puis le plancher a rejoint le nouveau bruit
+    assert len(utterances) <= 2
+    assert segmenter.noise_floor == pytest.approx(0.03, rel=0.3)
+    later = segmenter.process(np.concatenate([word(0.4, 0.3, rng), noise(1.0, 0.03, rng)]))
+    assert len(later) == 1
+
+def test_recent_minimum_is_the_sliding_minimum():
+    segmenter = UtteranceSegmenter()
+    window = int(VAD_FLOOR_WINDOW * 1000 / VAD_FRAME_MS)
+    values = np.random.default_rng(5).uniform(0, 1, 500).tolist()
+    for i, value in enumerate(values):
+        assert segmenter._recent_minimum(value) == min(values[max(0, i - window + 1):i + 1])
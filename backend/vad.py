@@ -0,0 +1,103 @@
+# vad.py - Segmentation en énoncés par détection d'activité vocale
+
+from collections import deque
+
+import numpy as np
+
+from config import *
+
+class UtteranceSegmenter:
+    """Découpe un flux audio en énoncés complets (énergie par trame, plancher de bruit adaptatif)"""
+
+    def __init__(self, samplerate=VOICE_SAMPLERATE):
+        self.frame_size = int(samplerate * VAD_FRAME_MS / 1000)
+        self.pre_roll = deque(maxlen=VAD_PRE_ROLL_FRAMES)
+        self.max_frames = int(VAD_MAX_UTTERANCE * 1000 / VAD_FRAME_MS)
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.noise_floor = VAD_MIN_RMS
+        # Minimum glissant de l'énergie (statistiques minimales) : (indice de trame, rms) croissants
+        self.floor_window = int(VAD_FLOOR_WINDOW * 1000 / VAD_FRAME_MS)
+        self.recent_minima = deque()
+        self.frame_index = 0
+        self.reset()
+
+    def reset(self):
+        """Abandonne l'énoncé en cours"""
+        self.in_speech = False
+        self.speech_run = 0
+        self.silence_run = 0
+        # Trames de parole de l'énoncé, sans le pré-roll ni les silences
+        self.voiced_frames = 0
+        self.frames = []
+        self.pre_roll.clear()
+
+    def is_speech(self, frame):
+        """Décision parole/silence d'une trame, met à jour le plancher de bruit"""
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        threshold = max(self.noise_floor * VAD_SPEECH_RATIO, VAD_MIN_RMS)
+        speech = rms > threshold
+
+        minimum = self._recent_minimum(rms)
+
+        # Le plancher suit vite une baisse de bruit, lentement une hausse
+        if not speech:
+            alpha = VAD_FLOOR_FALL if rms < self.noise_floor else VAD_FLOOR_RISE
+            self.noise_floor += alpha * (rms - self.noise_floor)
+        elif minimum > self.noise_floor and self.frame_index >= self.floor_window:
+            # Aucune trame calme sur toute la fenêtre : la parole a des pauses,
+            # c'est donc le bruit de fond qui a monté
+            self.noise_floor += VAD_FLOOR_RISE * (minimum - self.noise_floor)
+        return speech
+
+    def _recent_minimum(self, rms):
+        """Énergie minimale des VAD_FLOOR_WINDOW dernières secondes, en O(1) amorti"""
+        minima = self.recent_minima
+        while minima and minima[-1][1] >= rms:
+            minima.pop()
+        minima.append((self.frame_index, rms))
+        self.frame_index += 1
+        if minima[0][0] <= self.frame_index - self.floor_window - 1:
+            minima.popleft()
+        return minima[0][1]
+
+    def process(self, audio):
+        """Ajoute des échantillons, retourne la liste des énoncés terminés"""
+        audio = np.concatenate((self.pending, np.asarray(audio, dtype=np.float32)))
+        n_frames = len(audio) // self.frame_size
+        self.pending = audio[n_frames * self.frame_size:]
+
+        utterances = []
+        for i in range(n_frames):
+            frame = audio[i * self.frame_size:(i + 1) * self.frame_size]
+            utterance = self._process_frame(frame)
+            if utterance is not None:
+                utterances.append(utterance)
+        return utterances
+
+    def _process_frame(self, frame):
+        speech = self.is_speech(frame)
+
+        if not self.in_speech:
+            self.pre_roll.append(frame)
+            self.speech_run = self.speech_run + 1 if speech else 0
+            # Début d'énoncé : quelques trames de parole consécutives, pré-roll inclus
+            if self.speech_run >= VAD_START_FRAMES:
+                self.in_speech = True
+                self.silence_run = 0
+                self.voiced_frames = self.speech_run
+                self.frames = list(self.pre_roll)
+                self.pre_roll.clear()
+            return None
+
+        self.frames.append(frame)
+        self.silence_run = 0 if speech else self.silence_run + 1
+        self.voiced_frames += speech
+
+        # Fin d'énoncé après la traîne de silence, ou si l'énoncé est trop long
+        if self.silence_run >= VAD_HANGOVER_FRAMES or len(self.frames) >= self.max_frames:
+            voiced_frames = self.voiced_frames
+            utterance = np.concatenate(self.frames)
+            self.reset()
+            if voiced_frames >= VAD_MIN_SPEECH_FRAMES:
+                return utterance
+        return None
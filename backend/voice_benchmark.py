@@ -0,0 +1,115 @@
+# voice_benchmark.py - Banc d'essai du contrôle vocal sur fichiers WAV
+
+import argparse
+import difflib
+import json
+import os
+import time
+
+import numpy as np
+
+from config import *
+from keyword_spotter import KeywordSpotter, _read_wav
+from vad import UtteranceSegmenter
+from voice_worker import recognize
+from command_decoder import CommandDecoder
+from whisper_service import load_model
+from recording_backend import RecordingKeyboard, RecordingMouse
+import voice_commands
+
+def run_file(path, model, spotter, decoder, keyboard, mouse):
+    """Fait passer un WAV par blocs → VAD → reconnaissance → exécution, retourne les mesures"""
+    audio = _read_wav(path, VOICE_SAMPLERATE)
+    block_size = int(VOICE_SAMPLERATE * VOICE_BLOCK_DURATION)
+    segmenter = UtteranceSegmenter(VOICE_SAMPLERATE)
+    state = {'keyboard_enabled': True, 'held_keys': set()}
+
+    commands = []
+    latencies = []
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+
+    # Une demi-seconde de silence en fin de fichier pour fermer le dernier énoncé
+    padded = np.concatenate((audio, np.zeros(VOICE_SAMPLERATE // 2, dtype=np.float32)))
+    for i in range(0, len(padded), block_size):
+        for utterance in segmenter.process(padded[i:i + block_size]):
+            # Latence mesurée à partir de la fermeture de l'énoncé par la VAD
+            utterance_end = time.perf_counter()
+            text, source = recognize(utterance, model, spotter, decoder)
+            match = voice_commands.dispatch_text(text, keyboard, mouse, state) if text else None
+            latencies.append(time.perf_counter() - utterance_end)
+            if match:
+                phrase, _, count = match
+                commands.append(f"{phrase} x{count}" if count > 1 else phrase)
+
+    wall = time.perf_counter() - start_wall
+    cpu = time.process_time() - start_cpu
+    return {
+        'duration': len(audio) / VOICE_SAMPLERATE,
+        'wall': wall,
+        'cpu': cpu,
+        'latencies': latencies,
+        'commands': commands,
+    }
+
+def score(expected, recognized):
+    """Nombre de commandes correctes, dans l'ordre"""
+    matcher = difflib.SequenceMatcher(a=expected, b=recognized, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks())
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du contrôle vocal sur fichiers WAV")
+    parser.add_argument("wavs", nargs="+", help="Fichiers WAV mono 16 kHz")
+    parser.add_argument("--labels", help="JSON {\"fichier.wav\": [\"left\", \"up x3\", ...]}")
+    parser.add_argument("--model", default=WHISPER_MODEL_SIZE, help="Taille du modèle Whisper")
+    parser.add_argument("--compute-type", default=WHISPER_COMPUTE_TYPE)
+    parser.add_argument("--no-kws", action="store_true", help="Désactiver le spotter de mots-clés")
+    parser.add_argument("--constrained", action=argparse.BooleanOptionalAction, default=VOICE_CONSTRAINED_DECODING,
+                        help="Décodage restreint à la grammaire (par défaut : comme en production)")
+    args = parser.parse_args()
+
+    labels = {}
+    if args.labels:
+        with open(args.labels) as f:
+            labels = json.load(f)
+
+    model = load_model(args.model, args.compute_type)
+    spotter = None if args.no_kws else KeywordSpotter()
+    decoder = CommandDecoder(model, voice_commands.command_registry) if args.constrained else None
+    keyboard = RecordingKeyboard()
+    mouse = RecordingMouse()
+
+    total_duration = total_wall = total_cpu = 0.0
+    latencies = []
+    correct = n_expected = n_recognized = 0
+
+    for path in args.wavs:
+        result = run_file(path, model, spotter, decoder, keyboard, mouse)
+        total_duration += result['duration']
+        total_wall += result['wall']
+        total_cpu += result['cpu']
+        latencies += result['latencies']
+
+        expected = labels.get(os.path.basename(path))
+        line = f"📄 {os.path.basename(path)}: {result['commands']}"
+        if expected is not None:
+            hits = score(expected, result['commands'])
+            correct += hits
+            n_expected += len(expected)
+            n_recognized += len(result['commands'])
+            line += f" (attendu {expected}, {hits}/{len(expected)})"
+        print(line)
+
+    print(f"\n📊 Modèle {args.model} ({args.compute_type}), spotter {'off' if args.no_kws else 'on'}, "
+          f"décodage {'restreint' if args.constrained else 'libre'}")
+    print(f"  Facteur temps réel : {total_wall / total_duration:.3f} ({total_duration:.1f}s d'audio en {total_wall:.1f}s)")
+    print(f"  CPU : {100 * total_cpu / total_wall:.0f}% d'un cœur")
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"  Latence par énoncé : p50 {p50:.0f} ms, p99 {p99:.0f} ms ({len(latencies)} énoncés)")
+    if n_expected:
+        precision = correct / n_recognized if n_recognized else 0.0
+        print(f"  Précision des commandes : rappel {correct / n_expected:.0%}, précision {precision:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# voice_commands.py - Exécution des commandes vocales reconnues (sans micro ni pynput à l'import)
+
+import time
+
+from command_registry import CommandRegistry
+from controllers import resolve_key, resolve_button
+from config import *
+
+# Table des commandes, compilée une fois
+command_registry = CommandRegistry()
+
+def simulate_key(keyboard, key):
+    keyboard.press(key)
+    keyboard.release(key)
+
+def simulate_mouse_click(mouse, button):
+    """Simulate a mouse click with specified button"""
+    mouse.click(button)
+    print(f"🖱️ Mouse {button} clicked")
+
+def hold_key(keyboard, key):
+    """Hold a key down"""
+    keyboard.press(key)
+    print(f"⌨️ Holding {_key_name(key)}")
+
+def release_key(keyboard, key):
+    """Release a held key"""
+    keyboard.release(key)
+    print(f"⌨️ Released {_key_name(key)}")
+
+def _key_name(key):
+    return key.name.upper() if hasattr(key, 'name') else str(key).upper()
+
+def execute_action(action, count, keyboard, mouse, state):
+    """Exécute l'action d'une commande, count fois pour les touches et les clics"""
+    kind, target = action
+    
+    if kind == "keyboard_on":
+        state['keyboard_enabled'] = True
+        print("🎮 Keyboard controls ENABLED")
+    elif kind == "keyboard_off":
+        state['keyboard_enabled'] = False
+        print("🔒 Keyboard controls DISABLED")
+    elif not state['keyboard_enabled']:
+        # Only process commands if keyboard is enabled
+        print("🔒 Commands ignored - Keyboard is DISABLED")
+    elif kind == "release_all":
+        for key in state['held_keys']:
+            release_key(keyboard, key)
+        state['held_keys'].clear()
+        print("🛑 All keys released")
+    elif kind == "hold":
+        key = resolve_key(target)
+        hold_key(keyboard, key)
+        state['held_keys'].add(key)
+    else:
+        for i in range(count):
+            if kind == "tap":
+                simulate_key(keyboard, resolve_key(target))
+            elif kind == "click":
+                simulate_mouse_click(mouse, resolve_button(target))
+            if i + 1 < count:
+                time.sleep(VOICE_REPEAT_DELAY)
+
+def dispatch_text(text, keyboard, mouse, state):
+    """Exécute la première commande du texte reconnu, retourne (phrase, action, répétitions) ou None"""
+    match = command_registry.match(text)
+    if match is None:
+        return None
+    
+    phrase, action, count = match
+    suffix = f" x{count}" if count > 1 else ""
+    print(f"🎯 Command: {phrase.upper()}{suffix}")
+    execute_action(action, count, keyboard, mouse, state)
+    return match
@@ -1,16 +1,30 @@
 import sounddevice as sd
 import numpy as np
-from faster_whisper import WhisperModel
-from pynput.keyboard import Key, Controller
-from pynput.mouse import Button, Controller as MouseController
+from pynput.keyboard import Controller
+from pynput.mouse import Controller as MouseController
 import scipy.io.wavfile
 import time
 import threading
+import multiprocessing
+import queue
+import atexit
+
+from audio_buffer import SharedAudioRing
+from voice_worker import run_worker
+from voice_commands import dispatch_text
+from config import *
 
 # Variables globales pour le contrôle
 voice_thread = None
 is_running = False
 
+# Processus de reconnaissance et canaux de communication
+worker_process = None
+audio_ring = None
+command_queue = None
+worker_ready = None
+worker_stop = None
+
 def start_voice_control():
     """Démarre le contrôle vocal dans un thread séparé"""
     global voice_thread, is_running
@@ -30,187 +44,116 @@ def stop_voice_control():
             voice_thread = None
         print("🛑 Contrôle vocal arrêté")
 
-def simulate_key(keyboard, key):
-    keyboard.press(key)
-    keyboard.release(key)
+def start_voice_worker():
+    """Démarre le processus de reconnaissance (une seule fois, réutilisé entre les sessions)"""
+    global worker_process, audio_ring, command_queue, worker_ready, worker_stop
+    if worker_process is not None and worker_process.is_alive():
+        # Commandes reconnues après la fin de la session précédente : ne pas les rejouer
+        drain_commands()
+        return
+    
+    # spawn : même comportement sous Windows, Linux et macOS
+    context = multiprocessing.get_context("spawn")
+    audio_ring = SharedAudioRing()
+    command_queue = context.Queue(maxsize=VOICE_COMMAND_QUEUE_SIZE)
+    worker_ready = context.Event()
+    worker_stop = context.Event()
+    worker_process = context.Process(
+        target=run_worker,
+        args=(audio_ring.name, command_queue, worker_ready, worker_stop),
+        daemon=True
+    )
+    worker_process.start()
+    print("✨ Processus de reconnaissance vocale lancé")
 
-def simulate_mouse_click(mouse, button):
-    """Simulate a mouse click with specified button"""
-    mouse.click(button)
-    print(f"🖱️ Mouse {button} clicked")
+def shutdown_voice_worker():
+    """Arrête le processus de reconnaissance et libère la mémoire partagée"""
+    global worker_process, audio_ring
+    if worker_process is not None:
+        worker_stop.set()
+        worker_process.join(timeout=5)
+        if worker_process.is_alive():
+            worker_process.terminate()
+        worker_process = None
+    if audio_ring is not None:
+        audio_ring.close()
+        audio_ring = None
 
-def hold_key(keyboard, key):
-    """Hold a key down"""
-    keyboard.press(key)
-    print(f"⌨️ Holding {key.upper()}")
+# Enregistré une seule fois, quel que soit le nombre de démarrages du processus
+atexit.register(shutdown_voice_worker)
 
-def release_key(keyboard, key):
-    """Release a held key"""
-    keyboard.release(key)
-    print(f"⌨️ Released {key.upper()}")
+def drain_commands():
+    """Vide la file des commandes reconnues"""
+    while True:
+        try:
+            command_queue.get_nowait()
+        except queue.Empty:
+            return
 
-def execute_command(text, keyboard):
-    """Execute a single command"""
-    if "stop" in text:
-        # Release all held keys
-        for key in ['z', 's', 'q', 'd']:
-            release_key(keyboard, key)
-        print("🛑 All keys released")
-        return
+def open_audio_stream():
+    """Flux micro → anneau partagé (le callback sounddevice tourne sur son propre thread)"""
+    ring = audio_ring
+    
+    # Capture → anneau partagé → processus de reconnaissance : le callback ne fait que copier
+    def audio_callback(indata, frames, time, status):
+        if status:
+            ring.count_input_overflow()
+        ring.write(indata[:, 0])
+    
+    return sd.InputStream(
+        samplerate=VOICE_SAMPLERATE,
+        channels=1,
+        dtype=np.float32,
+        blocksize=int(VOICE_SAMPLERATE * VOICE_BLOCK_DURATION),
+        device=VOICE_DEVICE,
+        callback=audio_callback
+    )
 
-    if "top" in text or "up" in text:
-        print("⬆️ Moving forward")
-        hold_key(keyboard, 'z')
-    elif "down" in text:
-        print("⬇️ Moving backward")
-        hold_key(keyboard, 's')
-    elif "left" in text:
-        print("👈 Moving left")
-        hold_key(keyboard, 'q')
-    elif "right" in text:
-        print("👉 Moving right")
-        hold_key(keyboard, 'd')
-    elif "inventory" in text:
-        print("🎒 Opening inventory")
-        simulate_key(keyboard, 'e')
+def handle_message(message, keyboard, mouse, state):
+    """Exécute une commande reçue du processus de reconnaissance"""
+    latency = (time.time() - message['utterance_end']) * 1000
+    print(f"\n🗣️ Detected: '{message['text']}' ({message['source']}, {latency:.0f} ms)")
+    dispatch_text(message['text'], keyboard, mouse, state)
+    print("-" * 30)
 
-def execute_repeated_command(text, keyboard, count):
-    """Execute a command multiple times"""
-    print(f"🔄 Executing '{text}' {count} times")
-    for i in range(count):
-        if "top" in text or "up" in text:
-            print(f"⌨️ Pressing UP (#{i+1}/{count})")
-            simulate_key(keyboard, Key.up)
-        elif "down" in text:
-            print(f"⌨️ Pressing DOWN (#{i+1}/{count})")
-            simulate_key(keyboard, Key.down)
-        elif "left" in text:
-            print(f"⌨️ Pressing LEFT (#{i+1}/{count})")
-            print(f"👈 LEFT command activated (#{i+1}/{count})")
-            simulate_key(keyboard, Key.left)
-            print(f"✅ LEFT command completed (#{i+1}/{count})")
-        elif "right" in text:
-            print(f"⌨️ Pressing RIGHT (#{i+1}/{count})")
-            print(f"👉 RIGHT command activated (#{i+1}/{count})")
-            simulate_key(keyboard, Key.right)
-            print(f"✅ RIGHT command completed (#{i+1}/{count})")
-        time.sleep(0.1)
+def print_audio_stats():
+    stats = audio_ring.stats()
+    print(f"📉 Audio: {stats['written']} échantillons, {stats['dropped']} perdus ({audio_ring.policy}), "
+          f"{stats['input_overflows']} débordements d'entrée")
+    print("🎤 Voice control stopped")
 
 def transcribe_audio():
     print("✨ Initializing...")
-    model = WhisperModel("tiny", device="cpu", compute_type="int8", num_workers=2)
+    start_voice_worker()
     keyboard = Controller()
     mouse = MouseController()
-    keyboard_enabled = True
+    state = {'keyboard_enabled': True, 'held_keys': set()}
+    if not worker_ready.wait(VOICE_WORKER_READY_TIMEOUT):
+        print("❌ Le processus de reconnaissance n'est pas prêt")
+        return
     print("✅ Initialization complete")
     print("🎮 Keyboard controls ENABLED by default")
     
-    # Optimized audio parameters
-    samplerate = 16000
-    chunk_duration = 0.5
-    chunk_size = int(samplerate * chunk_duration)
-    device = 1
-    
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(f"⚠️ Status: {status}")
-            return
-        
-        nonlocal keyboard_enabled  # Pour pouvoir modifier la variable
-        
-        # Simplified audio processing
-        audio = indata.copy().squeeze()
-        audio_level = np.max(np.abs(audio))
-        
-        # Audio level logging
-        print(f"\n📊 Audio level: {audio_level:.4f}")
-        
-        if audio_level > 0.1:
-            print("🎙️ Sound detected!")
-            try:
-                segments, _ = model.transcribe(
-                    audio,
-                    language="en",
-                    beam_size=1,
-                    vad_filter=False,
-                    initial_prompt="top up down left right stop inventory right click left click",
-                    condition_on_previous_text=False,
-                    no_speech_threshold=0.5,
-                    compression_ratio_threshold=2.4,
-                    temperature=0
-                )
-                
-                # Get first segment only
-                for segment in segments:
-                    text = segment.text.lower().strip()
-                    if text:
-                        # Clean up repeated words
-                        words = text.split()
-                        unique_words = []
-                        for word in words:
-                            if word not in unique_words:
-                                unique_words.append(word)
-                        
-                        cleaned_text = ' '.join(unique_words)
-                        print(f"\n🗣️ Detected: '{cleaned_text}'")
-                        
-                        # Check for keyboard activation/deactivation
-                        if "keyboard on" in cleaned_text:
-                            keyboard_enabled = True
-                            print("🎮 Keyboard controls ENABLED")
-                        elif "keyboard off" in cleaned_text:
-                            keyboard_enabled = False
-                            print("🔒 Keyboard controls DISABLED")
-                        
-                        # Only process commands if keyboard is enabled
-                        elif keyboard_enabled:
-                            if "right click" in cleaned_text:  # Check for clicks first
-                                print("🖱️ RIGHT CLICK command")
-                                simulate_mouse_click(mouse, Button.right)
-                            elif "left click" in cleaned_text:
-                                print("🖱️ LEFT CLICK command")
-                                simulate_mouse_click(mouse, Button.left)
-                            elif "right" in cleaned_text:
-                                print("👉 RIGHT command")
-                                simulate_key(keyboard, Key.right)
-                            elif "left" in cleaned_text:
-                                print("👈 LEFT command")
-                                simulate_key(keyboard, Key.left)
-                            elif "up" in cleaned_text or "top" in cleaned_text:
-                                print("⬆️ UP command")
-                                simulate_key(keyboard, Key.up)
-                            elif "down" in cleaned_text:
-                                print("⬇️ DOWN command")
-                                simulate_key(keyboard, Key.down)
-                        elif not keyboard_enabled and any(cmd in cleaned_text for cmd in ["right", "left", "up", "top", "down", "jump"]):
-                            print("🔒 Commands ignored - Keyboard is DISABLED")
-
-                    break  # Only process first segment
-                        
-            except Exception as e:
-                print(f"❌ Error: {str(e)}")
-            
-            print("-" * 30)
-    
     try:
         print("\n🎤 Starting continuous recording...")
-        with sd.InputStream(
-            samplerate=samplerate,
-            channels=1,
-            dtype=np.float32,
-            blocksize=chunk_size,
-            device=device,
-            callback=audio_callback
-        ):
+        with open_audio_stream():
             print("✅ Ready!")
             while is_running:  # Utiliser la variable globale pour le contrôle
-                time.sleep(0.05)
+                try:
+                    message = command_queue.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                handle_message(message, keyboard, mouse, state)
                 
     except KeyboardInterrupt:
         print("\n🛑 Stopping...")
     finally:
-        print("🎤 Voice control stopped")
+        print_audio_stats()
 
 if __name__ == "__main__":
-    transcribe_audio()
+    is_running = True
+    try:
+        transcribe_audio()
+    finally:
+        shutdown_voice_worker()
 
@@ -0,0 +1,129 @@
+# voice_worker.py - Reconnaissance vocale dans un processus séparé
+
+import queue
+import time
+
+from config import *
+
+def recognize(audio, model, spotter=None, decoder=None, beam_size=1):
+    """Reconnaît un énoncé complet, retourne (texte, source) ou (None, None)"""
+    # Chemin rapide : gabarits de mots-clés, Whisper seulement si c'est ambigu
+    if spotter is not None and spotter.is_ready():
+        start = time.perf_counter()
+        command, distance = spotter.match(audio)
+        elapsed = (time.perf_counter() - start) * 1000
+        if command:
+            print(f"🔑 Keyword: '{command}' (distance {distance:.2f}, {elapsed:.1f} ms)")
+            return command, 'keyword'
+        print(f"❔ Keyword spotter unsure (distance {distance:.2f}, {elapsed:.1f} ms), using Whisper")
+
+    if decoder is not None:
+        # Décodage restreint : seuls les mots des commandes, arrêt après la première commande
+        try:
+            text = decoder.transcribe(model, audio, beam_size)
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            return None, None
+        text = text.strip()
+        if decoder.registry.match(text) is None:
+            if text:
+                print(f"❔ No command in '{text}'")
+            return None, None
+        return text, 'whisper'
+
+    try:
+        segments, _ = model.transcribe(
+            audio,
+            language="en",
+            beam_size=beam_size,
+            vad_filter=False,
+            initial_prompt="top up down left right stop inventory right click left click",
+            condition_on_previous_text=False,
+            no_speech_threshold=0.5,
+            compression_ratio_threshold=2.4,
+            temperature=0
+        )
+
+        # Get first segment only
+        for segment in segments:
+            text = segment.text.lower().strip()
+            if text:
+                # Clean up repeated words
+                words = text.split()
+                unique_words = []
+                for word in words:
+                    if word not in unique_words:
+                        unique_words.append(word)
+                return ' '.join(unique_words), 'whisper'
+            break
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+
+    return None, None
+
+def run_worker(ring_name, command_queue, ready_event, stop_event):
+    """Point d'entrée du processus : anneau partagé → VAD → reconnaissance → file de commandes"""
+    from audio_buffer import SharedAudioRing
+    from vad import UtteranceSegmenter
+    from keyword_spotter import KeywordSpotter
+    from whisper_service import get_model
+    from command_decoder import CommandDecoder
+    from model_tiers import ModelTierSelector
+
+    ring = SharedAudioRing(name=ring_name)
+    segmenter = UtteranceSegmenter(VOICE_SAMPLERATE)
+    spotter = KeywordSpotter() if KWS_ENABLED else None
+
+    try:
+        # Modèle chargé et chauffé une seule fois pour toute la vie du processus
+        model = get_model()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        ring.close()
+        return
+    tiers = ModelTierSelector(model) if VOICE_ADAPTIVE_TIERS else None
+    decoder = None
+    decoder_model = None
+    ready_event.set()
+
+    try:
+        while not stop_event.is_set():
+            audio = ring.read()
+            if not len(audio):
+                time.sleep(VOICE_WORKER_POLL)
+                continue
+
+            # Seuls les énoncés complets partent vers la reconnaissance
+            for utterance in segmenter.process(audio):
+                utterance_end = time.time()
+                print(f"\n🎙️ Utterance: {len(utterance) / VOICE_SAMPLERATE:.2f}s")
+                if tiers is not None:
+                    model = tiers.model
+                # La grammaire dépend du tokenizer : on la reconstruit à chaque changement de modèle
+                if VOICE_CONSTRAINED_DECODING and decoder_model is not model:
+                    decoder = CommandDecoder(model)
+                    decoder_model = model
+
+                start = time.perf_counter()
+                text, source = recognize(utterance, model, spotter, decoder,
+                                         tiers.beam_size if tiers else 1)
+                if tiers is not None and source != 'keyword':
+                    # Mesure du débit réel : décodage + audio encore en attente dans l'anneau
+                    tiers.record(time.perf_counter() - start, len(utterance) / VOICE_SAMPLERATE,
+                                 ring.depth() / VOICE_SAMPLERATE)
+                if text:
+                    message = {
+                        'text': text,
+                        'source': source,
+                        'utterance_end': utterance_end,
+                        'recognized_at': time.time(),
+                    }
+                    try:
+                        command_queue.put_nowait(message)
+                    except queue.Full:
+                        print("⚠️ File de commandes pleine, commande ignorée")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
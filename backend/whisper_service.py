@@ -0,0 +1,74 @@
+# whisper_service.py - Modèle Whisper partagé, chargé une seule fois
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from config import *
+
+# Modèle unique du processus
+_model = None
+_load_error = None
+_model_ready = threading.Event()
+_load_thread = None
+_lock = threading.Lock()
+
+def cpu_threads():
+    """Nombre de threads CTranslate2, un cœur étant laissé au suivi de tête"""
+    if WHISPER_CPU_THREADS:
+        return WHISPER_CPU_THREADS
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return max(1, cores - 1)
+
+def preload_model():
+    """Lance le chargement du modèle en arrière-plan (sans effet s'il est déjà lancé)"""
+    global _load_thread
+    with _lock:
+        if _load_thread is None:
+            _load_thread = threading.Thread(target=_load_model, daemon=True)
+            _load_thread.start()
+
+def load_model(model_size=WHISPER_MODEL_SIZE, compute_type=WHISPER_COMPUTE_TYPE):
+    """Charge un modèle et fait un décodage de chauffe (bloquant)"""
+    from faster_whisper import WhisperModel
+
+    start = time.time()
+    threads = cpu_threads()
+    model = WhisperModel(model_size, device="cpu", compute_type=compute_type,
+                         cpu_threads=threads, num_workers=1)
+
+    # Décodage de chauffe : alloue les buffers et charge les poids en cache
+    segments, _ = model.transcribe(np.zeros(VOICE_SAMPLERATE, dtype=np.float32),
+                                   language="en", beam_size=1, vad_filter=False)
+    list(segments)
+
+    print(f"✅ Whisper '{model_size}' ({compute_type}) prêt ({threads} threads, {time.time() - start:.1f}s)")
+    return model
+
+def _load_model():
+    global _model, _load_error
+    try:
+        _model = load_model()
+    except Exception as e:
+        _load_error = e
+        print(f"❌ Chargement de Whisper impossible: {e}")
+    finally:
+        _model_ready.set()
+
+def get_model(timeout=None):
+    """Retourne le modèle partagé, en attendant la fin du chargement si besoin"""
+    preload_model()
+    if not _model_ready.wait(timeout):
+        raise TimeoutError("Le modèle Whisper n'est pas encore chargé")
+    if _model is None:
+        raise RuntimeError(f"Le modèle Whisper n'a pas pu être chargé: {_load_error}")
+    return _model
+
+def is_model_ready():
+    """Indique si le modèle est chargé et chauffé"""
+    return _model is not None